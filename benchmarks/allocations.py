@@ -0,0 +1,103 @@
+"""
+Integers and booleans allocated running each workload, with small integers and
+booleans shared as they are now and with a new object for every result. Each
+shared integer is counted once, by the first engine to need it.
+
+    python -m benchmarks.allocations
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterator
+import contextlib
+import dataclasses as dc
+import pathlib
+from unittest import mock
+
+from monkey.compiler import compilers, vm
+from monkey.interpreter import ast, environment, evaluate, interface, objects
+from monkey.interpreter import stackless
+
+
+WORKLOADS = pathlib.Path(__file__).parent / "workloads"
+
+
+@dc.dataclass
+class Counts:
+    integers: int = 0
+    booleans: int = 0
+
+
+@contextlib.contextmanager
+def counting() -> Iterator[Counts]:
+    counts = Counts()
+    integer_init = objects.Integer.__init__
+    boolean_init = objects.Boolean.__init__
+
+    def new_integer(self: objects.Integer, value: int) -> None:
+        counts.integers += 1
+        integer_init(self, value)
+
+    def new_boolean(self: objects.Boolean, value: bool) -> None:
+        counts.booleans += 1
+        boolean_init(self, value)
+
+    with mock.patch.object(
+        objects.Integer, "__init__", new_integer
+    ), mock.patch.object(objects.Boolean, "__init__", new_boolean):
+        yield counts
+
+
+@contextlib.contextmanager
+def unshared() -> Iterator[None]:
+    """
+    As before small integers were shared, and when the VM made a new boolean
+    for each integer comparison.
+    """
+    with mock.patch.object(
+        objects, "integer", lambda value: objects.Integer(value=value)
+    ), mock.patch.object(
+        objects, "boolean", lambda value: objects.Boolean(value=value)
+    ):
+        yield
+
+
+def on_vm(program: ast.Program) -> None:
+    compiler = compilers.Compiler.new()
+    compiler.compile(program)
+    vm.VM.from_bytecode(compiler.bytecode()).run()
+
+
+# Not specialize, which has no tail calls so the workloads run out of stack.
+ENGINES: dict[str, Callable[[ast.Program], object]] = {
+    "interpreter": lambda program: evaluate.node(program, environment.Environment()),
+    "stackless": lambda program: stackless.run(program, environment.Environment()),
+    "vm": on_vm,
+}
+
+
+def count(engine: Callable[[ast.Program], object], script: str) -> Counts:
+    program, errors = interface.parse(script)
+    assert not errors, errors
+    with counting() as counts:
+        engine(program)
+    return counts
+
+
+def main() -> None:
+    print(f"{'workload':<10}{'engine':<13}{'integers':>20}{'booleans':>20}")
+    for path in sorted(WORKLOADS.glob("*.mky")):
+        script = path.read_text()
+        for name, engine in ENGINES.items():
+            with unshared():
+                before = count(engine, script)
+            after = count(engine, script)
+            print(
+                f"{path.stem:<10}{name:<13}"
+                f"{f'{before.integers:,} -> {after.integers:,}':>20}"
+                f"{f'{before.booleans:,} -> {after.booleans:,}':>20}"
+            )
+
+
+if __name__ == "__main__":
+    main()
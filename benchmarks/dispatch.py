@@ -0,0 +1,381 @@
+"""
+Instructions per second for each op code in code.DEFINITIONS.
+
+Every op code gets a straight-line program that repeats a short, stack-neutral
+sequence exercising it, so the numbers mostly measure dispatch and handler cost.
+Each is run by vm.VM and, as a baseline, by MatchVM, which finds the handler
+with a match statement as VM.run did before its dispatch table.
+
+    python -m benchmarks.dispatch
+"""
+
+from __future__ import annotations
+
+import dataclasses as dc
+import time
+
+from monkey.compiler import code, compilers, vm
+from monkey.interpreter import objects
+
+
+REPEAT = 2000
+ROUNDS = 5
+
+INTEGER = 0
+ZERO = 1
+ARRAY = 2
+
+
+@dc.dataclass
+class Program:
+    parts: list[code.Instructions] = dc.field(default_factory=list)
+    size: int = 0
+    executed: int = 0
+
+    def emit(self, op: code.OpCodes, *operands: int) -> int:
+        instruction = code.make(op, *operands)
+        position = self.size
+
+        self.parts.append(instruction)
+        self.size += len(instruction)
+        self.executed += 1
+        return position
+
+    def emit_jump(self, op: code.OpCodes) -> None:
+        # Jump straight to the next instruction.
+        self.emit(op, self.size + len(code.make(op, 0)))
+
+    @property
+    def instructions(self) -> code.Instructions:
+        return code.Instructions.concat_bytes(self.parts)
+
+
+def function(body: Program, num_locals: int = 0) -> objects.CompiledFunction:
+    return objects.CompiledFunction(
+        instructions=body.instructions, num_locals=num_locals, num_params=0
+    )
+
+
+def workload(op: code.OpCodes) -> tuple[compilers.Bytecode, int]:
+    constants: list[objects.Object] = [
+        objects.Integer(value=7),
+        objects.Integer(value=0),
+        objects.Array(items=[objects.Integer(value=7)]),
+    ]
+    main = Program()
+    O = code.OpCodes
+
+    def call(body: Program, num_locals: int = 0, num_free: int = 0) -> None:
+        constants.append(function(body, num_locals))
+        for _ in range(num_free):
+            main.emit(O.CONSTANT, INTEGER)
+        main.emit(O.CLOSURE, len(constants) - 1, num_free)
+        main.emit(O.CALL, 0)
+        main.emit(O.POP)
+        main.executed += body.executed
+
+    match op:
+        case O.CONSTANT | O.POP:
+            for _ in range(REPEAT):
+                main.emit(O.CONSTANT, INTEGER)
+                main.emit(O.POP)
+        case O.TRUE | O.FALSE | O.NULL:
+            for _ in range(REPEAT):
+                main.emit(op)
+                main.emit(O.POP)
+        case (
+            O.ADD
+            | O.SUBTRACT
+            | O.MULTIPLY
+            | O.DIVIDE
+            | O.EQUAL
+            | O.NOT_EQUAL
+            | O.GREATER_THAN
+        ):
+            for _ in range(REPEAT):
+                main.emit(O.CONSTANT, INTEGER)
+                main.emit(O.CONSTANT, INTEGER)
+                main.emit(op)
+                main.emit(O.POP)
+        case O.MINUS:
+            for _ in range(REPEAT):
+                main.emit(O.CONSTANT, INTEGER)
+                main.emit(op)
+                main.emit(O.POP)
+        case O.EXCLAIMATION_MARK:
+            for _ in range(REPEAT):
+                main.emit(O.TRUE)
+                main.emit(op)
+                main.emit(O.POP)
+        case O.JUMP:
+            for _ in range(REPEAT):
+                main.emit_jump(op)
+        case O.JUMP_NOT_TRUTHY:
+            for _ in range(REPEAT):
+                main.emit(O.TRUE)
+                main.emit_jump(op)
+        case O.SET_GLOBAL:
+            for _ in range(REPEAT):
+                main.emit(O.CONSTANT, INTEGER)
+                main.emit(op, 0)
+        case O.GET_GLOBAL:
+            main.emit(O.CONSTANT, INTEGER)
+            main.emit(O.SET_GLOBAL, 0)
+            for _ in range(REPEAT):
+                main.emit(op, 0)
+                main.emit(O.POP)
+        case O.ARRAY | O.HASH:
+            for _ in range(REPEAT):
+                main.emit(O.CONSTANT, INTEGER)
+                main.emit(O.CONSTANT, INTEGER)
+                main.emit(op, 2)
+                main.emit(O.POP)
+        case O.INDEX:
+            for _ in range(REPEAT):
+                main.emit(O.CONSTANT, ARRAY)
+                main.emit(O.CONSTANT, ZERO)
+                main.emit(op)
+                main.emit(O.POP)
+        case O.GET_BUILTIN:
+            for _ in range(REPEAT):
+                main.emit(op, 0)
+                main.emit(O.POP)
+        case O.CLOSURE:
+            constants.append(function(Program()))
+            for _ in range(REPEAT):
+                main.emit(op, len(constants) - 1, 0)
+                main.emit(O.POP)
+        case O.CALL | O.RETURN_VALUE:
+            body = Program()
+            body.emit(O.CONSTANT, INTEGER)
+            body.emit(O.RETURN_VALUE)
+            for _ in range(REPEAT):
+                call(body)
+        case O.TAIL_CALL:
+            leaf = Program()
+            leaf.emit(O.CONSTANT, INTEGER)
+            leaf.emit(O.RETURN_VALUE)
+            constants.append(function(leaf))
+
+            body = Program()
+            body.emit(O.CLOSURE, len(constants) - 1, 0)
+            body.emit(op, 0)
+            body.emit(O.RETURN_VALUE)
+            # The leaf returns for it.
+            body.executed += leaf.executed - 1
+            for _ in range(REPEAT):
+                call(body)
+        case O.RETURN:
+            body = Program()
+            body.emit(O.RETURN)
+            for _ in range(REPEAT):
+                call(body)
+        case O.GET_LOCAL | O.SET_LOCAL:
+            body = Program()
+            body.emit(O.CONSTANT, INTEGER)
+            body.emit(O.SET_LOCAL, 0)
+            for _ in range(REPEAT):
+                if op is O.GET_LOCAL:
+                    body.emit(op, 0)
+                    body.emit(O.POP)
+                else:
+                    body.emit(O.CONSTANT, INTEGER)
+                    body.emit(op, 0)
+            body.emit(O.RETURN)
+            call(body, num_locals=1)
+        case O.ADD_LOCALS | O.ADD_LOCAL_CONSTANT | O.SUBTRACT_LOCAL_CONSTANT:
+            body = Program()
+            body.emit(O.CONSTANT, INTEGER)
+            body.emit(O.SET_LOCAL, 0)
+            for _ in range(REPEAT):
+                body.emit(op, 0, 0 if op is O.ADD_LOCALS else INTEGER)
+                body.emit(O.POP)
+            body.emit(O.RETURN)
+            call(body, num_locals=1)
+        case O.JUMP_NOT_GREATER_THAN:
+            for _ in range(REPEAT):
+                main.emit(O.CONSTANT, INTEGER)
+                main.emit(O.CONSTANT, ZERO)
+                main.emit_jump(op)
+        case O.CALL_GLOBAL:
+            body = Program()
+            body.emit(O.CONSTANT, INTEGER)
+            body.emit(O.RETURN_VALUE)
+            constants.append(function(body))
+            main.emit(O.CLOSURE, len(constants) - 1, 0)
+            main.emit(O.SET_GLOBAL, 0)
+            for _ in range(REPEAT):
+                main.emit(op, 0, 0)
+                main.emit(O.POP)
+                main.executed += body.executed
+        case O.GET_FREE:
+            body = Program()
+            for _ in range(REPEAT):
+                body.emit(op, 0)
+                body.emit(O.POP)
+            body.emit(O.RETURN)
+            call(body, num_free=1)
+        case O.CURRENT_CLOSURE:
+            body = Program()
+            for _ in range(REPEAT):
+                body.emit(op)
+                body.emit(O.POP)
+            body.emit(O.RETURN)
+            call(body)
+        case _:
+            raise NotImplementedError(op)
+
+    bytecode = compilers.Bytecode(instructions=main.instructions, constants=constants)
+    return bytecode, main.executed
+
+
+class MatchVM(vm.VM):
+    """
+    Dispatches by matching each op code in turn, in the order the match
+    statement had them, then calls the same handlers as vm.VM.
+    """
+
+    def run_frames(self, depth: int) -> None:
+        O = code.OpCodes
+        opcodes_by_int = code.OPCODES_BY_INT
+
+        frame = self.current_frame()
+        self.base_pointer, self.free = frame.base_pointer, frame.closure.free
+        decoded = frame.decoded
+        instruction_pointer = frame.instruction_pointer
+        last = len(decoded) - 1
+
+        while instruction_pointer < last:
+            instruction_pointer += 1
+            op, operand, extra_operand = decoded[instruction_pointer]
+
+            jump: int | None
+            match opcodes_by_int[op]:
+                case O.CONSTANT:
+                    jump = self.op_constant(operand, extra_operand)
+                case O.ADD:
+                    jump = self.op_add(operand, extra_operand)
+                case O.SUBTRACT:
+                    jump = self.op_subtract(operand, extra_operand)
+                case O.MULTIPLY:
+                    jump = self.op_multiply(operand, extra_operand)
+                case O.DIVIDE:
+                    jump = self.op_divide(operand, extra_operand)
+                case O.POP:
+                    jump = self.op_pop(operand, extra_operand)
+                case O.TRUE:
+                    jump = self.op_true(operand, extra_operand)
+                case O.FALSE:
+                    jump = self.op_false(operand, extra_operand)
+                case O.GREATER_THAN:
+                    jump = self.op_greater_than(operand, extra_operand)
+                case O.EQUAL:
+                    jump = self.op_equal(operand, extra_operand)
+                case O.NOT_EQUAL:
+                    jump = self.op_not_equal(operand, extra_operand)
+                case O.MINUS:
+                    jump = self.op_minus(operand, extra_operand)
+                case O.EXCLAIMATION_MARK:
+                    jump = self.op_exclaimation_mark(operand, extra_operand)
+                case O.JUMP:
+                    jump = self.op_jump(operand, extra_operand)
+                case O.JUMP_NOT_TRUTHY:
+                    jump = self.op_jump_not_truthy(operand, extra_operand)
+                case O.NULL:
+                    jump = self.op_null(operand, extra_operand)
+                case O.SET_GLOBAL:
+                    jump = self.op_set_global(operand, extra_operand)
+                case O.GET_GLOBAL:
+                    jump = self.op_get_global(operand, extra_operand)
+                case O.ARRAY:
+                    jump = self.op_array(operand, extra_operand)
+                case O.HASH:
+                    jump = self.op_hash(operand, extra_operand)
+                case O.INDEX:
+                    jump = self.op_index(operand, extra_operand)
+                case O.GET_BUILTIN:
+                    jump = self.op_get_builtin(operand, extra_operand)
+                case O.CALL:
+                    jump = self.op_call(operand, extra_operand)
+                case O.RETURN_VALUE:
+                    jump = self.op_return_value(operand, extra_operand)
+                case O.RETURN:
+                    jump = self.op_return(operand, extra_operand)
+                case O.SET_LOCAL:
+                    jump = self.op_set_local(operand, extra_operand)
+                case O.GET_LOCAL:
+                    jump = self.op_get_local(operand, extra_operand)
+                case O.CLOSURE:
+                    jump = self.op_closure(operand, extra_operand)
+                # Op codes added since, which the match statement never had.
+                case O.GET_FREE:
+                    jump = self.op_get_free(operand, extra_operand)
+                case O.CURRENT_CLOSURE:
+                    jump = self.op_current_closure(operand, extra_operand)
+                case O.TAIL_CALL:
+                    jump = self.op_tail_call(operand, extra_operand)
+                case O.ADD_LOCALS:
+                    jump = self.op_add_locals(operand, extra_operand)
+                case O.ADD_LOCAL_CONSTANT:
+                    jump = self.op_add_local_constant(operand, extra_operand)
+                case O.SUBTRACT_LOCAL_CONSTANT:
+                    jump = self.op_subtract_local_constant(operand, extra_operand)
+                case O.JUMP_NOT_GREATER_THAN:
+                    jump = self.op_jump_not_greater_than(operand, extra_operand)
+                case O.CALL_GLOBAL:
+                    jump = self.op_call_global(operand, extra_operand)
+                case op_code:
+                    raise NotImplementedError(op_code)
+
+            if jump is None:
+                continue
+
+            if jump == vm.FRAME_CHANGED:
+                frame.instruction_pointer = instruction_pointer
+                if self.frames_index <= depth:
+                    return
+
+                frame = self.current_frame()
+                self.base_pointer, self.free = frame.base_pointer, frame.closure.free
+                decoded = frame.decoded
+                instruction_pointer = frame.instruction_pointer
+                last = len(decoded) - 1
+            else:
+                instruction_pointer = jump - 1
+
+        frame.instruction_pointer = instruction_pointer
+
+
+def measure(op: code.OpCodes, machine_type: type[vm.VM] = vm.VM) -> float | None:
+    bytecode, executed = workload(op)
+
+    best = float("inf")
+    for _ in range(ROUNDS):
+        machine = machine_type.from_bytecode(bytecode)
+        # Decoding is a one-off cost per function, keep it out of the timings.
+        _ = machine.current_frame().decoded
+
+        start = time.perf_counter()
+        try:
+            machine.run()
+        except NotImplementedError:
+            return None
+        best = min(best, time.perf_counter() - start)
+    return executed / best
+
+
+def main() -> None:
+    print(f"{'instructions/s':>40}")
+    print(f"{'op code':<24}{'match':>16}{'table':>16}")
+    for op, definition in code.DEFINITIONS.items():
+        results = []
+        for machine_type in (MatchVM, vm.VM):
+            per_second = measure(op, machine_type)
+            results.append(
+                "unsupported" if per_second is None else f"{per_second:,.0f}"
+            )
+        print(f"{definition.name:<24}{results[0]:>16}{results[1]:>16}")
+
+
+if __name__ == "__main__":
+    main()
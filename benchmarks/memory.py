@@ -0,0 +1,102 @@
+"""
+Bytes per element of large arrays and hashes built in Monkey, as measured by
+tracemalloc while the result is still held. Also a lookup table built up with
+set keeping every version, as it is and with set copying the whole table.
+
+    python -m benchmarks.memory
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+import contextlib
+import tracemalloc
+from unittest import mock
+
+from monkey.interpreter import environment, evaluate, interface, objects
+
+
+SIZE = 20_000
+# Keeping every version of a copied table is quadratic, so a smaller one.
+VERSIONS = 2_000
+# Well clear of the shared small integers, so every element is its own object.
+START = 1_000_000
+
+
+def array_literal(size: int) -> str:
+    return f"[{', '.join(str(START + i) for i in range(size))}]"
+
+
+def hash_literal(size: int) -> str:
+    pairs = (f"{START + i}: {START + i}" for i in range(size))
+    return f"{{{', '.join(pairs)}}}"
+
+
+def string_hash_literal(size: int) -> str:
+    pairs = (f'"key{i}": {START + i}' for i in range(size))
+    return f"{{{', '.join(pairs)}}}"
+
+
+def incremental(size: int) -> str:
+    return (
+        "let build = fn(n, table, versions) {"
+        "  if (n == 0) { versions }"
+        f"  else {{ build(n - 1, set(table, n + {START}, n), push(versions, table)) }}"
+        "};"
+        f"build({size}, {{}}, [])"
+    )
+
+
+@contextlib.contextmanager
+def copying() -> Iterator[None]:
+    """
+    As if set copied the table's dict, the only way to update a hash before.
+    """
+
+    def set_(_: objects.Set, *args: objects.Object) -> objects.Object:
+        table, key, value = args
+        assert isinstance(table, objects.Hash)
+        assert isinstance(key, objects.Hashable)
+        pair = objects.HashPair(key=key, value=value)
+        return objects.Hash(pairs={**table.pairs, key.hash_key(): pair})
+
+    with mock.patch.object(objects.Set, "__call__", set_):
+        yield
+
+
+def measure(script: str) -> tuple[int, objects.Object | None]:
+    """
+    Bytes still allocated after evaluating script, and its result.
+    """
+    program, errors = interface.parse(script)
+    assert not errors, errors
+
+    tracemalloc.start()
+    try:
+        result = evaluate.node(program, environment.Environment())
+        allocated, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return allocated, result
+
+
+def main() -> None:
+    print(f"{'':<24}{'elements':>10}{'bytes/element':>16}")
+    for name, build in (
+        ("array of integers", array_literal),
+        ("hash of integers", hash_literal),
+        ("hash of strings", string_hash_literal),
+    ):
+        allocated, result = measure(build(SIZE))
+        assert result is not None
+        print(f"{name:<24}{SIZE:>10,}{allocated / SIZE:>16,.1f}")
+
+    with copying():
+        allocated, _ = measure(incremental(VERSIONS))
+    print(f"{'set, copying':<24}{VERSIONS:>10,}{allocated / VERSIONS:>16,.1f}")
+    allocated, _ = measure(incremental(VERSIONS))
+    print(f"{'set, sharing':<24}{VERSIONS:>10,}{allocated / VERSIONS:>16,.1f}")
+
+
+if __name__ == "__main__":
+    main()
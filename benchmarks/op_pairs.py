@@ -0,0 +1,89 @@
+"""
+Count which op codes follow each other while running Monkey scripts on the VM.
+
+The most common pairs and triples are the candidates for superinstructions.
+
+    python -m benchmarks.op_pairs [script.mky ...]
+"""
+
+from __future__ import annotations
+
+import collections
+import glob
+import os
+import sys
+
+from monkey.compiler import code, compilers, vm
+from monkey.interpreter import interface
+
+
+WORKLOADS = os.path.join(os.path.dirname(__file__), "workloads", "*.mky")
+TOP = 15
+
+
+def name(op: int) -> str:
+    op_code = code.OPCODES_BY_INT[op]
+    assert op_code is not None
+    return code.DEFINITIONS[op_code].name
+
+
+def count(filenames: list[str], optimization_level: int) -> list[int]:
+    """
+    Every op code executed, in order.
+    """
+    executed: list[int] = []
+
+    def counting(op: int, handler: vm.Handler) -> vm.Handler:
+        def wrapper(machine: vm.VM, operand: int, extra_operand: int) -> int | None:
+            executed.append(op)
+            return handler(machine, operand, extra_operand)
+
+        return wrapper
+
+    dispatch = vm.DISPATCH
+    vm.DISPATCH = tuple(counting(op, handler) for op, handler in enumerate(dispatch))
+    try:
+        for filename in filenames:
+            with open(filename) as f:
+                program, errors = interface.parse(f.read())
+            if errors:
+                raise SystemExit("\n".join(errors))
+
+            compiler = compilers.Compiler.new(optimization_level=optimization_level)
+            compiler.compile(program)
+            vm.VM.from_bytecode(compiler.bytecode()).run()
+    finally:
+        vm.DISPATCH = dispatch
+    return executed
+
+
+def report(title: str, counter: collections.Counter[tuple[int, ...]], total: int):
+    print(f"\n{title}")
+    for ops, n in counter.most_common(TOP):
+        sequence = "; ".join(name(op) for op in ops)
+        print(f"{n / total:>7.1%} {n:>9}  {sequence}")
+
+
+def main() -> None:
+    args = sys.argv[1:]
+    optimization_level = args.count("-O")
+    filenames = [arg for arg in args if arg != "-O"] or sorted(glob.glob(WORKLOADS))
+
+    executed = count(filenames, optimization_level)
+    print(f"{len(executed)} instructions executed")
+
+    report("Op codes", collections.Counter((op,) for op in executed), len(executed))
+    report(
+        "Pairs",
+        collections.Counter(zip(executed, executed[1:])),
+        len(executed) - 1,
+    )
+    report(
+        "Triples",
+        collections.Counter(zip(executed, executed[1:], executed[2:])),
+        len(executed) - 2,
+    )
+
+
+if __name__ == "__main__":
+    main()
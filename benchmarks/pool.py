@@ -0,0 +1,95 @@
+"""
+Executions per second of a short script, as when running one per event.
+
+    python -m benchmarks.pool
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+import time
+
+from monkey.compiler import compilers, vm
+from monkey.interpreter import interface, objects
+
+
+# Script and its result.
+SCRIPTS: dict[str, tuple[str, int]] = {
+    "tiny": ('let event = {"amount": 42}; event["amount"] * 2', 84),
+    "event": (
+        """
+        let event = {"name": "signup", "amount": 42};
+        let double = fn(x) { x * 2 };
+        let total = fn(items, acc) {
+            if (len(items) == 0) { acc } else { total(rest(items), acc + first(items)) }
+        };
+        double(event["amount"]) + total([1, 2, 3, 4], 0)
+        """,
+        94,
+    ),
+}
+
+SECONDS = 1.0
+
+
+def compile_script(script: str) -> compilers.Bytecode:
+    program, errors = interface.parse(script)
+    assert not errors, errors
+
+    compiler = compilers.Compiler.new()
+    compiler.compile(program)
+    return compiler.bytecode()
+
+
+def compiled_each_time(script: str) -> Callable[[], objects.Object]:
+    def execute() -> objects.Object:
+        machine = vm.VM.from_bytecode(compile_script(script))
+        machine.run()
+        return machine.last_popped_stack_elem
+
+    return execute
+
+
+def new_vm(bytecode: compilers.Bytecode) -> Callable[[], objects.Object]:
+    def execute() -> objects.Object:
+        machine = vm.VM.from_bytecode(bytecode)
+        machine.run()
+        return machine.last_popped_stack_elem
+
+    return execute
+
+
+def pooled(bytecode: compilers.Bytecode) -> Callable[[], objects.Object]:
+    pool = vm.VMPool()
+    return lambda: pool.run(bytecode)
+
+
+def measure(execute: Callable[[], objects.Object], expected: int) -> float:
+    result = execute()
+    assert isinstance(result, objects.Integer) and result.value == expected, result
+
+    executions = 0
+    start = time.perf_counter()
+    while (elapsed := time.perf_counter() - start) < SECONDS:
+        execute()
+        executions += 1
+    return executions / elapsed
+
+
+def main() -> None:
+    print(f"{'script':<8}{'':<20}{'executions/s':>16}")
+    for script_name, (script, expected) in SCRIPTS.items():
+        bytecode = compile_script(script)
+        cases: tuple[tuple[str, Callable[[], objects.Object]], ...] = (
+            ("compile + new VM", compiled_each_time(script)),
+            ("new VM", new_vm(bytecode)),
+            ("pooled VM", pooled(bytecode)),
+        )
+
+        for name, execute in cases:
+            per_second = measure(execute, expected)
+            print(f"{script_name:<8}{name:<20}{per_second:>16,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,7 +10,11 @@ class Option(enum.StrEnum):
 
 
 def main() -> None:
-    func = sys.argv[1] if len(sys.argv) > 1 else None
+    # -O enables bytecode optimisations, can be repeated for higher levels.
+    optimization_level = sys.argv.count("-O")
+    argv = [arg for arg in sys.argv if arg != "-O"]
+
+    func = argv[1] if len(argv) > 1 else None
     try:
         opt = Option(func)
     except ValueError:
@@ -18,17 +22,17 @@ def main() -> None:
 
     match opt:
         case Option.REPL:
-            if not len(sys.argv) == 3:
-                print("Usage: python main.py [repl] <interpreter|vm>")
+            if not len(argv) == 3:
+                print("Usage: python main.py [repl] <interpreter|vm|closures|python|stackless|unboxed>")
                 return
 
-            run_type = sys.argv[2]
+            run_type = argv[2]
         case Option.RUN:
-            if not len(sys.argv) == 4:
-                print("Usage: python main.py run [filename] <interpreter|vm>")
+            if not len(argv) == 4:
+                print("Usage: python main.py run [filename] <interpreter|vm|closures|python|stackless|unboxed> [-O]")
                 return
 
-            run_type = sys.argv[3]
+            run_type = argv[3]
         case None:
             run_type = None
 
@@ -39,7 +43,7 @@ def main() -> None:
         except ValueError:
             print(run_type)
             print(
-                "Usage: python main.py [repl <interpreter|vm>] | [run path <interpreter|vm>]"
+                "Usage: python main.py [repl <interpreter|vm|closures|python|stackless|unboxed>] | [run path <interpreter|vm|closures|python|stackless|unboxed>]"
             )
             return
 
@@ -51,13 +55,13 @@ def main() -> None:
                     print("\nBye!")
                 return
             case Option.RUN:
-                if len(sys.argv) < 3:
-                    print("Usage: python main.py run [filename] <interpreter|vm>")
+                if len(argv) < 3:
+                    print("Usage: python main.py run [filename] <interpreter|vm|closures|python|stackless|unboxed> [-O]")
                     return
-                file = sys.argv[2]
-                interface.Script().eval(file, rt)
+                file = argv[2]
+                interface.Script().eval(file, rt, optimization_level)
     else:
-        print("Usage: python main.py [repl] <interpreter|vm>")
+        print("Usage: python main.py [repl] <interpreter|vm|closures|python|stackless|unboxed>")
 
 
 if __name__ == "__main__":
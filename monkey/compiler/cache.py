@@ -0,0 +1,233 @@
+"""
+On-disk cache of compiled bytecode (.mkyc files).
+
+Layout, all integers big endian:
+
+    magic (4) | format version (u16) | optimization level (u8) | source sha256 (32)
+    instructions | number of globals (u32) | number of constants (u32) | constants
+
+where instructions are a u32 length followed by the bytes and each constant is a
+one byte tag followed by its value.
+"""
+
+from __future__ import annotations
+
+import dataclasses as dc
+import enum
+import hashlib
+import logging
+import os
+import struct
+import tempfile
+
+from monkey.compiler import code, compilers
+from monkey.interpreter import objects
+
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"MKYC"
+# Bump whenever the layout or the meaning of any op code changes.
+FORMAT_VERSION = 3
+EXTENSION = ".mkyc"
+CACHE_DIR_ENV = "MONKEY_CACHE_DIR"
+
+HEADER = struct.Struct(">4sHB32s")
+
+
+class Tag(bytes, enum.Enum):
+    INTEGER = b"I"
+    STRING = b"S"
+    COMPILED_FUNCTION = b"F"
+
+
+class CacheError(Exception):
+    pass
+
+
+class Stale(CacheError):
+    pass
+
+
+class Corrupt(CacheError):
+    pass
+
+
+def source_hash(source: str) -> bytes:
+    return hashlib.sha256(source.encode("utf-8")).digest()
+
+
+def dumps(
+    bytecode: compilers.Bytecode, source: str, optimization_level: int = 0
+) -> bytes:
+    out = bytearray(
+        HEADER.pack(MAGIC, FORMAT_VERSION, optimization_level, source_hash(source))
+    )
+    _write_bytes(out, bytecode.instructions)
+    out += struct.pack(">I", bytecode.num_globals)
+
+    out += struct.pack(">I", len(bytecode.constants))
+    for constant in bytecode.constants:
+        _write_constant(out, constant)
+    return bytes(out)
+
+
+def loads(
+    data: bytes, source: str, optimization_level: int = 0
+) -> compilers.Bytecode:
+    """
+    Raises Stale if data wasn't compiled from source with this format and
+    optimization level, Corrupt if it can't be read.
+    """
+    try:
+        magic, version, level, hash_ = HEADER.unpack_from(data)
+    except struct.error as exc:
+        raise Corrupt("Truncated header") from exc
+
+    if magic != MAGIC:
+        raise Corrupt(f"Bad magic: {magic!r}")
+    if version != FORMAT_VERSION:
+        raise Stale(f"Format version {version}, want {FORMAT_VERSION}")
+    if level != optimization_level:
+        raise Stale(f"Optimization level {level}, want {optimization_level}")
+    if hash_ != source_hash(source):
+        raise Stale("Source changed")
+
+    reader = _Reader(data, HEADER.size)
+    try:
+        instructions = code.Instructions(reader.chunk())
+        num_globals = reader.uint(4)
+        constants = [reader.constant() for _ in range(reader.uint(4))]
+    except (struct.error, UnicodeDecodeError) as exc:
+        raise Corrupt(str(exc)) from exc
+
+    if reader.offset != len(data):
+        raise Corrupt(f"{len(data) - reader.offset} trailing bytes")
+    return compilers.Bytecode(
+        instructions=instructions, constants=constants, num_globals=num_globals
+    )
+
+
+def cache_path(filename: str, cache_dir: str | None = None) -> str:
+    """
+    Next to the source unless a cache directory is given or set in MONKEY_CACHE_DIR.
+    """
+    cache_dir = cache_dir or os.environ.get(CACHE_DIR_ENV)
+    root, _ = os.path.splitext(filename)
+    if not cache_dir:
+        return f"{root}{EXTENSION}"
+
+    # Keep scripts with the same name in different directories apart.
+    path_hash = hashlib.sha256(os.path.abspath(filename).encode("utf-8"))
+    name = f"{os.path.basename(root)}-{path_hash.hexdigest()[:16]}{EXTENSION}"
+    return os.path.join(cache_dir, name)
+
+
+def load(
+    filename: str,
+    source: str,
+    optimization_level: int = 0,
+    cache_dir: str | None = None,
+) -> compilers.Bytecode | None:
+    """
+    Cached bytecode for source, or None if there's no usable cache.
+    """
+    path = cache_path(filename, cache_dir)
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+
+    try:
+        return loads(data, source, optimization_level)
+    except CacheError as exc:
+        logger.info(f"Ignoring cache {path}: {exc}")
+        return None
+
+
+def store(
+    filename: str,
+    source: str,
+    bytecode: compilers.Bytecode,
+    optimization_level: int = 0,
+    cache_dir: str | None = None,
+) -> None:
+    """
+    Best effort - a cache that can't be written only costs a recompile.
+    """
+    path = cache_path(filename, cache_dir)
+    data = dumps(bytecode, source, optimization_level)
+
+    directory = os.path.dirname(path) or "."
+    try:
+        os.makedirs(directory, exist_ok=True)
+        # Write then rename so concurrent runs never read a partial file.
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=EXTENSION)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+    except OSError as exc:
+        logger.warning(f"Couldn't write cache {path}: {exc}")
+
+
+def _write_bytes(out: bytearray, data: bytes | bytearray) -> None:
+    out += struct.pack(">I", len(data))
+    out += data
+
+
+def _write_constant(out: bytearray, constant: objects.Object) -> None:
+    match constant:
+        case objects.Integer():
+            out += Tag.INTEGER
+            length = (constant.value.bit_length() + 8) // 8
+            _write_bytes(out, constant.value.to_bytes(length, signed=True))
+        case objects.String():
+            out += Tag.STRING
+            _write_bytes(out, constant.value.encode("utf-8"))
+        case objects.CompiledFunction():
+            out += Tag.COMPILED_FUNCTION
+            out += struct.pack(">HH", constant.num_locals, constant.num_params)
+            _write_bytes(out, constant.instructions)
+        case _:
+            raise NotImplementedError(type(constant))
+
+
+@dc.dataclass
+class _Reader:
+    data: bytes
+    offset: int
+
+    def take(self, n: int) -> bytes:
+        if self.offset + n > len(self.data):
+            raise struct.error(f"Wanted {n} bytes at {self.offset}")
+        chunk = self.data[self.offset : self.offset + n]
+        self.offset += n
+        return chunk
+
+    def uint(self, width: int) -> int:
+        return int.from_bytes(self.take(width))
+
+    def chunk(self) -> bytes:
+        return self.take(self.uint(4))
+
+    def constant(self) -> objects.Object:
+        match self.take(1):
+            case Tag.INTEGER:
+                return objects.integer(int.from_bytes(self.chunk(), signed=True))
+            case Tag.STRING:
+                return objects.String(value=self.chunk().decode("utf-8"))
+            case Tag.COMPILED_FUNCTION:
+                num_locals = self.uint(2)
+                num_params = self.uint(2)
+                return objects.CompiledFunction(
+                    instructions=code.Instructions(self.chunk()),
+                    num_locals=num_locals,
+                    num_params=num_params,
+                )
+            case tag:
+                raise struct.error(f"Unknown constant tag {tag!r}")
@@ -88,6 +88,7 @@ class OpCodes(bytes, enum.Enum):
     INDEX = bytes([20])
 
     CALL = bytes([21])
+    TAIL_CALL = bytes([35])
 
     RETURN = bytes([22])
     RETURN_VALUE = bytes([23])
@@ -99,6 +100,14 @@ class OpCodes(bytes, enum.Enum):
 
     CLOSURE = bytes([27])
     GET_FREE = bytes([28])
+    CURRENT_CLOSURE = bytes([34])
+
+    # Superinstructions, see optimizer.SUPERINSTRUCTIONS.
+    ADD_LOCALS = bytes([29])
+    ADD_LOCAL_CONSTANT = bytes([30])
+    SUBTRACT_LOCAL_CONSTANT = bytes([31])
+    JUMP_NOT_GREATER_THAN = bytes([32])
+    CALL_GLOBAL = bytes([33])
 
     def as_int(self) -> int:
         return int.from_bytes(self)
@@ -133,6 +142,7 @@ DEFINITIONS: dict[OpCodes, Definition] = {
     OpCodes.HASH: Definition(name="OpHash", operand_widths=[2]),
     OpCodes.INDEX: Definition(name="OpIndex", operand_widths=[]),
     OpCodes.CALL: Definition(name="OpCall", operand_widths=[1]),
+    OpCodes.TAIL_CALL: Definition(name="OpTailCall", operand_widths=[1]),
     OpCodes.RETURN: Definition(name="OpReturn", operand_widths=[]),  # Return null
     OpCodes.RETURN_VALUE: Definition(
         name="OpReturnValue", operand_widths=[]
@@ -142,9 +152,31 @@ DEFINITIONS: dict[OpCodes, Definition] = {
     OpCodes.GET_BUILTIN: Definition(name="OpGetBuiltin", operand_widths=[1]),
     OpCodes.CLOSURE: Definition(name="OpClosure", operand_widths=[2, 1]),
     OpCodes.GET_FREE: Definition(name="OpGetFree", operand_widths=[1]),
+    OpCodes.CURRENT_CLOSURE: Definition(name="OpCurrentClosure", operand_widths=[]),
+    OpCodes.ADD_LOCALS: Definition(name="OpAddLocals", operand_widths=[1, 1]),
+    OpCodes.ADD_LOCAL_CONSTANT: Definition(
+        name="OpAddLocalConstant", operand_widths=[1, 2]
+    ),
+    OpCodes.SUBTRACT_LOCAL_CONSTANT: Definition(
+        name="OpSubLocalConstant", operand_widths=[1, 2]
+    ),
+    OpCodes.JUMP_NOT_GREATER_THAN: Definition(
+        name="OpJumpNotGreaterThan", operand_widths=[2]
+    ),
+    OpCodes.CALL_GLOBAL: Definition(name="OpCallGlobal", operand_widths=[2, 1]),
 }
 
 
+OPCODES_BY_INT: tuple[OpCodes | None, ...] = tuple(
+    next((op for op in OpCodes if op.as_int() == i), None)
+    for i in range(max(op.as_int() for op in OpCodes) + 1)
+)
+
+JUMPS: frozenset[OpCodes] = frozenset(
+    (OpCodes.JUMP, OpCodes.JUMP_NOT_TRUTHY, OpCodes.JUMP_NOT_GREATER_THAN)
+)
+
+
 def lookup_byte(op: bytes) -> Definition:
     try:
         code = OpCodes(op)
@@ -211,3 +243,79 @@ def read_int16(bytes_: bytearray, left: int) -> int:
 def read_int8(bytes_: bytearray, left: int) -> int:
     right = left + 1
     return int.from_bytes(bytes_[left:right])
+
+
+# (op code, first operand, second operand) - unused operands are 0.
+DecodedInstruction = tuple[int, int, int]
+
+
+def decode(instructions: bytearray) -> list[DecodedInstruction]:
+    """
+    Decode instructions once so they can be executed without re-reading operands.
+
+    Jump operands are rewritten from byte offsets to positions in the decoded list.
+    """
+    decoded: list[DecodedInstruction] = []
+    positions: dict[int, int] = {}
+
+    offset = 0
+    while offset < len(instructions):
+        positions[offset] = len(decoded)
+
+        op = instructions[offset]
+        definition = lookup_byte(bytes([op]))
+        offset += 1
+
+        operands = [0, 0]
+        for i, width in enumerate(definition.operand_widths):
+            match width:
+                case 2:
+                    operands[i] = read_int16(instructions, offset)
+                case 1:
+                    operands[i] = read_int8(instructions, offset)
+                case _:
+                    raise NotImplementedError(width)
+            offset += width
+
+        decoded.append((op, operands[0], operands[1]))
+    positions[offset] = len(decoded)
+
+    jumps = {op.as_int() for op in JUMPS}
+    for i, (op, target, _) in enumerate(decoded):
+        if op in jumps:
+            try:
+                decoded[i] = (op, positions[target], 0)
+            except KeyError as exc:
+                raise NotFound(f"Jump to {target} is not an instruction") from exc
+    return decoded
+
+
+def encode(decoded: list[DecodedInstruction]) -> Instructions:
+    """
+    Reverse of decode.
+    """
+    definitions: list[tuple[OpCodes, Definition]] = []
+    offsets: list[int] = []
+
+    offset = 0
+    for op, _, _ in decoded:
+        op_code = OPCODES_BY_INT[op] if op < len(OPCODES_BY_INT) else None
+        if op_code is None:
+            raise NotFound(op)
+
+        definition = DEFINITIONS[op_code]
+        definitions.append((op_code, definition))
+        offsets.append(offset)
+        offset += 1 + sum(definition.operand_widths)
+    offsets.append(offset)
+
+    instructions = Instructions()
+    for (op_code, definition), (_, operand, extra_operand) in zip(
+        definitions, decoded
+    ):
+        if op_code in JUMPS:
+            operand = offsets[operand]
+
+        operands = (operand, extra_operand)[: len(definition.operand_widths)]
+        instructions.extend(make(op_code, *operands))
+    return instructions
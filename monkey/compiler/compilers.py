@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+from collections.abc import Hashable
 import dataclasses as dc
+import functools
 
-from monkey.compiler import code, symbol_table as st
+from monkey.compiler import code, optimizer, symbol_table as st
 from monkey.interpreter import ast
 from monkey.interpreter import objects
 
@@ -24,6 +26,10 @@ class EmittedInstruction:
     position: int
 
 
+# Instructions length, last and previous instruction, constants length.
+RestorePoint = tuple[int, EmittedInstruction | None, EmittedInstruction | None, int]
+
+
 @dc.dataclass
 class CompilationScope:
     instructions: code.Instructions = dc.field(default_factory=code.Instructions)
@@ -35,6 +41,67 @@ class CompilationScope:
 class Bytecode:
     instructions: code.Instructions = dc.field(default_factory=code.Instructions)
     constants: list[objects.Object] = dc.field(default_factory=list)
+    # Globals defined so far, the VM grows past this if it has to.
+    num_globals: int = 0
+
+    @functools.cached_property
+    def main_function(self) -> objects.CompiledFunction:
+        """
+        The program as a function for the VM's main frame, kept so running the
+        same bytecode again doesn't decode it again.
+        """
+        return objects.CompiledFunction(
+            instructions=self.instructions, num_locals=0, num_params=0
+        )
+
+
+def constant_key(o: objects.Object) -> Hashable | None:
+    """
+    Key constants by type and content, None if the object shouldn't be interned.
+    """
+    match o:
+        case objects.Integer() | objects.String():
+            return (o.type, o.value)
+        case objects.CompiledFunction():
+            return (o.type, bytes(o.instructions), o.num_locals, o.num_params)
+    return None
+
+
+def fold_infix(
+    left: objects.Object, operator: str, right: objects.Object
+) -> objects.Object | None:
+    """
+    Evaluate operator at compile time if the VM would give the same result, else None.
+    """
+    if isinstance(left, objects.Integer) and isinstance(right, objects.Integer):
+        match operator:
+            case "+":
+                return objects.integer(left.value + right.value)
+            case "-":
+                return objects.integer(left.value - right.value)
+            case "*":
+                return objects.integer(left.value * right.value)
+            case "/" if right.value != 0:
+                # Floor, not true divide - same as the VM.
+                return objects.integer(left.value // right.value)
+            case "<":
+                return objects.TRUE if left.value < right.value else objects.FALSE
+            case ">":
+                return objects.TRUE if left.value > right.value else objects.FALSE
+            case "==":
+                return objects.TRUE if left.value == right.value else objects.FALSE
+            case "!=":
+                return objects.TRUE if left.value != right.value else objects.FALSE
+    if isinstance(left, objects.String) and isinstance(right, objects.String):
+        if operator == "+":
+            return objects.String(value=left.value + right.value)
+    return None
+
+
+def fold_prefix(operator: str, right: objects.Object) -> objects.Object | None:
+    if isinstance(right, objects.Integer) and operator == "-":
+        return objects.integer(-right.value)
+    return None
 
 
 @dc.dataclass
@@ -44,10 +111,19 @@ class Compiler:
     scopes: list[CompilationScope]
     scope_index: int
 
+    # 0 for none, 1+ for constant folding and peephole optimisations, 2+ to also
+    # use superinstructions.
+    optimization_level: int = 0
+
     constants: list[objects.Object] = dc.field(init=False, default_factory=list)
+    constant_indexes: dict[Hashable, int] = dc.field(init=False, default_factory=dict)
 
     @classmethod
-    def new(cls, symbol_table: st.SymbolTable | None = None) -> Compiler:
+    def new(
+        cls,
+        symbol_table: st.SymbolTable | None = None,
+        optimization_level: int = 0,
+    ) -> Compiler:
         main_scope = CompilationScope()
         _symbol_table = symbol_table or st.SymbolTable.new()
 
@@ -58,6 +134,7 @@ class Compiler:
             symbol_table=_symbol_table,
             scopes=[main_scope],
             scope_index=0,
+            optimization_level=optimization_level,
         )
 
     # Scope
@@ -92,6 +169,9 @@ class Compiler:
                 op_code = code.OpCodes.GET_BUILTIN
             case st.Scope.FREE:
                 op_code = code.OpCodes.GET_FREE
+            case st.Scope.FUNCTION:
+                self.emit(code.OpCodes.CURRENT_CLOSURE)
+                return
         self.emit(op_code, symbol.index)
 
     @property
@@ -100,19 +180,24 @@ class Compiler:
 
     # Instructions
     def _add_constant(self, o: objects.Object) -> int:
-        """Returns position"""
+        """Returns position - equal literals and functions share one constant."""
+        key = constant_key(o)
+        if key is not None and key in self.constant_indexes:
+            return self.constant_indexes[key]
+
         self.constants.append(o)
-        return len(self.constants) - 1
+        position = len(self.constants) - 1
+
+        if key is not None:
+            self.constant_indexes[key] = position
+        return position
 
     def _add_instruction(self, instruction: code.Instructions) -> int:
         """Returns position"""
         current_instructions = self.current_scope.instructions
         new_instruction_position = len(current_instructions)
 
-        updated_instructions = current_instructions.concat_bytes(
-            [current_instructions, instruction]
-        )
-        self.current_scope.instructions = updated_instructions
+        current_instructions.extend(instruction)
 
         return new_instruction_position
 
@@ -150,13 +235,62 @@ class Compiler:
 
     def _remove_pop(self) -> None:
         assert self.current_scope.last_instruction
-        self.current_scope.instructions = code.Instructions(
-            self.current_scope.instructions[
-                : self.current_scope.last_instruction.position
-            ]
-        )
+        del self.current_scope.instructions[
+            self.current_scope.last_instruction.position :
+        ]
         self.current_scope.last_instruction = self.current_scope.previous_instruction
 
+    # Constant folding
+    def _restore_point(self) -> RestorePoint:
+        scope = self.current_scope
+        return (
+            len(scope.instructions),
+            scope.last_instruction,
+            scope.previous_instruction,
+            len(self.constants),
+        )
+
+    def _restore(self, restore_point: RestorePoint) -> None:
+        """
+        Drop everything emitted since the restore point, including constants only
+        the dropped instructions used.
+        """
+        position, last, previous, num_constants = restore_point
+        del self.current_scope.instructions[position:]
+        self.current_scope.last_instruction = last
+        self.current_scope.previous_instruction = previous
+
+        for constant in self.constants[num_constants:]:
+            if (key := constant_key(constant)) is not None:
+                del self.constant_indexes[key]
+        del self.constants[num_constants:]
+
+    def _compile_operand(self, node: ast.Expression) -> objects.Object | None:
+        """
+        Compile node, returning its value if it compiled down to a single constant
+        which can be folded into the expression using it.
+        """
+        position = len(self.current_scope.instructions)
+        self.compile(node)
+
+        last = self.current_scope.last_instruction
+        if (
+            self.optimization_level < 1
+            or last is None
+            or last.position != position
+            or last.op_code is not code.OpCodes.CONSTANT
+        ):
+            return None
+
+        const_index = code.read_int16(self.current_scope.instructions, position + 1)
+        return self.constants[const_index]
+
+    def _emit_folded(self, folded: objects.Object) -> None:
+        if isinstance(folded, objects.Boolean):
+            self.emit(code.OpCodes.TRUE if folded.value else code.OpCodes.FALSE)
+        else:
+            self.emit(code.OpCodes.CONSTANT, self._add_constant(folded))
+
     def emit(self, op_code: code.OpCodes, *operands: int) -> int:
         instruction = code.make(op_code, *operands)
         position = self._add_instruction(instruction)
@@ -179,16 +313,25 @@ class Compiler:
                     self.emit(code.OpCodes.POP)
                 case ast.Infix:
                     assert isinstance(node, ast.Infix) and node.right
+                    restore_point = self._restore_point()
+
                     if node.operator == "<":
-                        self.compile(node.right)
-                        self.compile(node.left)
-                        self.emit(code.OpCodes.GREATER_THAN)
-                        return
+                        right = self._compile_operand(node.right)
+                        left = self._compile_operand(node.left)
+                    else:
+                        left = self._compile_operand(node.left)
+                        right = self._compile_operand(node.right)
 
-                    self.compile(node.left)
-                    self.compile(node.right)
+                    if left is not None and right is not None:
+                        folded = fold_infix(left, node.operator, right)
+                        if folded is not None:
+                            self._restore(restore_point)
+                            self._emit_folded(folded)
+                            return
 
                     match node.operator:
+                        case "<":
+                            self.emit(code.OpCodes.GREATER_THAN)
                         case "+":
                             self.emit(code.OpCodes.ADD)
                         case "-":
@@ -207,7 +350,15 @@ class Compiler:
                             raise NotImplementedError(node.operator)
                 case ast.Prefix:
                     assert isinstance(node, ast.Prefix) and node.right
-                    self.compile(node.right)
+                    restore_point = self._restore_point()
+
+                    right = self._compile_operand(node.right)
+                    if right is not None:
+                        folded = fold_prefix(node.operator, right)
+                        if folded is not None:
+                            self._restore(restore_point)
+                            self._emit_folded(folded)
+                            return
 
                     match node.operator:
                         case "!":
@@ -218,7 +369,7 @@ class Compiler:
                             raise NotImplementedError
                 case ast.IntegerLiteral:
                     assert isinstance(node, ast.IntegerLiteral)
-                    integer = objects.Integer(value=node.value)
+                    integer = objects.integer(node.value)
                     self.emit(code.OpCodes.CONSTANT, self._add_constant(integer))
                 case ast.BooleanLiteral:
                     assert isinstance(node, ast.BooleanLiteral)
@@ -226,36 +377,22 @@ class Compiler:
                     self.emit(op_code)
                 case ast.If:
                     assert isinstance(node, ast.If)
-                    self.compile(node.condition)
-
-                    jump_position_non_truthy = self.emit(
-                        code.OpCodes.JUMP_NOT_TRUTHY, FAKE_JUMP_VALUE
-                    )
-
-                    assert node.consequence
-                    self.compile(node.consequence)
-
-                    if self._last_instruction_is(code.OpCodes.POP):
-                        self._remove_pop()
-
-                    jump_position = self.emit(code.OpCodes.JUMP, FAKE_JUMP_VALUE)
-                    self._change_jump_location_after_consequence(
-                        jump_position_non_truthy
-                    )
-
-                    if node.alternative is None:
-                        self.emit(code.OpCodes.NULL)
-                    else:
-                        self.compile(node.alternative)
-
-                        if self._last_instruction_is(code.OpCodes.POP):
-                            self._remove_pop()
-
-                    self._change_jump_location_after_consequence(jump_position)
+                    self.compile_if(node)
                 case ast.Let:
                     assert isinstance(node, ast.Let)
-                    self.compile(node.value)
-                    symbol = self.symbol_table.define(node.name.value)
+                    if isinstance(node.value, ast.FunctionLiteral):
+                        if self.symbol_table.outer is None:
+                            # Define first so the function can call itself.
+                            symbol = self.symbol_table.define(node.name.value)
+                            self.compile(node.value)
+                        else:
+                            # Locals aren't set until the closure is made, so it
+                            # refers to itself with OpCurrentClosure instead.
+                            self.compile_function(node.value, name=node.name.value)
+                            symbol = self.symbol_table.define(node.name.value)
+                    else:
+                        self.compile(node.value)
+                        symbol = self.symbol_table.define(node.name.value)
                     if symbol.scope is st.Scope.GLOBAL:
                         self.emit(code.OpCodes.SET_GLOBAL, symbol.index)
                     else:
@@ -297,59 +434,174 @@ class Compiler:
                     self.emit(code.OpCodes.INDEX)
                 case ast.FunctionLiteral:
                     assert isinstance(node, ast.FunctionLiteral)
-
-                    self.enter_scope()
-
-                    for param in node.parameters:
-                        self.symbol_table.define(param.value)
-
-                    if node.body:
-                        self.compile(node.body)
-
-                    if self._last_instruction_is(code.OpCodes.POP):
-                        assert self.current_scope.last_instruction
-                        self._replace_instruction(
-                            self.current_scope.last_instruction.position,
-                            code.make(code.OpCodes.RETURN_VALUE),
-                        )
-                    if not self._last_instruction_is(code.OpCodes.RETURN_VALUE):
-                        self.emit(code.OpCodes.RETURN)
-
-                    free_symbols = self.symbol_table.free_symbols
-                    num_locals = self.symbol_table.num_definitions
-                    func_scope_instructions = self.leave_scope()
-
-                    for symbol in free_symbols:
-                        self.load_symbol(symbol)
-
-                    compiled_function = objects.CompiledFunction(
-                        instructions=func_scope_instructions,
-                        num_locals=num_locals,
-                        num_params=len(node.parameters),
-                    )
-                    self.emit(
-                        code.OpCodes.CLOSURE,
-                        self._add_constant(compiled_function),
-                        len(free_symbols),
-                    )
+                    self.compile_function(node)
                 case ast.Return:
                     assert isinstance(node, ast.Return)
-                    self.compile(node.value)
+                    if self.symbol_table.outer is None:
+                        self.compile(node.value)
+                    else:
+                        self.compile_tail(node.value)
                     self.emit(code.OpCodes.RETURN_VALUE)
                 case ast.Call:
                     assert isinstance(node, ast.Call)
-                    self.compile(node.function)
-
-                    for arg in node.arguments:
-                        self.compile(arg)
-
-                    self.emit(code.OpCodes.CALL, len(node.arguments))
+                    self.compile_call(node)
                 case _:
                     raise NotImplementedError(type(node))
         except Exception as exc:
             raise CouldntCompile(str(exc)) from exc
 
+    def compile_if(self, node: ast.If, tail: bool = False) -> None:
+        self.compile(node.condition)
+
+        jump_position_non_truthy = self.emit(
+            code.OpCodes.JUMP_NOT_TRUTHY, FAKE_JUMP_VALUE
+        )
+
+        assert node.consequence
+        self.compile_block(node.consequence, tail)
+
+        if self._last_instruction_is(code.OpCodes.POP):
+            self._remove_pop()
+
+        jump_position = self.emit(code.OpCodes.JUMP, FAKE_JUMP_VALUE)
+        self._change_jump_location_after_consequence(jump_position_non_truthy)
+
+        if node.alternative is None:
+            self.emit(code.OpCodes.NULL)
+        else:
+            self.compile_block(node.alternative, tail)
+
+            if self._last_instruction_is(code.OpCodes.POP):
+                self._remove_pop()
+
+        self._change_jump_location_after_consequence(jump_position)
+
+    def compile_block(self, node: ast.BlockStatement, tail: bool = False) -> None:
+        """
+        tail: the block's value is returned from the function.
+        """
+        for i, statement in enumerate(node.statements):
+            last = i == len(node.statements) - 1
+            if tail and last and isinstance(statement, ast.ExpressionStatement):
+                self.compile_tail(statement.expression)
+                self.emit(code.OpCodes.POP)
+            else:
+                self.compile(statement)
+
+    def compile_tail(self, node: ast.Expression) -> None:
+        """
+        Compile an expression in tail position, so calls can reuse the frame.
+        """
+        match node:
+            case ast.Call():
+                self.compile_call(node, tail=True)
+            case ast.If():
+                self.compile_if(node, tail=True)
+            case _:
+                self.compile(node)
+
+    def compile_call(self, node: ast.Call, tail: bool = False) -> None:
+        """
+        tail: the call's result is returned straight away, so OpTailCall can
+        replace the current frame.
+        """
+        if not tail and (global_function := self._global_function(node.function)):
+            # Global slots are only set once, so reading the function after its
+            # arguments makes no difference.
+            for arg in node.arguments:
+                self.compile(arg)
+            self.emit(
+                code.OpCodes.CALL_GLOBAL, global_function.index, len(node.arguments)
+            )
+            return
+
+        self.compile(node.function)
+        # Builtins don't push a frame, so there's none to reuse.
+        tail = tail and not self._last_instruction_is(code.OpCodes.GET_BUILTIN)
+
+        for arg in node.arguments:
+            self.compile(arg)
+
+        op_code = code.OpCodes.TAIL_CALL if tail else code.OpCodes.CALL
+        self.emit(op_code, len(node.arguments))
+
+    def compile_function(
+        self, node: ast.FunctionLiteral, name: str | None = None
+    ) -> None:
+        self.enter_scope()
+
+        if name is not None:
+            self.symbol_table.define_function_name(name)
+
+        for param in node.parameters:
+            self.symbol_table.define(param.value)
+
+        if node.body:
+            self.compile_block(node.body, tail=True)
+
+        if self._last_instruction_is(code.OpCodes.POP):
+            assert self.current_scope.last_instruction
+            self._replace_instruction(
+                self.current_scope.last_instruction.position,
+                code.make(code.OpCodes.RETURN_VALUE),
+            )
+        if not self._last_instruction_is(code.OpCodes.RETURN_VALUE):
+            self.emit(code.OpCodes.RETURN)
+
+        free_symbols = self.symbol_table.free_symbols
+        num_locals = self.symbol_table.num_definitions
+        func_scope_instructions = self.leave_scope()
+
+        for symbol in free_symbols:
+            self.load_symbol(symbol)
+
+        compiled_function = objects.CompiledFunction(
+            instructions=func_scope_instructions,
+            num_locals=num_locals,
+            num_params=len(node.parameters),
+        )
+        self.emit(
+            code.OpCodes.CLOSURE,
+            self._add_constant(compiled_function),
+            len(free_symbols),
+        )
+
+    def _global_function(self, function: ast.Expression) -> st.Symbol | None:
+        if self.optimization_level < 2 or not isinstance(function, ast.Identifier):
+            return None
+
+        symbol = self.symbol_table.resolve(function.value)
+        return symbol if symbol.scope == st.Scope.GLOBAL else None
+
     def bytecode(self) -> Bytecode:
+        superinstructions = self.optimization_level >= 2
+        if self.optimization_level < 1:
+            return Bytecode(
+                instructions=self.current_scope.instructions,
+                constants=self.constants,
+                num_globals=self.symbol_table.num_definitions,
+            )
+
+        constants: list[objects.Object] = []
+        for constant in self.constants:
+            if isinstance(constant, objects.CompiledFunction):
+                constant = objects.CompiledFunction(
+                    instructions=optimizer.optimize(
+                        constant.instructions,
+                        keep_result=False,
+                        superinstructions=superinstructions,
+                    ),
+                    num_locals=constant.num_locals,
+                    num_params=constant.num_params,
+                )
+            constants.append(constant)
+
         return Bytecode(
-            instructions=self.current_scope.instructions, constants=self.constants
+            instructions=optimizer.optimize(
+                self.current_scope.instructions,
+                keep_result=True,
+                superinstructions=superinstructions,
+            ),
+            constants=constants,
+            num_globals=self.symbol_table.num_definitions,
         )
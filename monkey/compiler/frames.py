@@ -17,3 +17,7 @@ class Frame:
     @property
     def instructions(self) -> code.Instructions:
         return self.closure.function.instructions
+
+    @property
+    def decoded(self) -> list[code.DecodedInstruction]:
+        return self.closure.function.decoded
@@ -0,0 +1,221 @@
+"""
+Peephole optimisations over compiled instructions.
+
+Instructions are decoded, rewritten until nothing changes and then encoded again,
+so jump targets are always recomputed from positions rather than byte offsets.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+
+from monkey.compiler import code
+
+
+CONSTANT = code.OpCodes.CONSTANT.as_int()
+POP = code.OpCodes.POP.as_int()
+TRUE = code.OpCodes.TRUE.as_int()
+FALSE = code.OpCodes.FALSE.as_int()
+NULL = code.OpCodes.NULL.as_int()
+JUMP = code.OpCodes.JUMP.as_int()
+JUMP_NOT_TRUTHY = code.OpCodes.JUMP_NOT_TRUTHY.as_int()
+RETURN = code.OpCodes.RETURN.as_int()
+RETURN_VALUE = code.OpCodes.RETURN_VALUE.as_int()
+SET_GLOBAL = code.OpCodes.SET_GLOBAL.as_int()
+GET_LOCAL = code.OpCodes.GET_LOCAL.as_int()
+ADD = code.OpCodes.ADD.as_int()
+SUBTRACT = code.OpCodes.SUBTRACT.as_int()
+GREATER_THAN = code.OpCodes.GREATER_THAN.as_int()
+
+JUMPS = frozenset(op.as_int() for op in code.JUMPS)
+# Nothing after these runs unless it's jumped to.
+TERMINATORS = frozenset((JUMP, RETURN, RETURN_VALUE))
+# Pushes without side effects, so pushing then popping straight away does nothing.
+PURE_PUSHES = frozenset((CONSTANT, TRUE, FALSE, NULL))
+# Leave the popped value behind for VM.last_popped_stack_elem.
+RESULT_POPS = frozenset((POP, SET_GLOBAL))
+
+Fuse = Callable[[list[code.DecodedInstruction]], code.DecodedInstruction]
+
+# Sequences replaced by a single op code, longest first. Picked from the most
+# common sequences reported by `python -m benchmarks.op_pairs`.
+SUPERINSTRUCTIONS: tuple[tuple[tuple[int, ...], Fuse], ...] = (
+    (
+        (GET_LOCAL, GET_LOCAL, ADD),
+        lambda seq: (code.OpCodes.ADD_LOCALS.as_int(), seq[0][1], seq[1][1]),
+    ),
+    (
+        (GET_LOCAL, CONSTANT, ADD),
+        lambda seq: (code.OpCodes.ADD_LOCAL_CONSTANT.as_int(), seq[0][1], seq[1][1]),
+    ),
+    (
+        (GET_LOCAL, CONSTANT, SUBTRACT),
+        lambda seq: (
+            code.OpCodes.SUBTRACT_LOCAL_CONSTANT.as_int(),
+            seq[0][1],
+            seq[1][1],
+        ),
+    ),
+    (
+        (GREATER_THAN, JUMP_NOT_TRUTHY),
+        lambda seq: (code.OpCodes.JUMP_NOT_GREATER_THAN.as_int(), seq[1][1], 0),
+    ),
+)
+
+
+def optimize(
+    instructions: code.Instructions,
+    keep_result: bool,
+    superinstructions: bool = False,
+) -> code.Instructions:
+    """
+    keep_result: keep the last popped value of the program around, ie. for the
+    main program where the VM reports it.
+
+    superinstructions: fuse common sequences once everything else is done.
+    """
+    decoded = code.decode(instructions)
+
+    changed = True
+    while changed:
+        decoded, changed = optimize_pass(decoded, keep_result)
+
+    if superinstructions:
+        decoded = fuse(decoded)
+
+    return code.encode(decoded)
+
+
+def optimize_pass(
+    decoded: list[code.DecodedInstruction], keep_result: bool
+) -> tuple[list[code.DecodedInstruction], bool]:
+    decoded = thread_jumps(decoded)
+    targets = jump_targets(decoded)
+
+    removed: set[int] = set()
+    replaced: dict[int, code.DecodedInstruction] = {}
+
+    last_result_pop = max(
+        (i for i, (op, _, _) in enumerate(decoded) if op in RESULT_POPS), default=-1
+    )
+
+    i = 0
+    while i < len(decoded):
+        op, operand, _ = decoded[i]
+        next_op = decoded[i + 1][0] if i + 1 < len(decoded) else None
+        # Nothing can land in the middle of a pair.
+        pair = next_op is not None and i + 1 not in targets
+
+        if op in TERMINATORS:
+            dead = i + 1
+            while dead < len(decoded) and dead not in targets:
+                removed.add(dead)
+                dead += 1
+            if op == JUMP and operand == dead:
+                removed.add(i)
+            i = dead
+            continue
+
+        if pair and op == TRUE and next_op == JUMP_NOT_TRUTHY:
+            removed.update((i, i + 1))
+            i += 2
+            continue
+
+        if pair and op == FALSE and next_op == JUMP_NOT_TRUTHY:
+            replaced[i] = (JUMP, decoded[i + 1][1], 0)
+            removed.add(i + 1)
+            i += 2
+            continue
+
+        if (
+            pair
+            and op in PURE_PUSHES
+            and next_op == POP
+            and not (keep_result and i + 1 == last_result_pop)
+        ):
+            removed.update((i, i + 1))
+            i += 2
+            continue
+
+        i += 1
+
+    if not removed and not replaced:
+        return decoded, False
+    return rebuild(decoded, removed, replaced), True
+
+
+def fuse(decoded: list[code.DecodedInstruction]) -> list[code.DecodedInstruction]:
+    targets = jump_targets(decoded)
+
+    removed: set[int] = set()
+    replaced: dict[int, code.DecodedInstruction] = {}
+
+    i = 0
+    while i < len(decoded):
+        for pattern, fused in SUPERINSTRUCTIONS:
+            end = i + len(pattern)
+            sequence = decoded[i:end]
+            if (
+                tuple(op for op, _, _ in sequence) == pattern
+                # Jumping into the middle of a sequence would skip part of it.
+                and not targets.intersection(range(i + 1, end))
+            ):
+                replaced[i] = fused(sequence)
+                removed.update(range(i + 1, end))
+                i = end
+                break
+        else:
+            i += 1
+
+    return rebuild(decoded, removed, replaced)
+
+
+def thread_jumps(
+    decoded: list[code.DecodedInstruction],
+) -> list[code.DecodedInstruction]:
+    """
+    Point jumps that land on an unconditional jump at its target instead.
+    """
+    threaded: list[code.DecodedInstruction] = []
+    for op, target, extra_operand in decoded:
+        if op in JUMPS:
+            seen: set[int] = set()
+            while (
+                target < len(decoded)
+                and decoded[target][0] == JUMP
+                and target not in seen
+            ):
+                seen.add(target)
+                target = decoded[target][1]
+        threaded.append((op, target, extra_operand))
+    return threaded
+
+
+def jump_targets(decoded: list[code.DecodedInstruction]) -> set[int]:
+    return {operand for op, operand, _ in decoded if op in JUMPS}
+
+
+def rebuild(
+    decoded: list[code.DecodedInstruction],
+    removed: set[int],
+    replaced: dict[int, code.DecodedInstruction],
+) -> list[code.DecodedInstruction]:
+    # Removed instructions hand their position on to the next one that's kept.
+    new_positions: list[int] = []
+    kept = 0
+    for i in range(len(decoded)):
+        new_positions.append(kept)
+        if i not in removed:
+            kept += 1
+    new_positions.append(kept)
+
+    rebuilt: list[code.DecodedInstruction] = []
+    for i, instruction in enumerate(decoded):
+        if i in removed:
+            continue
+
+        op, operand, extra_operand = replaced.get(i, instruction)
+        if op in JUMPS:
+            operand = new_positions[operand]
+        rebuilt.append((op, operand, extra_operand))
+    return rebuilt
@@ -0,0 +1,309 @@
+"""
+Runtime support for Python transpiled from Monkey, see transpile.py.
+
+Values are plain Python ones - int, str, bool, None for null, lists for arrays,
+dicts for hashes and functions for functions. Anything off the fast paths is
+converted to objects.Object and handed to evaluate or the builtins, so the
+semantics, including error messages, are theirs.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+import dataclasses as dc
+
+from monkey.interpreter import environment, evaluate, objects
+
+
+# Hashes map the key itself to (key, value), or for true and false their
+# objects.HashKey so that, as there, they're different keys to 1 and 0.
+HashKey = int | str | objects.HashKey
+
+# Returned by a program whose last statement has no value, ie. a let.
+NOTHING = object()
+
+# Held by a variable until its let runs, and by parameters given no argument.
+UNBOUND = object()
+
+
+class MonkeyError(Exception):
+    def __init__(self, error: objects.Error) -> None:
+        super().__init__(error.message)
+        self.error = error
+
+
+@dc.dataclass(frozen=True, slots=True)
+class Function(objects.Function):
+    """
+    A transpiled function as an object, so it can be inspected or passed
+    through the builtins.
+    """
+
+    python: Callable[..., object] = dc.field(kw_only=True)
+
+
+def truthy(value: object) -> bool:
+    return value is not None and value is not False
+
+
+def to_object(value: object) -> objects.Object:
+    match value:
+        case bool():
+            return objects.boolean(value)
+        case int():
+            return objects.integer(value)
+        case str():
+            return objects.String(value=value)
+        case None:
+            return objects.NULL
+        case list():
+            return objects.Array(items=[to_object(item) for item in value])
+        case dict():
+            pairs: dict[objects.HashKey, objects.HashPair] = {}
+            for key, item in value.values():
+                key_object = to_object(key)
+                assert isinstance(key_object, objects.Hashable)
+                pairs[key_object.hash_key()] = objects.HashPair(
+                    key=key_object, value=to_object(item)
+                )
+            return objects.Hash(pairs=pairs)
+        case objects.Object():
+            # Closures and errors held by unboxed.UnboxedVM, ranges and streams.
+            return value
+        case _ if builtin := getattr(value, "builtin", None):
+            return builtin
+        case _ if literal := getattr(value, "literal", None):
+            assert callable(value)
+            env = environment.Environment()
+            return Function(literal.body, env, literal.parameters, python=value)
+        case _:
+            raise NotImplementedError(type(value))
+
+
+def from_object(obj: objects.Object | None) -> object:
+    """
+    Raises MonkeyError for errors.
+    """
+    match obj:
+        case objects.Integer() | objects.Boolean() | objects.String():
+            return obj.value
+        case objects.Null() | None:
+            return None
+        case objects.Array():
+            return [from_object(item) for item in obj.items]
+        case objects.Hash():
+            return {
+                key_of(from_object(pair.key)): (
+                    from_object(pair.key),
+                    from_object(pair.value),
+                )
+                for pair in obj.pairs.values()
+            }
+        case objects.Error():
+            raise MonkeyError(obj)
+        case Function():
+            return obj.python
+        case objects.BuiltInFunction():
+            return BY_OBJECT[obj]
+        case objects.Closure() | objects.CompiledFunction():
+            # Kept as they are by unboxed.UnboxedVM.
+            return obj
+        case objects.Range() | objects.Stream():
+            # Kept as they are, so they stay lazy.
+            return obj
+        case _:
+            raise NotImplementedError(type(obj))
+
+
+BOOLEAN_KEYS = {True: objects.TRUE.hash_key(), False: objects.FALSE.hash_key()}
+
+
+def key_of(key: object) -> HashKey:
+    if type(key) is bool:
+        return BOOLEAN_KEYS[key]
+    if type(key) not in (int, str):
+        raise MonkeyError(
+            objects.Error(message=f"unusable as hash key: {to_object(key).type}")
+        )
+    return key  # type: ignore[return-value]
+
+
+def missing(name: str) -> object:
+    raise MonkeyError(
+        objects.Error(message=f"{objects.ErrorTypes.MISSING_IDENTIFIER}: {name}")
+    )
+
+
+def uncallable(value: object) -> Callable[..., object]:
+    """
+    Called in place of a value that isn't a function, for evaluate's error.
+    """
+
+    def call(*args: object) -> object:
+        arguments = [to_object(arg) for arg in args]
+        return from_object(evaluate.function(to_object(value), arguments))
+
+    return call
+
+
+def infix(operator: str, left: object, right: object) -> object:
+    if operator == "+" and type(left) is str and type(right) is str:
+        return left + right
+    return from_object(
+        evaluate.infix_expression(to_object(left), operator, to_object(right))
+    )
+
+
+def prefix(operator: str, right: object) -> object:
+    return from_object(evaluate.prefix_expression(operator, to_object(right)))
+
+
+def index(left: object, idx: object) -> object:
+    if type(left) is list and type(idx) is int and 0 <= idx < len(left):
+        return left[idx]
+    if type(left) is dict and type(idx) in (int, str, bool):
+        if pair := left.get(key_of(idx)):
+            return pair[1]
+    return from_object(evaluate.index_expression(to_object(left), to_object(idx)))
+
+
+def hash(*pairs: tuple[object, object]) -> dict[HashKey, tuple[object, object]]:
+    return {key_of(key): (key, value) for key, value in pairs}
+
+
+def call_builtin(name: str, args: tuple[object, ...]) -> object:
+    builtin = objects.BUILTIN_MAP[name]
+    return from_object(builtin.function(*[to_object(arg) for arg in args]))
+
+
+def caller(function: objects.Object) -> Callable[..., objects.Object]:
+    """
+    For builtins calling the transpiled functions they're given, see
+    objects.CALLERS. A call that fails gives its error, so a stream mapped or
+    filtered through it ends there.
+    """
+    assert isinstance(function, Function)
+
+    def call(*args: objects.Object) -> objects.Object:
+        try:
+            return to_object(function.python(*[from_object(arg) for arg in args]))
+        except MonkeyError as exc:
+            return exc.error
+
+    return call
+
+
+objects.CALLERS[Function] = caller
+
+
+# Builtins, with fast paths for the common cases.
+def len_(*args: object) -> object:
+    if len(args) == 1 and type(args[0]) in (str, list):
+        return len(args[0])  # type: ignore[arg-type]
+    return call_builtin("len", args)
+
+
+def first(*args: object) -> object:
+    if len(args) == 1 and type(arg := args[0]) is list:
+        return arg[0] if arg else None
+    return call_builtin("first", args)
+
+
+def last(*args: object) -> object:
+    if len(args) == 1 and type(arg := args[0]) is list:
+        return arg[-1] if arg else None
+    return call_builtin("last", args)
+
+
+def rest(*args: object) -> object:
+    if len(args) == 1 and type(arg := args[0]) is list:
+        return arg[1:]
+    return call_builtin("rest", args)
+
+
+def push(*args: object) -> object:
+    if len(args) == 2 and type(arg := args[0]) is list:
+        return [*arg, args[1]]
+    return call_builtin("push", args)
+
+
+def set_(*args: object) -> object:
+    if len(args) == 3 and type(arg := args[0]) is dict:
+        return {**arg, key_of(args[1]): (args[1], args[2])}
+    return call_builtin("set", args)
+
+
+def delete(*args: object) -> object:
+    if len(args) == 2 and type(arg := args[0]) is dict:
+        key = key_of(args[1])
+        return {k: pair for k, pair in arg.items() if k != key}
+    return call_builtin("delete", args)
+
+
+def merge(*args: object) -> object:
+    if len(args) == 2 and type(args[0]) is dict and type(args[1]) is dict:
+        return {**args[0], **args[1]}
+    return call_builtin("merge", args)
+
+
+def join(*args: object) -> object:
+    if len(args) in (1, 2) and type(arg := args[0]) is list:
+        separator = args[1] if len(args) == 2 else ""
+        if type(separator) is str and all(type(item) is str for item in arg):
+            return separator.join(arg)
+    return call_builtin("join", args)
+
+
+def range_(*args: object) -> object:
+    return call_builtin("range", args)
+
+
+def map_(*args: object) -> object:
+    return call_builtin("map", args)
+
+
+def filter_(*args: object) -> object:
+    return call_builtin("filter", args)
+
+
+def reduce(*args: object) -> object:
+    return call_builtin("reduce", args)
+
+
+def sum_(*args: object) -> object:
+    if len(args) == 1 and type(arg := args[0]) is list:
+        if all(type(item) is int for item in arg):
+            return sum(arg)  # type: ignore[arg-type]
+    return call_builtin("sum", args)
+
+
+def take(*args: object) -> object:
+    return call_builtin("take", args)
+
+
+def puts(*args: object) -> object:
+    return call_builtin("puts", args)
+
+
+BUILTINS: dict[str, Callable[..., object]] = {
+    "len": len_,
+    "puts": puts,
+    "first": first,
+    "last": last,
+    "rest": rest,
+    "push": push,
+    "set": set_,
+    "delete": delete,
+    "merge": merge,
+    "join": join,
+    "range": range_,
+    "map": map_,
+    "filter": filter_,
+    "reduce": reduce,
+    "sum": sum_,
+    "take": take,
+}
+for name, function in BUILTINS.items():
+    setattr(function, "builtin", objects.BUILTIN_MAP[name])
+
+BY_OBJECT = {objects.BUILTIN_MAP[name]: function for name, function in BUILTINS.items()}
@@ -17,6 +17,7 @@ class Scope(enum.StrEnum):
     LOCAL = "LOCAL"
     BUILTIN = "BUILTIN"
     FREE = "FREE"
+    FUNCTION = "FUNCTION"
 
 
 @dc.dataclass(frozen=True)
@@ -69,6 +70,11 @@ class SymbolTable:
         self.store[name] = symbol
         return symbol
 
+    def define_function_name(self, name: str) -> Symbol:
+        symbol = Symbol(name, Scope.FUNCTION, 0)
+        self.store[name] = symbol
+        return symbol
+
     def resolve(self, identifier: str) -> Symbol:
         try:
             return self.store[identifier]
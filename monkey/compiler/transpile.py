@@ -0,0 +1,411 @@
+"""
+Transpile Monkey to Python source, then compile() and exec() it.
+
+Monkey functions become nested defs and lets become Python variables, so calls
+and lookups are CPython's own. Integer arithmetic and comparisons are inlined
+with a type check, everything else goes through runtime.py, which falls back
+to evaluate so results and error messages match evaluate.node.
+
+As there, a name read before its let has run is the enclosing function's, and
+a parameter not given an argument is unbound. Variables that may be read
+unbound start out as runtime.UNBOUND, and those reads fall back to the
+enclosing binding.
+"""
+
+from __future__ import annotations
+
+import dataclasses as dc
+import types
+
+from monkey.compiler import runtime
+from monkey.interpreter import ast, objects, resolver
+
+
+Lowered = tuple[list[str], str]  # Statements to run first, then the expression.
+
+# Operators inlined for integers, with their Python spelling.
+INTEGER_OPERATORS = {
+    "+": "+",
+    "-": "-",
+    "*": "*",
+    "/": "//",
+    "<": "<",
+    ">": ">",
+    "==": "==",
+    "!=": "!=",
+}
+COMPARISONS = ("<", ">", "==", "!=")
+
+LITERALS = (ast.IntegerLiteral, ast.StringLiteral, ast.BooleanLiteral)
+
+INDENT = "    "
+
+
+def mangle(name: str, depth: int = 0) -> str:
+    # Keeps Monkey names clear of Python keywords, builtins and temporaries,
+    # and a function's own from those it shadows.
+    return f"m{depth or ''}_{name}"
+
+
+def indent(lines: list[str]) -> list[str]:
+    return [f"{INDENT}{line}" for line in lines]
+
+
+@dc.dataclass
+class Transpiled:
+    source: str
+    code: object  # types.CodeType
+    literals: list[ast.FunctionLiteral]
+
+    def run(self) -> objects.Object | None:
+        namespace: dict[str, object] = {
+            "rt": runtime,
+            "LITERALS": self.literals,
+            "UNBOUND": runtime.UNBOUND,
+            "FUNCTION": types.FunctionType,
+            **{f"B_{name}": f for name, f in runtime.BUILTINS.items()},
+        }
+        exec(self.code, namespace)  # type: ignore[call-overload]
+
+        try:
+            result = namespace["main"]()  # type: ignore[operator]
+        except runtime.MonkeyError as exc:
+            return exc.error
+
+        if result is runtime.NOTHING:
+            return None
+        return runtime.to_object(result)
+
+
+def run(program: ast.Program) -> objects.Object | None:
+    return transpile(program).run()
+
+
+def transpile(program: ast.Program) -> Transpiled:
+    transpiler = Transpiler()
+    source = "\n".join(transpiler.program(program)) + "\n"
+    code = compile(source, "<monkey>", "exec")
+    return Transpiled(source=source, code=code, literals=transpiler.literals)
+
+
+@dc.dataclass
+class Scope:
+    """
+    The names a function, or the program, binds.
+    """
+
+    # The Python variable for each.
+    variables: dict[str, str]
+    parameters: tuple[str, ...] = ()
+    # Bound however the code being transpiled was reached.
+    bound: set[str] = dc.field(default_factory=set)
+    # Read here or by nested functions.
+    reads: set[str] = dc.field(default_factory=set)
+    # Read where they may not be bound yet, so they start out UNBOUND.
+    unbound_reads: set[str] = dc.field(default_factory=set)
+    # Only ever bound to functions, so calling them needs no check.
+    functions: set[str] = dc.field(default_factory=set)
+
+    def unbound(self) -> list[str]:
+        names = [
+            variable
+            for name, variable in self.variables.items()
+            if name in self.unbound_reads and name not in self.parameters
+        ]
+        return [f"{' = '.join(names)} = UNBOUND"] if names else []
+
+
+@dc.dataclass
+class Transpiler:
+    literals: list[ast.FunctionLiteral] = dc.field(default_factory=list)
+    # The enclosing functions, innermost last.
+    scopes: list[Scope] = dc.field(default_factory=list)
+    temps: int = 0
+
+    def temp(self, prefix: str = "t") -> str:
+        self.temps += 1
+        return f"_{prefix}{self.temps}"
+
+    def scope(
+        self, statements: list[ast.Statement], parameters: tuple[str, ...] = ()
+    ) -> Scope:
+        lets = list(resolver.lets(statements))
+        names = dict.fromkeys([*parameters, *(let.name.value for let in lets)])
+        depth = len(self.scopes)
+        variables = {
+            name: mangle(name, depth if self.bound_outside(name) else 0)
+            for name in names
+        }
+        values = {
+            let.name.value
+            for let in lets
+            if not isinstance(let.value, ast.FunctionLiteral)
+        }
+        functions = set(names) - set(parameters) - values
+        return Scope(variables, parameters, bound=set(parameters), functions=functions)
+
+    def bound_outside(self, name: str) -> bool:
+        return any(name in scope.variables for scope in self.scopes)
+
+    def program(self, node: ast.Program) -> list[str]:
+        scope = self.scope(node.statements)
+        self.scopes.append(scope)
+        statements, value = self.block(node.statements, nothing="rt.NOTHING")
+        self.scopes.pop()
+        return [
+            "def main():",
+            *indent([*scope.unbound(), *statements, f"return {value}"]),
+        ]
+
+    def block(self, statements: list[ast.Statement], nothing: str = "None") -> Lowered:
+        """
+        The block's value is its last statement's, or nothing if that's a let.
+        """
+        lines: list[str] = []
+        for statement in statements[:-1]:
+            lines.extend(self.statement(statement))
+
+        if not statements:
+            return lines, "None"
+
+        match last := statements[-1]:
+            case ast.ExpressionStatement():
+                before, value = self.expression(last.expression)
+                return [*lines, *before], value
+            case _:
+                return [*lines, *self.statement(last)], nothing
+
+    def statement(self, node: ast.Statement) -> list[str]:
+        scope = self.scopes[-1]
+        match node:
+            case ast.Let(value=ast.FunctionLiteral()):
+                assert isinstance(node.value, ast.FunctionLiteral)
+                # A def, so the function can call itself by name.
+                scope.bound.add(node.name.value)
+                variable = scope.variables[node.name.value]
+                return self.function(node.value, variable)
+            case ast.Let():
+                before, value = self.expression(node.value)
+                scope.bound.add(node.name.value)
+                return [*before, f"{scope.variables[node.name.value]} = {value}"]
+            case ast.Return():
+                before, value = self.expression(node.value)
+                return [*before, f"return {value}"]
+            case ast.ExpressionStatement():
+                before, value = self.expression(node.expression)
+                if value.isidentifier() or value in ("None", "True", "False"):
+                    # Nothing left to run.
+                    return before
+                return [*before, value]
+            case _:
+                raise NotImplementedError(str(type(node)))
+
+    def expression(self, node: ast.Expression | None) -> Lowered:
+        match node:
+            case ast.IntegerLiteral() | ast.StringLiteral():
+                return [], repr(node.value)
+            case ast.BooleanLiteral():
+                return [], "True" if node.value else "False"
+            case ast.Identifier():
+                return [], self.identifier(node.value)
+            case ast.Prefix():
+                return self.prefix(node)
+            case ast.Infix():
+                return self.infix(node)
+            case ast.If():
+                return self.if_expression(node)
+            case ast.ArrayLiteral():
+                before, items = self.sequence(node.items)
+                return before, f"[{', '.join(items)}]"
+            case ast.Map():
+                nodes = [n for pair in node.pairs.items() for n in pair]
+                before, values = self.sequence(nodes)
+                pairs = [f"({k}, {v})" for k, v in zip(values[::2], values[1::2])]
+                return before, f"rt.hash({', '.join(pairs)})"
+            case ast.Index():
+                before, (left, idx) = self.sequence([node.left, node.index])
+                return before, f"rt.index({left}, {idx})"
+            case ast.FunctionLiteral():
+                name = self.temp("f")
+                return self.function(node, name), name
+            case ast.Call():
+                before, (function, *arguments) = self.sequence(
+                    [node.function, *node.arguments]
+                )
+                function = self.callee(node.function, function)
+                return before, f"{function}({', '.join(arguments)})"
+            case _:
+                raise NotImplementedError(str(type(node)))
+
+    def sequence(self, nodes: list[ast.Expression]) -> tuple[list[str], list[str]]:
+        """
+        Lower nodes evaluated left to right. If a later one needs statements
+        first, earlier values are saved to temporaries before them.
+        """
+        lowered = [self.expression(node) for node in nodes]
+        lines: list[str] = []
+        values: list[str] = []
+        for i, (before, value) in enumerate(lowered):
+            lines.extend(before)
+            if not isinstance(nodes[i], LITERALS) and any(
+                later for later, _ in lowered[i + 1 :]
+            ):
+                temp = self.temp()
+                lines.append(f"{temp} = {value}")
+                value = temp
+            values.append(value)
+        return lines, values
+
+    def identifier(self, name: str) -> str:
+        """
+        The innermost binding, or if that may not be bound yet, a check falling
+        back to the next one out.
+        """
+        scopes: list[Scope] = []
+        for scope in reversed(self.scopes):
+            if name in scope.variables:
+                scope.reads.add(name)
+                scopes.append(scope)
+                if name in scope.bound:
+                    break
+
+        if scopes and name in scopes[-1].bound:
+            value = scopes.pop().variables[name]
+        elif name in runtime.BUILTINS:
+            value = f"B_{name}"
+        else:
+            value = f"rt.missing({name!r})"
+
+        for scope in reversed(scopes):
+            scope.unbound_reads.add(name)
+            t = self.temp()
+            variable = scope.variables[name]
+            value = f"({t} if ({t} := {variable}) is not UNBOUND else {value})"
+        return value
+
+    def callee(self, node: ast.Expression, function: str) -> str:
+        if isinstance(node, ast.FunctionLiteral):
+            return function
+        if isinstance(node, ast.Identifier):
+            name = node.value
+            if function == f"B_{name}":
+                return function
+            for scope in reversed(self.scopes):
+                if name in scope.variables:
+                    # Read straight from a variable that only holds functions.
+                    if function == scope.variables[name] and name in scope.functions:
+                        return function
+                    break
+        # Anything else may not be a function at all.
+        t = self.temp()
+        return f"({t} if type({t} := {function}) is FUNCTION else rt.uncallable({t}))"
+
+    def prefix(self, node: ast.Prefix) -> Lowered:
+        before, right = self.expression(node.right)
+        match node.operator:
+            case "!" if isinstance(node.right, LITERALS):
+                return before, "True" if node.right.value is False else "False"
+            case "!":
+                # Like evaluate, only false is falsy here.
+                return before, f"({right} is False)"
+            case "-":
+                t = self.temp()
+                fast = f"-{t} if type({t} := {right}) is int"
+                return before, f"({fast} else rt.prefix('-', {t}))"
+            case operator:
+                return before, f"rt.prefix({operator!r}, {right})"
+
+    def infix(self, node: ast.Infix) -> Lowered:
+        assert node.right
+        before, (left, right) = self.sequence([node.left, node.right])
+        operator = node.operator
+        if operator not in INTEGER_OPERATORS:
+            return before, f"rt.infix({operator!r}, {left}, {right})"
+
+        # Integer literals need neither a temporary nor a check.
+        checks: list[str] = []
+        operands: list[str] = []
+        for operand, value in ((node.left, left), (node.right, right)):
+            if isinstance(operand, ast.IntegerLiteral):
+                operands.append(value)
+                continue
+            t = self.temp()
+            checks.append(f"(type({t} := {value}) is int)")
+            operands.append(t)
+
+        a, b = operands
+        fast = f"{a} {INTEGER_OPERATORS[operator]} {b}"
+        slow = f"rt.infix({operator!r}, {a}, {b})"
+        if not checks:
+            return before, f"({fast})"
+        return before, f"({fast} if {' & '.join(checks)} else {slow})"
+
+    def condition(self, node: ast.Expression) -> Lowered:
+        before, value = self.expression(node)
+        match node:
+            case ast.Infix(operator=operator) if operator in COMPARISONS:
+                # Always a bool.
+                return before, value
+            case ast.Prefix(operator="!"):
+                return before, value
+        t = self.temp()
+        return before, f"(({t} := {value}) is not None and {t} is not False)"
+
+    def if_expression(self, node: ast.If) -> Lowered:
+        before, condition = self.condition(node.condition)
+        # Only what both branches bind is bound after them.
+        scope = self.scopes[-1]
+        bound = set(scope.bound)
+        consequence = self.branch(node.consequence)
+        after, scope.bound = scope.bound, bound
+        alternative = self.branch(node.alternative)
+        scope.bound &= after
+
+        if not consequence[0] and not alternative[0]:
+            value = f"({consequence[1]} if {condition} else {alternative[1]})"
+            return before, value
+
+        result = self.temp()
+        lines = [
+            *before,
+            f"if {condition}:",
+            *indent([*consequence[0], f"{result} = {consequence[1]}"]),
+            "else:",
+            *indent([*alternative[0], f"{result} = {alternative[1]}"]),
+        ]
+        return lines, result
+
+    def branch(self, block: ast.BlockStatement | None) -> Lowered:
+        if block is None:
+            return [], "None"
+        return self.block(block.statements)
+
+    def function(self, node: ast.FunctionLiteral, name: str) -> list[str]:
+        assert node.body
+        parameters = tuple(parameter.value for parameter in node.parameters)
+        scope = self.scope(node.body.statements, parameters)
+        self.scopes.append(scope)
+        statements, value = self.block(node.body.statements)
+        self.scopes.pop()
+
+        # Extra arguments are ignored. Parameters missing theirs are unbound, so
+        # the function gets the enclosing binding, on entry if it reads them.
+        variables = [scope.variables[p] for p in parameters]
+        signature = [*(f"{variable}=UNBOUND" for variable in variables), "*_"]
+        missing: list[str] = []
+        for parameter, variable in zip(parameters, variables):
+            if parameter in scope.reads:
+                fallback = f"{variable} = {self.identifier(parameter)}"
+                if variable != variables[-1]:
+                    missing.extend([f"if {variable} is UNBOUND:", INDENT + fallback])
+                else:
+                    missing.append(fallback)
+        if missing:
+            missing = [f"if {variables[-1]} is UNBOUND:", *indent(missing)]
+
+        self.literals.append(node)
+        return [
+            f"def {name}({', '.join(signature)}):",
+            *indent([*missing, *scope.unbound(), *statements, f"return {value}"]),
+            f"{name}.literal = LITERALS[{len(self.literals) - 1}]",
+        ]
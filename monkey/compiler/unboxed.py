@@ -0,0 +1,291 @@
+"""
+An experimental VM whose stack holds plain Python values instead of objects.
+
+Values are runtime.py's - int, bool and str, None for null, lists for arrays
+and dicts of runtime.key_of(key) to (key, value) for hashes - while closures,
+builtins, errors, ranges and streams stay objects. Values are boxed back into
+objects only where they leave the VM, in last_popped_stack_elem, builtins off
+runtime's fast paths and closures called back from builtins, so arithmetic and
+comparisons skip making wrappers and the isinstance checks.
+
+Unlike vm.VM, a None on the stack is null rather than a missing value, so
+globals and lets not set yet hold UNSET instead.
+"""
+
+from __future__ import annotations
+
+from typing import cast
+
+from monkey.compiler import code, compilers, runtime, vm
+from monkey.interpreter import objects
+
+
+COMPARABLE = (int, bool)
+HASHABLE = (int, str, bool)
+
+UNSET = object()
+
+
+def unboxed_constants(bytecode: compilers.Bytecode) -> list[objects.Object]:
+    # Typed as objects for vm.VM, but plain values.
+    return [runtime.from_object(c) for c in bytecode.constants]  # type: ignore[misc]
+
+
+class UnboxedVM(vm.VM):
+    UNSET = UNSET
+
+    @classmethod
+    def from_bytecode(
+        cls,
+        bytecode: compilers.Bytecode,
+        state: list[objects.Object | None] | None = None,
+        max_stack: int = vm.STACK_SIZE,
+        max_frames: int = vm.MAX_FRAMES,
+    ) -> UnboxedVM:
+        machine = super().from_bytecode(bytecode, state, max_stack, max_frames)
+        machine.constants = unboxed_constants(bytecode)
+        return cast(UnboxedVM, machine)
+
+    def reset(self, bytecode: compilers.Bytecode) -> None:
+        super().reset(bytecode)
+        self.constants = unboxed_constants(bytecode)
+
+    def dispatch(self) -> tuple[vm.Handler, ...]:
+        return DISPATCH
+
+    @property
+    def last_popped_stack_elem(self) -> objects.Object:
+        if self.stack_pointer < len(self.stack):
+            return runtime.to_object(self.stack[self.stack_pointer])
+        raise vm.Empty
+
+    def push(self, value: object) -> None:
+        if self.stack_pointer >= len(self.stack):
+            self.reserve_stack(self.stack_pointer + 1)
+
+        self.stack[self.stack_pointer] = value  # type: ignore[assignment]
+        self.stack_pointer += 1
+
+    def pop(self) -> objects.Object:
+        if self.stack_pointer <= 0:
+            raise vm.Empty
+
+        self.stack_pointer -= 1
+        return self.stack[self.stack_pointer]  # type: ignore[return-value]
+
+    # Op code handlers which differ from vm.VM's. Binary operations work on
+    # the top of the stack in place, compiled code never leaves it short.
+    def op_add(self, _: int, __: int) -> int | None:
+        stack = cast(list[object], self.stack)
+        top = self.stack_pointer - 1
+        left, right = stack[top - 1], stack[top]
+        if type(left) is int and type(right) is int:
+            stack[top - 1] = left + right
+        elif type(left) is str and type(right) is str:
+            stack[top - 1] = left + right
+        else:
+            raise NotImplementedError(code.OpCodes.ADD, left, right)
+        self.stack_pointer = top
+        return None
+
+    def op_subtract(self, _: int, __: int) -> int | None:
+        stack = cast(list[object], self.stack)
+        top = self.stack_pointer - 1
+        left, right = stack[top - 1], stack[top]
+        if type(left) is not int or type(right) is not int:
+            raise NotImplementedError(code.OpCodes.SUBTRACT, left, right)
+        stack[top - 1] = left - right
+        self.stack_pointer = top
+        return None
+
+    def op_multiply(self, _: int, __: int) -> int | None:
+        stack = cast(list[object], self.stack)
+        top = self.stack_pointer - 1
+        left, right = stack[top - 1], stack[top]
+        if type(left) is not int or type(right) is not int:
+            raise NotImplementedError(code.OpCodes.MULTIPLY, left, right)
+        stack[top - 1] = left * right
+        self.stack_pointer = top
+        return None
+
+    def op_divide(self, _: int, __: int) -> int | None:
+        stack = cast(list[object], self.stack)
+        top = self.stack_pointer - 1
+        left, right = stack[top - 1], stack[top]
+        if type(left) is not int or type(right) is not int:
+            raise NotImplementedError(code.OpCodes.DIVIDE, left, right)
+        stack[top - 1] = left // right
+        self.stack_pointer = top
+        return None
+
+    def op_true(self, _: int, __: int) -> int | None:
+        self.push(True)
+        return None
+
+    def op_false(self, _: int, __: int) -> int | None:
+        self.push(False)
+        return None
+
+    def op_null(self, _: int, __: int) -> int | None:
+        self.push(None)
+        return None
+
+    def op_equal(self, _: int, __: int) -> int | None:
+        stack = cast(list[object], self.stack)
+        top = self.stack_pointer - 1
+        left, right = stack[top - 1], stack[top]
+        if type(left) is not type(right) or type(left) not in COMPARABLE:
+            raise vm.Unhandled(f"{code.OpCodes.EQUAL} between {left} and {right}")
+        stack[top - 1] = left == right
+        self.stack_pointer = top
+        return None
+
+    def op_not_equal(self, _: int, __: int) -> int | None:
+        stack = cast(list[object], self.stack)
+        top = self.stack_pointer - 1
+        left, right = stack[top - 1], stack[top]
+        if type(left) is not type(right) or type(left) not in COMPARABLE:
+            raise vm.Unhandled(f"{code.OpCodes.NOT_EQUAL} between {left} and {right}")
+        stack[top - 1] = left != right
+        self.stack_pointer = top
+        return None
+
+    def op_greater_than(self, _: int, __: int) -> int | None:
+        stack = cast(list[object], self.stack)
+        top = self.stack_pointer - 1
+        left, right = stack[top - 1], stack[top]
+        if type(left) is not int or type(right) is not int:
+            raise vm.Unhandled(f"{code.OpCodes.GREATER_THAN} between {left}, {right}")
+        stack[top - 1] = left > right
+        self.stack_pointer = top
+        return None
+
+    def op_minus(self, _: int, __: int) -> int | None:
+        operand: object = self.pop()
+        if type(operand) is not int:
+            raise vm.Unhandled(operand)
+        self.push(-operand)
+        return None
+
+    def op_exclaimation_mark(self, _: int, __: int) -> int | None:
+        operand: object = self.pop()
+        self.push(operand is False or operand is None)
+        return None
+
+    def op_jump_not_truthy(self, position: int, _: int) -> int | None:
+        # Like vm.is_truthy, only false is falsy.
+        if self.pop() is False:  # type: ignore[comparison-overlap]
+            return position
+        return None
+
+    def op_get_global(self, global_index: int, _: int) -> int | None:
+        value: object = self.globals[global_index]
+        if value is UNSET:
+            raise vm.Missing(f"Global {global_index} read before it's set")
+        self.push(value)
+        return None
+
+    def op_get_local(self, local_index: int, _: int) -> int | None:
+        value: object = self.stack[self.base_pointer + local_index]
+        if value is UNSET:
+            raise vm.Missing(f"Local {local_index} read before it's set")
+        self.push(value)
+        return None
+
+    def op_return(self, _: int, __: int) -> int | None:
+        frame = self.pop_frame()
+        self.stack_pointer = frame.base_pointer - 1
+        self.push(None)
+        return vm.FRAME_CHANGED
+
+    def op_add_locals(self, first_index: int, second_index: int) -> int | None:
+        self.op_get_local(first_index, 0)
+        self.op_get_local(second_index, 0)
+        return self.op_add(0, 0)
+
+    def op_add_local_constant(self, local_index: int, const_index: int) -> int | None:
+        left: object = self.stack[self.base_pointer + local_index]
+        right: object = self.constants[const_index]
+        if type(left) is int and type(right) is int:
+            self.push(left + right)
+            return None
+
+        self.op_get_local(local_index, 0)
+        self.push(right)
+        return self.op_add(0, 0)
+
+    def op_subtract_local_constant(
+        self, local_index: int, const_index: int
+    ) -> int | None:
+        left: object = self.stack[self.base_pointer + local_index]
+        right: object = self.constants[const_index]
+        if type(left) is not int or type(right) is not int:
+            if left is UNSET:
+                raise vm.Missing(f"Local {local_index} read before it's set")
+            raise NotImplementedError(code.OpCodes.SUBTRACT, left, right)
+        self.push(left - right)
+        return None
+
+    def op_jump_not_greater_than(self, position: int, _: int) -> int | None:
+        stack = cast(list[object], self.stack)
+        top = self.stack_pointer - 1
+        left, right = stack[top - 1], stack[top]
+        if type(left) is not int or type(right) is not int:
+            raise vm.Unhandled(f"{code.OpCodes.GREATER_THAN} between {left}, {right}")
+        self.stack_pointer = top - 1
+        return None if left > right else position
+
+    def op_index(self, _: int, __: int) -> int | None:
+        index: object = self.pop()
+        left: object = self.pop()
+        if type(left) is list and type(index) is int:
+            if not 0 <= index <= len(left):
+                raise vm.BadIndex(f"{index} on array ({len(left)} items)")
+            try:
+                self.push(left[index])
+            except IndexError as exc:
+                raise vm.Missing from exc
+        elif type(left) is dict and type(index) in HASHABLE:
+            try:
+                self.push(left[runtime.key_of(index)][1])
+            except KeyError as exc:
+                raise vm.Missing from exc
+        else:
+            raise vm.Unhandled(f"Indexing not on {type(left)} with {type(index)}")
+        return None
+
+    def build_array(self, start: int, end: int) -> objects.Array:
+        return self.stack[start:end]  # type: ignore[return-value]
+
+    def build_hash_map(self, start: int, end: int) -> objects.Hash:
+        pairs: dict[runtime.HashKey, tuple[object, object]] = {}
+        for i in range(start, end, 2):
+            key = self.stack[i]
+            assert type(key) in HASHABLE, f"Key: {key}"
+            pairs[runtime.key_of(key)] = (key, self.stack[i + 1])
+        return pairs  # type: ignore[return-value]
+
+    def call_closure(
+        self, closure: objects.Closure, *args: objects.Object
+    ) -> objects.Object:
+        unboxed_args = [runtime.from_object(arg) for arg in args]
+        result = super().call_closure(closure, *unboxed_args)  # type: ignore[arg-type]
+        return runtime.to_object(result)
+
+    def call_builtin_function(
+        self, func: objects.BuiltInFunction, num_args: int
+    ) -> None:
+        args = self.stack[self.stack_pointer - num_args : self.stack_pointer]
+        self.stack_pointer = self.stack_pointer - num_args - 1
+
+        try:
+            result = runtime.BY_OBJECT[func](*args)
+        except runtime.MonkeyError as exc:
+            # Errors are values on the VM.
+            result = exc.error
+        self.push(result)
+
+
+DISPATCH: tuple[vm.Handler, ...] = vm.dispatch_table(
+    {op: getattr(UnboxedVM, handler.__name__) for op, handler in vm.HANDLERS.items()}
+)
@@ -1,9 +1,12 @@
 from __future__ import annotations
-from typing import TYPE_CHECKING, cast
+from collections.abc import Callable, Iterator
+from typing import TYPE_CHECKING, ClassVar, cast
 
+import contextlib
 import dataclasses as dc
+import threading
 
-from monkey.interpreter import objects
+from monkey.interpreter import objects, ropes
 from monkey.compiler import code, compilers, frames
 
 if TYPE_CHECKING:
@@ -12,13 +15,16 @@ if TYPE_CHECKING:
     from monkey.compiler import compilers
 
 
+# Default limits, the stack and frames start small and grow up to them.
 STACK_SIZE: Final = 2048
 GLOBALS_SIZE: Final = 65536
 MAX_FRAMES: Final = 1024
 
-TRUE = objects.Boolean(value=True)
-FALSE = objects.Boolean(value=False)
-NULL = objects.Null()
+INITIAL_STACK_SIZE: Final = 64
+INITIAL_FRAMES: Final = 16
+
+# Returned by op code handlers which push or pop a frame.
+FRAME_CHANGED: Final = -1
 
 
 class VMError(Exception):
@@ -53,6 +59,13 @@ class Overflow(StackError):
     pass
 
 
+def main_frame(bytecode: compilers.Bytecode) -> frames.Frame:
+    return frames.Frame.new(
+        objects.Closure(function=bytecode.main_function, free=()),
+        0,
+    )
+
+
 def is_truthy(obj: objects.Object) -> bool:
     if isinstance(obj, objects.Boolean):
         return obj.value
@@ -71,33 +84,83 @@ class VM:
     frames: list[frames.Frame | None]
     frames_index: int
 
+    max_stack: int = STACK_SIZE
+    max_frames: int = MAX_FRAMES
+
+    # The current frame's, kept by run_frames so handlers needn't look it up.
+    base_pointer: int = 0
+    free: tuple[objects.Object, ...] = ()
+
+    # Held by globals and lets until they're set.
+    UNSET: ClassVar[object] = None
+
     @classmethod
     def from_bytecode(
         cls,
         bytecode: compilers.Bytecode,
         state: list[objects.Object | None] | None = None,
+        max_stack: int = STACK_SIZE,
+        max_frames: int = MAX_FRAMES,
     ) -> VM:
-        main_func = objects.CompiledFunction(
-            instructions=bytecode.instructions,
-            num_locals=0,
-            num_params=0,
-        )
-        main_frame = frames.Frame.new(
-            objects.Closure(function=main_func, free=[]),
-            0,
-        )
-        frames_: list[frames.Frame | None] = [None] * MAX_FRAMES
-        frames_[0] = main_frame
+        """
+        state: globals to share between runs, ie. in the REPL - grown in place as
+        more are defined.
+        """
+        frames_: list[frames.Frame | None] = [None] * min(INITIAL_FRAMES, max_frames)
+        frames_[0] = main_frame(bytecode)
 
         return cls(
-            globals=state or ([None] * GLOBALS_SIZE),
+            globals=state if state is not None else [cls.UNSET] * bytecode.num_globals,
             constants=bytecode.constants,
             stack_pointer=0,
-            stack=[None] * STACK_SIZE,
+            stack=[None] * min(INITIAL_STACK_SIZE, max_stack),
             frames=frames_,
             frames_index=1,
+            max_stack=max_stack,
+            max_frames=max_frames,
         )
 
+    @classmethod
+    def for_callbacks(
+        cls,
+        globals_: list[objects.Object | None],
+        constants: list[objects.Object],
+        max_stack: int = STACK_SIZE,
+        max_frames: int = MAX_FRAMES,
+    ) -> VM:
+        """
+        A VM with no main frame, for call_closure on another run's globals.
+        """
+        return cls(
+            globals=globals_,
+            constants=constants,
+            stack_pointer=0,
+            stack=[None] * min(INITIAL_STACK_SIZE, max_stack),
+            frames=[None] * min(INITIAL_FRAMES, max_frames),
+            frames_index=1,
+            max_stack=max_stack,
+            max_frames=max_frames,
+        )
+
+    def reset(self, bytecode: compilers.Bytecode) -> None:
+        """
+        Get ready to run bytecode, keeping the storage grown by earlier runs.
+
+        Nothing from earlier runs is visible afterwards. Globals start again in
+        a new list, so those shared with a REPL or kept by closures bound to the
+        earlier run, see caller, are left as they were.
+        """
+        self.stack[:] = [None] * len(self.stack)
+        self.stack_pointer = 0
+
+        self.globals = [self.UNSET] * bytecode.num_globals  # type: ignore[list-item]
+
+        self.constants = bytecode.constants
+
+        self.frames[:] = [None] * len(self.frames)
+        self.frames[0] = main_frame(bytecode)
+        self.frames_index = 1
+
     def current_frame(self) -> frames.Frame:
         try:
             if frame := self.frames[self.frames_index - 1]:
@@ -118,184 +181,359 @@ class VM:
 
         raise Missing
 
-    def run(self) -> None:
-        instructions: code.Instructions
-        op_code: code.OpCodes
+    def dispatch(self) -> tuple[Handler, ...]:
+        """
+        Handlers indexed by integer op code, for run.
+        """
+        return DISPATCH
 
-        while self.current_frame().instruction_pointer < (
-            len(self.current_frame().instructions) - 1
-        ):
-            self.current_frame().instruction_pointer += 1
+    def run(self) -> None:
+        running = RUNNING.vms
+        running.append(self)
+        try:
+            self.run_frames(0)
+        finally:
+            running.pop()
+
+    def run_frames(self, depth: int) -> None:
+        """
+        Run the current frame until it's finished or, for a closure called back
+        from a builtin, until there are only depth frames left.
+        """
+        dispatch = self.dispatch()
+
+        frame = self.current_frame()
+        self.base_pointer, self.free = frame.base_pointer, frame.closure.free
+        decoded = frame.decoded
+        instruction_pointer = frame.instruction_pointer
+        last = len(decoded) - 1
+
+        while instruction_pointer < last:
+            instruction_pointer += 1
+            op, operand, extra_operand = decoded[instruction_pointer]
+
+            jump = dispatch[op](self, operand, extra_operand)
+            if jump is None:
+                continue
+
+            if jump == FRAME_CHANGED:
+                frame.instruction_pointer = instruction_pointer
+                if self.frames_index <= depth:
+                    return
+
+                frame = self.current_frame()
+                self.base_pointer, self.free = frame.base_pointer, frame.closure.free
+                decoded = frame.decoded
+                instruction_pointer = frame.instruction_pointer
+                last = len(decoded) - 1
+            else:
+                instruction_pointer = jump - 1
+
+        frame.instruction_pointer = instruction_pointer
+
+    # Op code handlers - return a position to jump to in the current frame,
+    # FRAME_CHANGED after pushing/popping a frame or None to carry on.
+    def op_constant(self, const_index: int, _: int) -> int | None:
+        self.push(self.constants[const_index])
+        return None
+
+    def op_pop(self, _: int, __: int) -> int | None:
+        self.pop()
+        return None
+
+    # Integers are added and subtracted on the top of the stack in place,
+    # compiled code never leaves it short.
+    def op_add(self, _: int, __: int) -> int | None:
+        stack = self.stack
+        top = self.stack_pointer - 1
+        left, right = stack[top - 1], stack[top]
+        if type(left) is objects.Integer and type(right) is objects.Integer:
+            stack[top - 1] = objects.integer(left.value + right.value)
+            self.stack_pointer = top
+            return None
+        self.execute_binary_operation(code.OpCodes.ADD)
+        return None
+
+    def op_subtract(self, _: int, __: int) -> int | None:
+        stack = self.stack
+        top = self.stack_pointer - 1
+        left, right = stack[top - 1], stack[top]
+        if type(left) is objects.Integer and type(right) is objects.Integer:
+            stack[top - 1] = objects.integer(left.value - right.value)
+            self.stack_pointer = top
+            return None
+        self.execute_binary_operation(code.OpCodes.SUBTRACT)
+        return None
+
+    def op_multiply(self, _: int, __: int) -> int | None:
+        self.execute_binary_operation(code.OpCodes.MULTIPLY)
+        return None
+
+    def op_divide(self, _: int, __: int) -> int | None:
+        self.execute_binary_operation(code.OpCodes.DIVIDE)
+        return None
+
+    def op_true(self, _: int, __: int) -> int | None:
+        self.push(objects.TRUE)
+        return None
+
+    def op_false(self, _: int, __: int) -> int | None:
+        self.push(objects.FALSE)
+        return None
+
+    def op_equal(self, _: int, __: int) -> int | None:
+        self.execute_comparison(code.OpCodes.EQUAL)
+        return None
+
+    def op_not_equal(self, _: int, __: int) -> int | None:
+        self.execute_comparison(code.OpCodes.NOT_EQUAL)
+        return None
+
+    def op_greater_than(self, _: int, __: int) -> int | None:
+        self.execute_comparison(code.OpCodes.GREATER_THAN)
+        return None
+
+    def op_minus(self, _: int, __: int) -> int | None:
+        self.execute_minus_operator()
+        return None
+
+    def op_exclaimation_mark(self, _: int, __: int) -> int | None:
+        self.execute_exclaimation_mark_operator()
+        return None
+
+    def op_jump(self, position: int, _: int) -> int | None:
+        return position
+
+    def op_jump_not_truthy(self, position: int, _: int) -> int | None:
+        cond = self.pop()
+        if not is_truthy(cond):
+            return position
+        return None
+
+    def op_null(self, _: int, __: int) -> int | None:
+        self.push(objects.NULL)
+        return None
+
+    def op_set_global(self, global_index: int, _: int) -> int | None:
+        if global_index >= len(self.globals):
+            # Extend rather than replace, the list may be shared with the REPL.
+            unset = [self.UNSET] * (global_index + 1 - len(self.globals))
+            self.globals.extend(unset)  # type: ignore[arg-type]
+        self.globals[global_index] = self.pop()
+        return None
+
+    def op_get_global(self, global_index: int, _: int) -> int | None:
+        obj = self.globals[global_index]
+        if obj is None:
+            raise Missing(f"Global {global_index} read before it's set")
+        self.push(obj)
+        return None
+
+    def op_array(self, num_elements: int, _: int) -> int | None:
+        start = self.stack_pointer - num_elements
+        array = self.build_array(start, self.stack_pointer)
+        self.stack_pointer -= num_elements
+        self.push(array)
+        return None
+
+    def op_hash(self, num_elements: int, _: int) -> int | None:
+        start = self.stack_pointer - num_elements
+        map = self.build_hash_map(start, self.stack_pointer)
+        self.stack_pointer -= num_elements
+        self.push(map)
+        return None
+
+    def op_index(self, _: int, __: int) -> int | None:
+        index = self.pop()
+        left = self.pop()
+        self.execute_index_operation(left, index)
+        return None
+
+    def op_call(self, num_args: int, _: int) -> int | None:
+        frames_index = self.frames_index
+        self.execute_call(num_args)
+        if self.frames_index != frames_index:
+            return FRAME_CHANGED
+        return None
+
+    def op_tail_call(self, num_args: int, _: int) -> int | None:
+        """
+        A call whose result is returned straight away - the callee takes over
+        the current frame and its stack window instead of pushing another.
+        """
+        start = self.stack_pointer - 1 - num_args
+        closure = self.stack[start]
+        if type(closure) is not objects.Closure:
+            # Builtins don't need a frame, the OpReturnValue after returns.
+            return self.op_call(num_args, 0)
 
-            instructions = self.current_frame().instructions
-            op_code = code.OpCodes(
-                bytes([instructions[self.current_frame().instruction_pointer]])
+        if closure.function.num_params != num_args:
+            raise MismatchedNumberOfParams(
+                f"Expected {closure.function.num_params}, got {num_args}"
             )
 
-            match op_code:
-                case code.OpCodes.CONSTANT:
-                    const_index = code.read_int16(
-                        instructions, self.current_frame().instruction_pointer + 1
-                    )
-                    self.current_frame().instruction_pointer += 2
-
-                    to_add = self.constants[const_index]
-                    self.push(to_add)
-                case (
-                    code.OpCodes.ADD
-                    | code.OpCodes.SUBTRACT
-                    | code.OpCodes.MULTIPLY
-                    | code.OpCodes.DIVIDE
-                ):
-                    self.execute_binary_operation(op_code)
-                case code.OpCodes.POP:
-                    self.pop()
-                case code.OpCodes.TRUE | code.OpCodes.FALSE:
-                    self.push(TRUE if op_code == code.OpCodes.TRUE else FALSE)
-                case (
-                    code.OpCodes.GREATER_THAN
-                    | code.OpCodes.EQUAL
-                    | code.OpCodes.NOT_EQUAL
-                ):
-                    self.execute_comparison(op_code)
-                case code.OpCodes.MINUS | code.OpCodes.EXCLAIMATION_MARK:
-                    self.execute_operator(op_code)
-                case code.OpCodes.JUMP:
-                    position = code.read_int16(
-                        instructions, self.current_frame().instruction_pointer + 1
-                    )
-                    self.current_frame().instruction_pointer = position - 1
-                case code.OpCodes.JUMP_NOT_TRUTHY:
-                    position = code.read_int16(
-                        instructions, self.current_frame().instruction_pointer + 1
-                    )
-                    self.current_frame().instruction_pointer += 2
-
-                    cond = self.pop()
-                    if not is_truthy(cond):
-                        self.current_frame().instruction_pointer = position - 1
-                case code.OpCodes.NULL:
-                    self.push(NULL)
-                case code.OpCodes.SET_GLOBAL:
-                    global_index = code.read_int16(
-                        instructions, self.current_frame().instruction_pointer + 1
-                    )
-                    self.current_frame().instruction_pointer += 2
-                    self.globals[global_index] = self.pop()
-                case code.OpCodes.GET_GLOBAL:
-                    global_index = code.read_int16(
-                        instructions, self.current_frame().instruction_pointer + 1
-                    )
-                    self.current_frame().instruction_pointer += 2
-
-                    obj = self.globals[global_index]
-                    assert obj
-                    self.push(obj)
-                case code.OpCodes.ARRAY:
-                    num_elements = code.read_int16(
-                        instructions, self.current_frame().instruction_pointer + 1
-                    )
-                    self.current_frame().instruction_pointer += 2
-
-                    start = self.stack_pointer - num_elements
-                    array = self.build_array(start, self.stack_pointer)
-                    self.stack_pointer -= num_elements
-                    self.push(array)
-                case code.OpCodes.HASH:
-                    num_elements = code.read_int16(
-                        instructions, self.current_frame().instruction_pointer + 1
-                    )
-                    self.current_frame().instruction_pointer += 2
-
-                    start = self.stack_pointer - num_elements
-                    map = self.build_hash_map(start, self.stack_pointer)
-                    self.push(map)
-                case code.OpCodes.INDEX:
-                    index = self.pop()
-                    left = self.pop()
-                    self.execute_index_operation(left, index)
-                case code.OpCodes.GET_BUILTIN:
-                    builtin_index = code.read_int8(
-                        instructions, self.current_frame().instruction_pointer + 1
-                    )
-                    self.current_frame().instruction_pointer += 1
-
-                    definition = objects.BUILTINS[builtin_index]
-                    self.push(definition)
-                case code.OpCodes.CALL:
-                    num_args = code.read_int8(
-                        instructions, self.current_frame().instruction_pointer + 1
-                    )
-                    self.current_frame().instruction_pointer += 1
-                    self.execute_call(num_args)
-                case code.OpCodes.RETURN_VALUE:
-                    value = self.pop()
-
-                    frame = self.pop_frame()
-                    self.stack_pointer = frame.base_pointer
-                    self.pop()
-
-                    self.push(value)
-                case code.OpCodes.RETURN:
-                    frame = self.pop_frame()
-                    self.stack_pointer = frame.base_pointer
-
-                    self.pop()
-
-                    self.push(NULL)
-                case code.OpCodes.SET_LOCAL:
-                    local_index = code.read_int8(
-                        instructions, self.current_frame().instruction_pointer + 1
-                    )
-                    self.current_frame().instruction_pointer += 1
-
-                    frame = self.current_frame()
-                    self.stack[frame.base_pointer + local_index] = self.pop()
-                case code.OpCodes.GET_LOCAL:
-                    local_index = code.read_int8(
-                        instructions, self.current_frame().instruction_pointer + 1
-                    )
-                    self.current_frame().instruction_pointer += 1
-
-                    frame = self.current_frame()
-                    obj = self.stack[frame.base_pointer + local_index]
-                    assert obj
-                    self.push(obj)
-                case code.OpCodes.CLOSURE:
-                    const_index = code.read_int16(
-                        instructions, self.current_frame().instruction_pointer + 1
-                    )
-                    _ = code.read_int8(
-                        instructions, self.current_frame().instruction_pointer + 3
-                    )
-                    self.current_frame().instruction_pointer += 3
-
-                    self.push_closure(const_index)
-                case _:
-                    raise NotImplementedError(op_code)
+        frame = self.current_frame()
+        base_pointer = self.base_pointer
+        self.stack[base_pointer - 1 : base_pointer + num_args] = self.stack[
+            start : self.stack_pointer
+        ]
+        self.stack_pointer = base_pointer + closure.function.num_locals
+        self.reserve_stack(self.stack_pointer)
+        if closure.function.num_locals > num_args:
+            self.unset_lets(base_pointer + num_args)
+
+        if closure.function is frame.closure.function:
+            # Same instructions, so start them again without a frame change.
+            frame.closure = closure
+            self.free = closure.free
+            return 0
+
+        self.frames[self.frames_index - 1] = frames.Frame.new(closure, base_pointer)
+        return FRAME_CHANGED
+
+    def op_return_value(self, _: int, __: int) -> int | None:
+        value = self.pop()
+
+        frame = self.pop_frame()
+        self.stack_pointer = frame.base_pointer
+        self.pop()
+
+        self.push(value)
+        return FRAME_CHANGED
+
+    def op_return(self, _: int, __: int) -> int | None:
+        frame = self.pop_frame()
+        self.stack_pointer = frame.base_pointer
+
+        self.pop()
+
+        self.push(objects.NULL)
+        return FRAME_CHANGED
+
+    def op_get_local(self, local_index: int, _: int) -> int | None:
+        obj = self.stack[self.base_pointer + local_index]
+        if obj is None:
+            raise Missing(f"Local {local_index} read before it's set")
+        self.push(obj)
+        return None
+
+    def op_set_local(self, local_index: int, _: int) -> int | None:
+        self.stack[self.base_pointer + local_index] = self.pop()
+        return None
+
+    def op_get_builtin(self, builtin_index: int, _: int) -> int | None:
+        definition = objects.BUILTINS[builtin_index]
+        self.push(definition)
+        return None
+
+    def op_closure(self, const_index: int, num_free: int) -> int | None:
+        self.push_closure(const_index, num_free)
+        return None
+
+    def op_get_free(self, free_index: int, _: int) -> int | None:
+        self.push(self.free[free_index])
+        return None
+
+    def op_current_closure(self, _: int, __: int) -> int | None:
+        self.push(self.current_frame().closure)
+        return None
+
+    # Superinstructions - each does the work of the sequence it replaces.
+    def op_add_locals(self, first_index: int, second_index: int) -> int | None:
+        base_pointer = self.base_pointer
+        left = self.stack[base_pointer + first_index]
+        right = self.stack[base_pointer + second_index]
+        if left is None or right is None:
+            index = first_index if left is None else second_index
+            raise Missing(f"Local {index} read before it's set")
+        self.execute_binary(code.OpCodes.ADD, left, right)
+        return None
+
+    def op_add_local_constant(self, local_index: int, const_index: int) -> int | None:
+        left = self.stack[self.base_pointer + local_index]
+        if left is None:
+            raise Missing(f"Local {local_index} read before it's set")
+        self.execute_binary(code.OpCodes.ADD, left, self.constants[const_index])
+        return None
+
+    def op_subtract_local_constant(
+        self, local_index: int, const_index: int
+    ) -> int | None:
+        left = self.stack[self.base_pointer + local_index]
+        if left is None:
+            raise Missing(f"Local {local_index} read before it's set")
+        self.execute_binary(code.OpCodes.SUBTRACT, left, self.constants[const_index])
+        return None
+
+    def op_jump_not_greater_than(self, position: int, _: int) -> int | None:
+        right = self.pop()
+        left = self.pop()
+
+        if isinstance(left, objects.Integer) and isinstance(right, objects.Integer):
+            return None if left.value > right.value else position
+
+        self.execute_compare(code.OpCodes.GREATER_THAN, left, right)
+        return self.op_jump_not_truthy(position, 0)
+
+    def op_call_global(self, global_index: int, num_args: int) -> int | None:
+        self.reserve_stack(self.stack_pointer + 1)
+
+        # Slot the function in under its arguments, where OpCall expects it.
+        start = self.stack_pointer - num_args
+        self.stack[start + 1 : self.stack_pointer + 1] = self.stack[
+            start : self.stack_pointer
+        ]
+        self.stack[start] = self.globals[global_index]
+        self.stack_pointer += 1
+        return self.op_call(num_args, 0)
 
     @property
     def last_popped_stack_elem(self) -> objects.Object:
-        if item := self.stack[self.stack_pointer]:
+        if self.stack_pointer < len(self.stack) and (
+            item := self.stack[self.stack_pointer]
+        ):
             return item
         raise Empty
 
+    def reserve_stack(self, size: int) -> None:
+        """
+        Grow the stack to at least size slots, doubling up to max_stack.
+        """
+        if size <= len(self.stack):
+            return
+        if size > self.max_stack:
+            raise Overflow(f"Stack size {size} over {self.max_stack}")
+
+        new_size = min(max(size, len(self.stack) * 2), self.max_stack)
+        self.stack.extend([None] * (new_size - len(self.stack)))
+
     def push(self, o: objects.Object) -> None:
-        if self.stack_pointer >= STACK_SIZE:
-            raise Overflow
+        if self.stack_pointer >= len(self.stack):
+            self.reserve_stack(self.stack_pointer + 1)
 
         self.stack[self.stack_pointer] = o
         self.stack_pointer += 1
 
     def push_frame(self, frame: frames.Frame) -> None:
+        if self.frames_index >= len(self.frames):
+            if self.frames_index >= self.max_frames:
+                raise Overflow(f"More than {self.max_frames} frames")
+
+            new_size = min(len(self.frames) * 2, self.max_frames)
+            self.frames.extend([None] * (new_size - len(self.frames)))
+
         self.frames[self.frames_index] = frame
         self.frames_index += 1
 
-    def push_closure(self, closure_index: int) -> None:
+    def push_closure(self, closure_index: int, num_free: int) -> None:
         func = self.constants[closure_index]
         assert isinstance(func, objects.CompiledFunction)
 
-        closure = objects.Closure(function=func, free=[])
+        start = self.stack_pointer - num_free
+        free = tuple(cast(list[objects.Object], self.stack[start : self.stack_pointer]))
+        self.stack_pointer = start
+
+        closure = objects.Closure(function=func, free=free)
         return self.push(closure)
 
     def pop(self) -> objects.Object:
@@ -357,6 +595,38 @@ class VM:
         frame = frames.Frame.new(closure, self.stack_pointer - num_args)
         self.push_frame(frame)
         self.stack_pointer = frame.base_pointer + closure.function.num_locals
+        self.reserve_stack(self.stack_pointer)
+        if closure.function.num_locals > num_args:
+            self.unset_lets(frame.base_pointer + num_args)
+
+    def unset_lets(self, start: int) -> None:
+        """
+        Clear a new frame's lets, from start to the stack pointer, of whatever
+        earlier calls left there.
+        """
+        unset = [self.UNSET] * (self.stack_pointer - start)
+        self.stack[start : self.stack_pointer] = unset  # type: ignore[assignment]
+
+    def call_closure(
+        self, closure: objects.Closure, *args: objects.Object
+    ) -> objects.Object:
+        """
+        Call closure from Python, ie. from a builtin, and run it to its return.
+        Anything already on the stack is left as it was.
+        """
+        self.push(closure)
+        for arg in args:
+            self.push(arg)
+
+        depth = self.frames_index
+        base_pointer, free = self.base_pointer, self.free
+        self.call_compiled_function(closure, len(args))
+        try:
+            self.run_frames(depth)
+        finally:
+            # Back to the frame of the handler calling the builtin.
+            self.base_pointer, self.free = base_pointer, free
+        return self.pop()
 
     def call_builtin_function(
         self, func: objects.BuiltInFunction, num_args: int
@@ -370,12 +640,16 @@ class VM:
         if result:
             self.push(result)
         else:
-            self.push(NULL)
+            self.push(objects.NULL)
 
     def execute_binary_operation(self, op: code.OpCodes) -> None:
         right = self.pop()
         left = self.pop()
+        self.execute_binary(op, left, right)
 
+    def execute_binary(
+        self, op: code.OpCodes, left: objects.Object, right: objects.Object
+    ) -> None:
         if isinstance(left, objects.Integer) and isinstance(right, objects.Integer):
             return self.execute_binary_integer_operation(op, left, right)
         elif isinstance(left, objects.String) and isinstance(right, objects.String):
@@ -396,7 +670,7 @@ class VM:
                 result = left.value // right.value
             case _:
                 raise Unhandled(op)
-        self.push(objects.Integer(value=result))
+        self.push(objects.integer(result))
 
     def execute_operator(self, op: code.OpCodes) -> None:
         match op:
@@ -410,14 +684,14 @@ class VM:
     def execute_exclaimation_mark_operator(self) -> None:
         operand = self.pop()
 
-        if operand is TRUE:
-            self.push(FALSE)
-        elif operand is FALSE:
-            self.push(TRUE)
-        elif operand is NULL:
-            self.push(TRUE)
+        if operand is objects.TRUE:
+            self.push(objects.FALSE)
+        elif operand is objects.FALSE:
+            self.push(objects.TRUE)
+        elif operand is objects.NULL:
+            self.push(objects.TRUE)
         else:
-            self.push(FALSE)
+            self.push(objects.FALSE)
 
     def execute_minus_operator(self) -> None:
         operand = self.pop()
@@ -425,12 +699,16 @@ class VM:
         if not isinstance(operand, objects.Integer):
             raise Unhandled(operand)
 
-        self.push(objects.Integer(value=operand.value * -1))
+        self.push(objects.integer(-operand.value))
 
     def execute_comparison(self, op: code.OpCodes) -> None:
         right = self.pop()
         left = self.pop()
+        self.execute_compare(op, left, right)
 
+    def execute_compare(
+        self, op: code.OpCodes, left: objects.Object, right: objects.Object
+    ) -> None:
         if isinstance(left, objects.Integer) and isinstance(right, objects.Integer):
             return self.execute_integer_comparison(op, left, right)
         if isinstance(left, objects.Boolean) and isinstance(right, objects.Boolean):
@@ -451,16 +729,16 @@ class VM:
                 result = left.value != right.value
             case _:
                 raise Unhandled(f"{op} not handled for integer comparisons.")
-        self.push(objects.Boolean(value=result))
+        self.push(objects.boolean(result))
 
     def execute_binary_string_operation(
         self, op: code.OpCodes, left: objects.String, right: objects.String
     ) -> None:
-        result: str
+        result: ropes.Text
 
         match op:
             case code.OpCodes.ADD:
-                result = left.value + right.value
+                result = ropes.concat(left.text, right.text)
             case _:
                 raise Unhandled(op)
 
@@ -470,9 +748,6 @@ class VM:
         self, op: code.OpCodes, left: objects.Boolean, right: objects.Boolean
     ) -> None:
         result: bool
-        left = TRUE if left.value else FALSE
-        right = TRUE if right.value else FALSE
-
         match op:
             case code.OpCodes.EQUAL:
                 result = left is right
@@ -480,7 +755,7 @@ class VM:
                 result = left is not right
             case _:
                 raise Unhandled(f"{op} not handled for boolean comparisons.")
-        self.push(TRUE if result else FALSE)
+        self.push(objects.boolean(result))
 
     def execute_index_operation(
         self, left: objects.Object, index: objects.Object
@@ -509,3 +784,157 @@ class VM:
             self.push(map.pairs[key].value)
         except KeyError as exc:
             raise Missing from exc
+
+
+@dc.dataclass
+class VMPool:
+    """
+    Reuses VMs, and the storage they've grown, between runs. Not thread safe,
+    use a pool per thread.
+    """
+
+    max_stack: int = STACK_SIZE
+    max_frames: int = MAX_FRAMES
+    # Most VMs kept idle, any more are left for the garbage collector.
+    size: int = 8
+
+    idle: list[VM] = dc.field(init=False, default_factory=list)
+
+    def acquire(self, bytecode: compilers.Bytecode) -> VM:
+        if self.idle:
+            machine = self.idle.pop()
+            machine.reset(bytecode)
+            return machine
+        return VM.from_bytecode(
+            bytecode, max_stack=self.max_stack, max_frames=self.max_frames
+        )
+
+    def release(self, machine: VM) -> None:
+        if len(self.idle) < self.size:
+            self.idle.append(machine)
+
+    @contextlib.contextmanager
+    def vm(self, bytecode: compilers.Bytecode) -> Iterator[VM]:
+        machine = self.acquire(bytecode)
+        try:
+            yield machine
+        finally:
+            self.release(machine)
+
+    def run(self, bytecode: compilers.Bytecode) -> objects.Object:
+        """
+        Run bytecode on a pooled VM, returning the last popped value.
+        """
+        machine = self.acquire(bytecode)
+        try:
+            machine.run()
+            return machine.last_popped_stack_elem
+        finally:
+            self.release(machine)
+
+
+class Running(threading.local):
+    """
+    The VMs running on each thread, innermost last, so a callback runs on its
+    own thread's VM.
+    """
+
+    def __init__(self) -> None:
+        self.vms: list[VM] = []
+
+
+RUNNING = Running()
+
+
+def caller(closure: objects.Object) -> Callable[..., objects.Object]:
+    """
+    For builtins calling the closures they're given, see objects.CALLERS.
+
+    The closure runs on the VM that made the call while that's still on the
+    same run, or else - for a stream iterated after the VM's been reset for
+    another program - on a VM of its own with the globals and constants of the
+    run it came from.
+    """
+    assert isinstance(closure, objects.Closure)
+    if not RUNNING.vms:
+        raise Unhandled(f"Can't call {closure} outside a VM")
+
+    machine = RUNNING.vms[-1]
+    globals_, constants = machine.globals, machine.constants
+    detached: list[VM] = []
+
+    def call(*args: objects.Object) -> objects.Object:
+        if machine.globals is globals_ and machine.constants is constants:
+            return machine.call_closure(closure, *args)
+        if not detached:
+            detached.append(
+                type(machine).for_callbacks(
+                    globals_, constants, machine.max_stack, machine.max_frames
+                )
+            )
+        return detached[0].call_closure(closure, *args)
+
+    return call
+
+
+objects.CALLERS[objects.Closure] = caller
+
+
+Handler = Callable[[VM, int, int], int | None]
+
+HANDLERS: dict[code.OpCodes, Handler] = {
+    code.OpCodes.CONSTANT: VM.op_constant,
+    code.OpCodes.POP: VM.op_pop,
+    code.OpCodes.ADD: VM.op_add,
+    code.OpCodes.SUBTRACT: VM.op_subtract,
+    code.OpCodes.MULTIPLY: VM.op_multiply,
+    code.OpCodes.DIVIDE: VM.op_divide,
+    code.OpCodes.TRUE: VM.op_true,
+    code.OpCodes.FALSE: VM.op_false,
+    code.OpCodes.EQUAL: VM.op_equal,
+    code.OpCodes.NOT_EQUAL: VM.op_not_equal,
+    code.OpCodes.GREATER_THAN: VM.op_greater_than,
+    code.OpCodes.MINUS: VM.op_minus,
+    code.OpCodes.EXCLAIMATION_MARK: VM.op_exclaimation_mark,
+    code.OpCodes.JUMP_NOT_TRUTHY: VM.op_jump_not_truthy,
+    code.OpCodes.JUMP: VM.op_jump,
+    code.OpCodes.NULL: VM.op_null,
+    code.OpCodes.SET_GLOBAL: VM.op_set_global,
+    code.OpCodes.GET_GLOBAL: VM.op_get_global,
+    code.OpCodes.ARRAY: VM.op_array,
+    code.OpCodes.HASH: VM.op_hash,
+    code.OpCodes.INDEX: VM.op_index,
+    code.OpCodes.CALL: VM.op_call,
+    code.OpCodes.TAIL_CALL: VM.op_tail_call,
+    code.OpCodes.RETURN: VM.op_return,
+    code.OpCodes.RETURN_VALUE: VM.op_return_value,
+    code.OpCodes.GET_LOCAL: VM.op_get_local,
+    code.OpCodes.SET_LOCAL: VM.op_set_local,
+    code.OpCodes.GET_BUILTIN: VM.op_get_builtin,
+    code.OpCodes.CLOSURE: VM.op_closure,
+    code.OpCodes.GET_FREE: VM.op_get_free,
+    code.OpCodes.CURRENT_CLOSURE: VM.op_current_closure,
+    code.OpCodes.ADD_LOCALS: VM.op_add_locals,
+    code.OpCodes.ADD_LOCAL_CONSTANT: VM.op_add_local_constant,
+    code.OpCodes.SUBTRACT_LOCAL_CONSTANT: VM.op_subtract_local_constant,
+    code.OpCodes.JUMP_NOT_GREATER_THAN: VM.op_jump_not_greater_than,
+    code.OpCodes.CALL_GLOBAL: VM.op_call_global,
+}
+
+
+def unhandled(op: int) -> Handler:
+    def handler(_: VM, __: int, ___: int) -> int | None:
+        raise NotImplementedError(code.OPCODES_BY_INT[op] or op)
+
+    return handler
+
+
+def dispatch_table(handlers: dict[code.OpCodes, Handler]) -> tuple[Handler, ...]:
+    return tuple(
+        handlers[op] if op in handlers else unhandled(i)
+        for i, op in enumerate(code.OPCODES_BY_INT)
+    )
+
+
+# Indexed by the integer op code.
+DISPATCH: tuple[Handler, ...] = dispatch_table(HANDLERS)
@@ -73,10 +73,16 @@ class BlockStatement(Node):
         return s
 
 
+# (depth, slot) - how many functions out the name is bound and its index there.
+Location = tuple[int, int]
+
+
 @dc.dataclass(frozen=True)
 class Identifier(Expression):
     token: tokens.Token
     value: str
+    # Set by resolver, None for globals and builtins.
+    location: Location | None = dc.field(default=None, compare=False, repr=False)
 
     def expression_node(self) -> None:
         pass
@@ -141,6 +147,8 @@ class FunctionLiteral(Expression):
     token: tokens.Token  # ie. fn
     parameters: list[Identifier]
     body: BlockStatement | None
+    # Set by resolver, names of the parameters then locals by slot.
+    slots: tuple[str, ...] | None = dc.field(default=None, compare=False, repr=False)
 
     def expression_node(self) -> None:
         pass
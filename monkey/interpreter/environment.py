@@ -28,3 +28,54 @@ class Environment:
     @classmethod
     def new_enclosed(cls, env: Environment) -> Environment:
         return cls(outer=env)
+
+
+@dc.dataclass
+class Slots(Environment):
+    """
+    A function call's environment, with its parameters and lets in slots
+    given by resolver.
+    """
+
+    names: tuple[str, ...] = ()
+    values: list[objects.Object | None] = dc.field(default_factory=list)
+    # The nearest environment looked up by name, where globals are.
+    globals: Environment | None = None
+
+    def lookup(self, depth: int, slot: int) -> objects.Object | None:
+        env: Environment = self
+        for _ in range(depth):
+            env = env.outer  # type: ignore[assignment]
+        return env.values[slot]  # type: ignore[attr-defined]
+
+    def get(self, name: str) -> tuple[objects.Object | None, bool]:
+        # By name, for unresolved code and names read before their let.
+        if name in self.names:
+            value = self.values[self.names.index(name)]
+            if value is not None:
+                return value, True
+        elif name in self.store:
+            return self.store[name], True
+
+        if self.outer:
+            return self.outer.get(name)
+        return None, False
+
+    def set(self, name: str, obj: objects.Object) -> objects.Object:
+        if name in self.names:
+            self.values[self.names.index(name)] = obj
+        else:
+            self.store[name] = obj
+        return obj
+
+    @classmethod
+    def new_call(
+        cls,
+        env: Environment,
+        names: tuple[str, ...],
+        arguments: list[objects.Object],
+    ) -> Slots:
+        values: list[objects.Object | None] = [*arguments]
+        values.extend([None] * (len(names) - len(values)))
+        globals_ = env.globals if isinstance(env, Slots) else env
+        return cls(outer=env, names=names, values=values, globals=globals_)
@@ -1,10 +1,11 @@
 from __future__ import annotations
 
+from collections.abc import Callable
 import logging
 
 from typing import cast
 
-from monkey.interpreter import ast, environment, objects
+from monkey.interpreter import ast, environment, objects, resolver, ropes
 
 
 logger = logging.getLogger(__name__)
@@ -23,7 +24,7 @@ def node(to_eval: ast.Node, env: environment.Environment) -> objects.Object | No
             return node(to_eval.expression, env)
         case ast.IntegerLiteral:
             assert isinstance(to_eval, ast.IntegerLiteral)
-            return objects.Integer(value=to_eval.value)
+            return objects.integer(to_eval.value)
         case ast.BooleanLiteral:
             assert isinstance(to_eval, ast.BooleanLiteral)
             if to_eval.value:
@@ -61,7 +62,7 @@ def node(to_eval: ast.Node, env: environment.Environment) -> objects.Object | No
             return if_expression(to_eval, env)
         case ast.Return:
             assert isinstance(to_eval, ast.Return)
-            value = node(to_eval.value, env)
+            value = tail_expression(to_eval.value, env)
             assert value
             if value.type == objects.ObjectType.ERROR:
                 return value
@@ -73,7 +74,11 @@ def node(to_eval: ast.Node, env: environment.Environment) -> objects.Object | No
             if value.type == objects.ObjectType.ERROR:
                 return value
 
-            env.set(to_eval.name.value, value)
+            if (location := to_eval.name.location) is not None:
+                # Always bound in the function itself, ie. depth 0.
+                cast(environment.Slots, env).values[location[1]] = value
+            else:
+                env.set(to_eval.name.value, value)
         case ast.ArrayLiteral:
             assert isinstance(to_eval, ast.ArrayLiteral)
             return objects.Array(items=expressions(to_eval.items, env))
@@ -82,7 +87,7 @@ def node(to_eval: ast.Node, env: environment.Environment) -> objects.Object | No
             params = to_eval.parameters
             body = to_eval.body
             assert body
-            return objects.Function(body, env, params)
+            return objects.Function(body, env, params, to_eval.slots)
         case ast.Call:
             assert isinstance(to_eval, ast.Call)
             func = node(to_eval.function, env)
@@ -114,11 +119,15 @@ def node(to_eval: ast.Node, env: environment.Environment) -> objects.Object | No
 def program(
     program: ast.Program, env: environment.Environment
 ) -> objects.Object | None:
+    resolver.resolve(program)
+
     result: objects.Object | None = None
     for statement in program.statements:
         result = node(statement, env)
 
         if isinstance(result, objects.Return):
+            if isinstance(result.value, objects.TailCall):
+                return function(result.value.function, result.value.arguments)
             return result.value
         elif isinstance(result, objects.Error):
             return result
@@ -183,10 +192,10 @@ def infix_expression(
 
 def plus(left: objects.Object, right: objects.Object) -> objects.Object:
     if isinstance(left, objects.Integer) and isinstance(right, objects.Integer):
-        return objects.Integer(value=left.value + right.value)
+        return objects.integer(left.value + right.value)
 
     if isinstance(left, objects.String) and isinstance(right, objects.String):
-        return objects.String(value=f"{left.value}{right.value}")
+        return objects.String(value=ropes.concat(left.text, right.text))
 
     if type(left) is not type(right):
         error_type = objects.ErrorTypes.TYPE_MISMATCH
@@ -197,7 +206,7 @@ def plus(left: objects.Object, right: objects.Object) -> objects.Object:
 
 def minus(left: objects.Object, right: objects.Object) -> objects.Object:
     if isinstance(left, objects.Integer) and isinstance(right, objects.Integer):
-        return objects.Integer(value=left.value - right.value)
+        return objects.integer(left.value - right.value)
 
     if type(left) is not type(right):
         error_type = objects.ErrorTypes.TYPE_MISMATCH
@@ -208,7 +217,7 @@ def minus(left: objects.Object, right: objects.Object) -> objects.Object:
 
 def multiply(left: objects.Object, right: objects.Object) -> objects.Object:
     if isinstance(left, objects.Integer) and isinstance(right, objects.Integer):
-        return objects.Integer(value=left.value * right.value)
+        return objects.integer(left.value * right.value)
 
     if type(left) is not type(right):
         error_type = objects.ErrorTypes.TYPE_MISMATCH
@@ -222,7 +231,7 @@ def divide(left: objects.Object, right: objects.Object) -> objects.Object:
     Note: floor, not true divide
     """
     if isinstance(left, objects.Integer) and isinstance(right, objects.Integer):
-        return objects.Integer(value=left.value // right.value)
+        return objects.integer(left.value // right.value)
 
     if type(left) is not type(right):
         error_type = objects.ErrorTypes.TYPE_MISMATCH
@@ -244,7 +253,7 @@ def exclaimation_mark(right: objects.Object) -> objects.Object:
 
 
 def prefix_minus(right: objects.Integer) -> objects.Object:
-    return objects.Integer(value=right.value * -1)
+    return objects.integer(-right.value)
 
 
 def less_than(left: objects.Object, right: objects.Object) -> objects.Object:
@@ -331,6 +340,14 @@ def if_expression(expression: ast.If, env: environment.Environment) -> objects.O
 
 
 def identifier(iden: ast.Identifier, env: environment.Environment) -> objects.Object:
+    if iden.location is not None:
+        depth, slot = iden.location
+        if value := cast(environment.Slots, env).lookup(depth, slot):
+            return value
+    elif isinstance(env, environment.Slots) and env.globals:
+        # Not bound by any function, so skip straight past them.
+        env = env.globals
+
     value, ok = env.get(iden.value)
     if value:
         return value
@@ -363,6 +380,10 @@ def expressions(
 def extended_function_env(
     function: objects.Function, parameters: list[objects.Object]
 ) -> environment.Environment:
+    if function.slots is not None:
+        arguments = parameters[: len(function.parameters)]
+        return environment.Slots.new_call(function.env, function.slots, arguments)
+
     env = environment.Environment.new_enclosed(function.env)
     for i, parameter in enumerate(function.parameters):
         env.set(str(parameter.value), parameters[i])
@@ -370,14 +391,19 @@ def extended_function_env(
 
 
 def function(func: objects.Object, arguments: list[objects.Object]) -> objects.Object:
-    if isinstance(func, objects.Function):
+    # Calls in tail position come back as TailCalls and are made in this loop,
+    # so recursing through them doesn't grow the Python stack.
+    while isinstance(func, objects.Function):
         env = extended_function_env(func, arguments)
-        evaluated = node(func.body, env)
+        evaluated = tail_block(func.body, env)
         assert evaluated
         if isinstance(evaluated, objects.Return):
-            return evaluated.value
-        return evaluated
-    elif isinstance(func, objects.BuiltInFunction):
+            evaluated = evaluated.value
+        if not isinstance(evaluated, objects.TailCall):
+            return evaluated
+        func, arguments = evaluated.function, evaluated.arguments
+
+    if isinstance(func, objects.BuiltInFunction):
         return func.function(*arguments)
 
     return objects.Error(
@@ -385,6 +411,70 @@ def function(func: objects.Object, arguments: list[objects.Object]) -> objects.O
     )
 
 
+def caller(func: objects.Object) -> Callable[..., objects.Object]:
+    """
+    For builtins calling the functions they're given, see objects.CALLERS.
+    """
+    return lambda *arguments: function(func, list(arguments))
+
+
+objects.CALLERS[objects.Function] = caller
+
+
+def tail_block(
+    block: ast.BlockStatement, env: environment.Environment
+) -> objects.Object | None:
+    """
+    Like block_statement, but the last statement is in tail position.
+    """
+    result: objects.Object | None = None
+    for i, statement in enumerate(block.statements):
+        if i < len(block.statements) - 1:
+            result = node(statement, env)
+        elif isinstance(statement, ast.ExpressionStatement):
+            result = tail_expression(statement.expression, env)
+        else:
+            result = node(statement, env)
+        assert result
+
+        if result.type in (objects.ObjectType.RETURN, objects.ObjectType.ERROR):
+            return result
+
+    return result
+
+
+def tail_expression(
+    expression: ast.Expression, env: environment.Environment
+) -> objects.Object | None:
+    """
+    Evaluates expression, except a call to a function, which is returned as a
+    TailCall for evaluate.function to make.
+    """
+    match expression:
+        case ast.Call():
+            func = node(expression.function, env)
+            assert func
+
+            args = expressions(expression.arguments, env)
+            if len(args) == 1 and args[0].type == objects.ObjectType.ERROR:
+                return args[0]
+            if isinstance(func, objects.Function):
+                return objects.TailCall(function=func, arguments=args)
+            return function(func, args)
+        case ast.If():
+            condition = node(expression.condition, env)
+            assert condition
+            if condition.type == objects.ObjectType.ERROR:
+                return condition
+            elif is_truthy(condition) and expression.consequence:
+                return tail_block(expression.consequence, env)
+            elif expression.alternative is not None:
+                return tail_block(expression.alternative, env)
+            return objects.NULL
+        case _:
+            return node(expression, env)
+
+
 def index_expression(left: objects.Object, idx: objects.Object) -> objects.Object:
     if isinstance(left, objects.Array) and isinstance(idx, objects.Integer):
         return index_array(left, idx)
@@ -0,0 +1,244 @@
+"""
+A persistent hash map, for hashes changed with set, delete and merge.
+
+A hash array mapped trie: each node covers 5 bits of the key's hash, with a
+bitmap of which of its 32 slots are in use and a tuple holding just those, each
+either a pair or a node for the next 5 bits. Keys whose hashes are entirely
+equal share a Collision. Changing a map copies only the nodes on the path to
+the key, everything else is shared with the original.
+
+The trie's order depends on the hashes, which for strings change from run to
+run, so each pair also holds when its key was first set, and the map is gone
+through in that order as a dict would be.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Hashable, Iterable, Iterator, Mapping
+from typing import Any, TypeVar
+import dataclasses as dc
+
+
+BITS = 5
+MASK = (1 << BITS) - 1
+HASH_BITS = 64
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+Pair = tuple[Any, Any, int]  # Key, value and the order it was set in.
+Entry = Any  # Pair | Node | Collision
+
+
+def hash_of(key: Hashable) -> int:
+    return hash(key) & ((1 << HASH_BITS) - 1)
+
+
+def order(pair: Pair) -> int:
+    return pair[2]
+
+
+@dc.dataclass(frozen=True, slots=True)
+class Node:
+    bitmap: int
+    entries: tuple[Entry, ...]
+
+    def get(self, key: Hashable, h: int, shift: int) -> Pair | None:
+        bit = 1 << ((h >> shift) & MASK)
+        if not self.bitmap & bit:
+            return None
+
+        entry = self.entries[(self.bitmap & (bit - 1)).bit_count()]
+        if type(entry) is tuple:
+            return entry if entry[0] == key else None
+        return entry.get(key, h, shift + BITS)
+
+    def set(self, pair: Pair, h: int, shift: int) -> Node:
+        bit = 1 << ((h >> shift) & MASK)
+        index = (self.bitmap & (bit - 1)).bit_count()
+        if not self.bitmap & bit:
+            entries = (*self.entries[:index], pair, *self.entries[index:])
+            return Node(self.bitmap | bit, entries)
+
+        entry = self.entries[index]
+        if type(entry) is not tuple:
+            child = entry.set(pair, h, shift + BITS)
+        elif entry[0] == pair[0]:
+            child = pair
+        else:
+            child = branch(shift + BITS, entry, hash_of(entry[0]), pair, h)
+        return self.replace(index, child)
+
+    def delete(self, key: Hashable, h: int, shift: int) -> Entry | None:
+        """
+        The node without key, or what's left if that's one pair or collision.
+        """
+        bit = 1 << ((h >> shift) & MASK)
+        if not self.bitmap & bit:
+            return self
+
+        index = (self.bitmap & (bit - 1)).bit_count()
+        entry = self.entries[index]
+        if type(entry) is tuple:
+            child = None if entry[0] == key else entry
+        else:
+            child = entry.delete(key, h, shift + BITS)
+        if child is entry:
+            return self
+
+        if child is not None:
+            return self.replace(index, child)
+
+        entries = (*self.entries[:index], *self.entries[index + 1 :])
+        if len(entries) == 1 and type(entries[0]) is not Node:
+            # Pulled up into the parent.
+            return entries[0]
+        if not entries:
+            return None
+        return Node(self.bitmap & ~bit, entries)
+
+    def replace(self, index: int, entry: Entry) -> Node:
+        entries = (*self.entries[:index], entry, *self.entries[index + 1 :])
+        return Node(self.bitmap, entries)
+
+    def __iter__(self) -> Iterator[Pair]:
+        for entry in self.entries:
+            if type(entry) is tuple:
+                yield entry
+            else:
+                yield from entry
+
+
+@dc.dataclass(frozen=True, slots=True)
+class Collision:
+    """
+    Pairs whose keys' hashes are the same.
+    """
+
+    hash: int
+    pairs: tuple[Pair, ...]
+
+    def get(self, key: Hashable, h: int, shift: int) -> Pair | None:
+        if h == self.hash:
+            for pair in self.pairs:
+                if pair[0] == key:
+                    return pair
+        return None
+
+    def set(self, pair: Pair, h: int, shift: int) -> Entry:
+        if h != self.hash:
+            return branch(shift, self, self.hash, pair, h)
+
+        pairs = tuple(p for p in self.pairs if p[0] != pair[0])
+        return Collision(self.hash, (*pairs, pair))
+
+    def delete(self, key: Hashable, h: int, shift: int) -> Entry | None:
+        if self.get(key, h, shift) is None:
+            return self
+
+        pairs = tuple(pair for pair in self.pairs if pair[0] != key)
+        if len(pairs) == 1:
+            return pairs[0]
+        return Collision(self.hash, pairs)
+
+    def __iter__(self) -> Iterator[Pair]:
+        return iter(self.pairs)
+
+
+def branch(shift: int, first: Entry, first_hash: int, second: Entry, h: int) -> Entry:
+    """
+    The smallest entry holding both, which are pairs or collisions.
+    """
+    if first_hash == h:
+        return Collision(h, (first, second))
+
+    first_bit = (first_hash >> shift) & MASK
+    second_bit = (h >> shift) & MASK
+    if first_bit == second_bit:
+        child = branch(shift + BITS, first, first_hash, second, h)
+        return Node(1 << first_bit, (child,))
+
+    entries = (first, second) if first_bit < second_bit else (second, first)
+    return Node((1 << first_bit) | (1 << second_bit), entries)
+
+
+EMPTY = Node(0, ())
+
+
+@dc.dataclass(frozen=True, slots=True, eq=False)
+class HashMap(Mapping[K, V]):
+    root: Node = EMPTY
+    size: int = 0
+    # Keys ever added, so the order of the next.
+    added: int = 0
+
+    @classmethod
+    def from_iterable(cls, pairs: Iterable[tuple[K, V]]) -> HashMap[K, V]:
+        result: HashMap[K, V] = cls()
+        for key, value in pairs:
+            result = result.set(key, value)
+        return result
+
+    def __getitem__(self, key: K) -> V:
+        pair = self.root.get(key, hash_of(key), 0)
+        if pair is None:
+            raise KeyError(key)
+        return pair[1]
+
+    def __contains__(self, key: object) -> bool:
+        return self.root.get(key, hash_of(key), 0) is not None  # type: ignore[arg-type]
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self) -> Iterator[K]:
+        for key, _, _ in sorted(self.root, key=order):
+            yield key
+
+    def __repr__(self) -> str:
+        return f"HashMap({dict(self)!r})"
+
+    def set(self, key: K, value: V) -> HashMap[K, V]:
+        h = hash_of(key)
+        if (pair := self.root.get(key, h, 0)) is not None:
+            # Keeps its place.
+            root = self.root.set((key, value, pair[2]), h, 0)
+            return HashMap(root, self.size, self.added)
+
+        root = self.root.set((key, value, self.added), h, 0)
+        return HashMap(root, self.size + 1, self.added + 1)
+
+    def delete(self, key: K) -> HashMap[K, V]:
+        h = hash_of(key)
+        if self.root.get(key, h, 0) is None:
+            return self
+
+        left = self.root.delete(key, h, 0)
+        if left is None:
+            return HashMap()
+        return HashMap(root_of(left), self.size - 1, self.added)
+
+    def merge(self, other: Mapping[K, V]) -> HashMap[K, V]:
+        """
+        This map with other's pairs set over it.
+        """
+        result = self
+        for key, value in other.items():
+            result = result.set(key, value)
+        return result
+
+
+def root_of(entry: Entry) -> Node:
+    """
+    A node over what a delete left, which may be a lone pair or collision.
+    """
+    if type(entry) is Node:
+        return entry
+    h = entry.hash if type(entry) is Collision else hash_of(entry[0])
+    return Node(1 << (h & MASK), (entry,))
+
+
+def of(pairs: Mapping[K, V]) -> HashMap[K, V]:
+    if isinstance(pairs, HashMap):
+        return pairs
+    return HashMap.from_iterable(pairs.items())
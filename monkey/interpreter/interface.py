@@ -1,18 +1,35 @@
 import enum
-from monkey.compiler import compilers, symbol_table, vm
-from monkey.interpreter import environment, objects, parsers, evaluate, lexers
+from monkey.compiler import cache, compilers, symbol_table, transpile, unboxed, vm
+from monkey.interpreter import (
+    ast,
+    environment,
+    objects,
+    parsers,
+    evaluate,
+    lexers,
+    specialize,
+    stackless,
+)
 
 
 class RunType(enum.StrEnum):
     INTERPRETER = "interpreter"
     COMPILED = "vm"
+    # Tree walking, over closures built from the AST.
+    CLOSURES = "closures"
+    # Transpiled to Python and run by CPython.
+    PYTHON = "python"
+    # Tree walking with its own stack, so recursion depth isn't Python's.
+    STACKLESS = "stackless"
+    # Experimental, the VM with plain Python values on its stack.
+    UNBOXED = "unboxed"
 
 
 class Repl:
     PROMPT = ">>>> "
 
     def start(self, run_type: RunType) -> None:
-        vm_globals: list[objects.Object | None] = [None] * vm.GLOBALS_SIZE
+        vm_globals: list[objects.Object | None] = []
         compiler_symbol_table = symbol_table.SymbolTable.new()
         for i, (name, _) in enumerate(objects.BUILTIN_MAP.items()):
             compiler_symbol_table.define_builtin(i, name)
@@ -23,10 +40,27 @@ class Repl:
 
 
 class Script:
-    def eval(self, filename: str, run_type: RunType) -> None:
+    def eval(
+        self,
+        filename: str,
+        run_type: RunType,
+        optimization_level: int = 0,
+        use_cache: bool = True,
+    ) -> None:
         with open(filename) as f:
             code = f.read()
-            print(run(code, run_type))
+
+        if run_type == RunType.COMPILED and use_cache:
+            print(run_cached(filename, code, optimization_level))
+        else:
+            print(run(code, run_type, optimization_level=optimization_level))
+
+
+def parse(code: str) -> tuple[ast.Program, list[str]]:
+    lexer = lexers.Lexer.new(code)
+    parser = parsers.Parser.new(lexer)
+    program = parser.parse_program()
+    return program, parser.errors
 
 
 def run(
@@ -34,24 +68,63 @@ def run(
     run_type: RunType,
     vm_globals: list[objects.Object | None] | None = None,
     compiler_symbol_table: symbol_table.SymbolTable | None = None,
+    optimization_level: int = 0,
 ) -> str:
-    lexer = lexers.Lexer.new(code)
-    parser = parsers.Parser.new(lexer)
-    program = parser.parse_program()
-
-    if parser.errors:
-        return "\n".join(parser.errors)
+    program, errors = parse(code)
+    if errors:
+        return "\n".join(errors)
 
     if run_type == RunType.INTERPRETER:
         env = environment.Environment()
         return_value = evaluate.node(program, env)
         if return_value:
             return return_value.inspect()
+    elif run_type == RunType.CLOSURES:
+        return_value = specialize.run(program, environment.Environment())
+        if return_value:
+            return return_value.inspect()
+    elif run_type == RunType.STACKLESS:
+        return_value = stackless.run(program, environment.Environment())
+        if return_value:
+            return return_value.inspect()
+    elif run_type == RunType.PYTHON:
+        return_value = transpile.run(program)
+        if return_value:
+            return return_value.inspect()
     else:
-        compiler = compilers.Compiler.new(compiler_symbol_table)
+        compiler = compilers.Compiler.new(compiler_symbol_table, optimization_level)
         compiler.compile(program)
-        machine = vm.VM.from_bytecode(compiler.bytecode(), vm_globals)
-        machine.run()
-        print(machine.last_popped_stack_elem.inspect())
+        machine_type = unboxed.UnboxedVM if run_type == RunType.UNBOXED else vm.VM
+        return run_bytecode(compiler.bytecode(), vm_globals, machine_type)
+
+    return ""
+
+
+def run_cached(filename: str, code: str, optimization_level: int = 0) -> str:
+    """
+    Run code from filename on the VM, skipping parsing and compiling if there's
+    cached bytecode for it.
+    """
+    bytecode = cache.load(filename, code, optimization_level)
+    if bytecode is None:
+        program, errors = parse(code)
+        if errors:
+            return "\n".join(errors)
 
+        compiler = compilers.Compiler.new(optimization_level=optimization_level)
+        compiler.compile(program)
+        bytecode = compiler.bytecode()
+        cache.store(filename, code, bytecode, optimization_level)
+
+    return run_bytecode(bytecode)
+
+
+def run_bytecode(
+    bytecode: compilers.Bytecode,
+    vm_globals: list[objects.Object | None] | None = None,
+    machine_type: type[vm.VM] = vm.VM,
+) -> str:
+    machine = machine_type.from_bytecode(bytecode, vm_globals)
+    machine.run()
+    print(machine.last_popped_stack_elem.inspect())
     return ""
@@ -1,12 +1,13 @@
 from __future__ import annotations
 
 import abc
-from collections.abc import Mapping
+from collections.abc import Callable, Iterator, Mapping, Sequence
+import itertools
 import enum
 import dataclasses as dc
 from monkey.compiler import code
 
-from monkey.interpreter import ast, environment
+from monkey.interpreter import ast, environment, hashmaps, ropes, vectors
 
 
 class ObjectType(enum.StrEnum):
@@ -14,6 +15,7 @@ class ObjectType(enum.StrEnum):
     INTEGER = "INTEGER"
     BOOLEAN = "BOOLEAN"
     RETURN = "RETURN"
+    TAIL_CALL = "TAIL_CALL"
     ERROR = "ERROR"
     BUILTIN_FUNCTION = "BUILTIN_FUNCTION"
     FUNCTION = "FUNCTION"
@@ -23,6 +25,8 @@ class ObjectType(enum.StrEnum):
     HASH_KEY = "HASH_KEY"
     HASH = "HASH"
     CLOSURE = "CLOSURE"
+    RANGE = "RANGE"
+    STREAM = "STREAM"
 
 
 class ErrorTypes(enum.StrEnum):
@@ -35,6 +39,9 @@ class ErrorTypes(enum.StrEnum):
 
 
 class Object(abc.ABC):
+    # Objects are slotted, without a __dict__ each.
+    __slots__ = ()
+
     type: ObjectType
     value: object
 
@@ -43,63 +50,153 @@ class Object(abc.ABC):
         pass
 
 
-@dc.dataclass(frozen=True)
+@dc.dataclass(frozen=True, slots=True, eq=False)
 class HashKey:
+    """
+    Keys are equal only if both their types and values are, so 1 and true or a
+    string and its bytes as an integer are different keys. The hash is worked
+    out once, when the key is made.
+    """
+
     type = ObjectType.HASH_KEY
 
-    value: int
+    kind: ObjectType
+    value: int | str
+    hash: int
+
+    @classmethod
+    def of(cls, kind: ObjectType, value: int | str) -> HashKey:
+        # 1 and true hash the same, which just costs a comparison.
+        return cls(kind, value, hash(value))
+
+    def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
+        if not isinstance(other, HashKey):
+            return NotImplemented
+        return (
+            self.hash == other.hash
+            and self.kind is other.kind
+            and self.value == other.value
+        )
+
+    def __hash__(self) -> int:
+        return self.hash
 
 
 class Hashable(Object):
+    __slots__ = ()
+
     @abc.abstractmethod
     def hash_key(self) -> HashKey:
         pass
 
 
-@dc.dataclass(frozen=True)
+@dc.dataclass(frozen=True, slots=True)
 class Integer(Hashable):
     value: int
 
     type = ObjectType.INTEGER
 
     def hash_key(self) -> HashKey:
-        return HashKey(value=self.value)
+        return HashKey.of(ObjectType.INTEGER, self.value)
 
     def inspect(self) -> str:
         return str(self.value)
 
 
-@dc.dataclass(frozen=True)
+# Integers in this range are shared, see integer().
+SMALL_INTEGER_MIN = -256
+SMALL_INTEGER_MAX = 65535
+
+
+class SmallIntegers(dict[int, Integer]):
+    """
+    Each small integer is made the first time it's needed, then shared.
+    """
+
+    def __missing__(self, value: int) -> Integer:
+        integer = self[value] = Integer(value=value)
+        return integer
+
+
+_small_integers = SmallIntegers()
+
+
+def integer(value: int) -> Integer:
+    """
+    Integer results should be made here rather than with Integer(), so small
+    ones aren't allocated each time.
+    """
+    if SMALL_INTEGER_MIN <= value <= SMALL_INTEGER_MAX:
+        return _small_integers[value]
+    return Integer(value=value)
+
+
+@dc.dataclass(frozen=True, slots=True)
 class Boolean(Hashable):
     value: bool
 
     type = ObjectType.BOOLEAN
 
     def hash_key(self) -> HashKey:
-        return HashKey(value=self.value)
+        return HashKey.of(ObjectType.BOOLEAN, self.value)
 
     def inspect(self) -> str:
         return str(self.value).lower()
 
 
+# The only booleans, so they can be compared with is.
 TRUE = Boolean(True)
 FALSE = Boolean(False)
 
 
-@dc.dataclass(frozen=True)
+def boolean(value: bool) -> Boolean:
+    return TRUE if value else FALSE
+
+
+@dc.dataclass(frozen=True, slots=True, init=False, eq=False, repr=False)
 class String(Hashable):
-    value: str
+    # A str, or a ropes.Rope until the str is first needed, see value.
+    text: ropes.Text
+    # Made the first time it's needed, see hash_key.
+    _hash_key: HashKey | None
 
     type = ObjectType.STRING
 
+    def __init__(self, value: ropes.Text) -> None:
+        object.__setattr__(self, "text", value)
+        object.__setattr__(self, "_hash_key", None)
+
+    @property
+    def value(self) -> str:
+        if type(text := self.text) is not str:
+            text = text.flatten()
+            object.__setattr__(self, "text", text)
+        return text
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, String):
+            return NotImplemented
+        return self.value == other.value
+
+    def __hash__(self) -> int:
+        return hash(self.value)
+
+    def __repr__(self) -> str:
+        return f"String(value={self.value!r})"
+
     def hash_key(self) -> HashKey:
-        return HashKey(value=int.from_bytes(self.value.encode("utf-8")))
+        if (key := self._hash_key) is None:
+            key = HashKey.of(ObjectType.STRING, self.value)
+            object.__setattr__(self, "_hash_key", key)
+        return key
 
     def inspect(self) -> str:
         return self.value
 
 
-@dc.dataclass(frozen=True)
+@dc.dataclass(frozen=True, slots=True)
 class Null(Object):
     value: None = None
     type = ObjectType.NULL
@@ -111,9 +208,10 @@ class Null(Object):
 NULL = Null()
 
 
-@dc.dataclass(frozen=True)
+@dc.dataclass(frozen=True, slots=True)
 class Array(Object):
-    items: list[Object]
+    # A list, or a vectors.Vector once it's been through push or rest.
+    items: Sequence[Object]
 
     type = ObjectType.ARRAY
 
@@ -121,7 +219,7 @@ class Array(Object):
         return f"[{', '.join(str(item) for item in self.items)}]"
 
 
-@dc.dataclass(frozen=True)
+@dc.dataclass(frozen=True, slots=True)
 class HashPair(Object):
     key: Object
     value: Object
@@ -130,7 +228,7 @@ class HashPair(Object):
         return f"{str(self.key)} : {str(self.value)}"
 
 
-@dc.dataclass(frozen=True)
+@dc.dataclass(frozen=True, slots=True)
 class Hash(Object):
     pairs: Mapping[HashKey, HashPair]
 
@@ -144,7 +242,7 @@ class Hash(Object):
         return s
 
 
-@dc.dataclass(frozen=True)
+@dc.dataclass(frozen=True, slots=True)
 class Return(Object):
     value: Object
 
@@ -154,7 +252,22 @@ class Return(Object):
         return self.value.inspect()
 
 
-@dc.dataclass(frozen=True)
+@dc.dataclass(frozen=True, slots=True)
+class TailCall(Object):
+    """
+    A call left for evaluate.function to make in place of the caller's frame.
+    """
+
+    function: Function
+    arguments: list[Object]
+
+    type = ObjectType.TAIL_CALL
+
+    def inspect(self) -> str:
+        return f"TailCall: {self.function.inspect()}"
+
+
+@dc.dataclass(frozen=True, slots=True)
 class Error(Object):
     message: str
 
@@ -164,11 +277,13 @@ class Error(Object):
         return f"ERROR: {self.message}"
 
 
-@dc.dataclass(frozen=True)
+@dc.dataclass(frozen=True, slots=True)
 class Function(Object):
     body: ast.BlockStatement
     env: environment.Environment
     parameters: list[ast.Identifier] = dc.field(default_factory=list)
+    # From the resolved literal, calls then get an environment.Slots.
+    slots: tuple[str, ...] | None = None
 
     type = ObjectType.FUNCTION
 
@@ -178,6 +293,74 @@ class Function(Object):
         return f"{s}{str(self.body)}" + "\n}"
 
 
+@dc.dataclass(frozen=True, slots=True)
+class Range(Object):
+    """
+    Integers from start up to end, made one at a time as they're needed.
+    """
+
+    start: int
+    end: int
+    step: int
+
+    type = ObjectType.RANGE
+
+    def __iter__(self) -> Iterator[Object]:
+        return map(integer, range(self.start, self.end, self.step))
+
+    def inspect(self) -> str:
+        return f"range({self.start}, {self.end}, {self.step})"
+
+
+@dc.dataclass(frozen=True, slots=True, repr=False)
+class Stream(Object):
+    """
+    Values from map, filter or take, worked out afresh each time it's iterated.
+    An error ends it.
+    """
+
+    items: Callable[[], Iterator[Object]]
+
+    type = ObjectType.STREAM
+
+    def __iter__(self) -> Iterator[Object]:
+        return self.items()
+
+    def inspect(self) -> str:
+        items: list[str] = []
+        for item in self:
+            if type(item) is Error:
+                return item.inspect()
+            items.append(str(item))
+        return f"[{', '.join(items)}]"
+
+    def __repr__(self) -> str:
+        return f"Stream({self.inspect()})"
+
+
+def values(obj: Object) -> Iterator[Object] | None:
+    """
+    The items of an array, range or stream, or None for anything else.
+    """
+    if isinstance(obj, Array):
+        return iter(obj.items)
+    if isinstance(obj, (Range, Stream)):
+        return iter(obj)
+    return None
+
+
+# How builtins call the functions they're given, by type of function. Each
+# engine adds its own, returning a callable taking and returning objects.
+CALLERS: dict[type[Object], Callable[[Object], Callable[..., Object]]] = {}
+
+
+def caller(function: Object) -> Callable[..., Object] | None:
+    for cls in type(function).__mro__:
+        if bind := CALLERS.get(cls):
+            return bind(function)
+    return None
+
+
 class F(abc.ABC):
     """
     aka Built in function - avoid name overlap with evaluated object.
@@ -198,9 +381,10 @@ class GetLength(F):
 
         arg = args[0]
         if isinstance(arg, String):
-            return Integer(value=len(arg.value))
+            # A rope knows its length without being flattened.
+            return integer(len(arg.text))
         elif isinstance(arg, Array):
-            return Integer(value=len(arg.items))
+            return integer(len(arg.items))
 
         return Error(message=f"{self.UNSUPPORTED_TYPE} {arg.type}")
 
@@ -264,7 +448,7 @@ class Rest(F):
         if isinstance(arg, Array):
             if not arg.items:
                 return Array(items=[])
-            return Array(items=[item for item in arg.items[1:]])
+            return Array(items=vectors.of(arg.items).rest())
         return Error(message=f"{self.UNSUPPORTED_TYPE} {arg.type}")
 
 
@@ -282,17 +466,309 @@ class Push(F):
 
         arg = args[0]
         if isinstance(arg, Array):
-            return Array(items=[item for item in arg.items] + [args[1]])
+            return Array(items=vectors.of(arg.items).append(args[1]))
         return Error(message=f"{self.UNSUPPORTED_TYPE} {arg.type}")
 
 
+class Set(F):
+    NO_KWARGS = "kwargs not supported"
+    WRONG_NUM_ARGS = "wrong number of arguments, got {}, want 3"
+    UNSUPPORTED_TYPE = "argument to 'set' at position 1 not supported, got"
+    UNUSABLE_KEY = "unusable as hash key:"
+
+    def __call__(self, *args: Object, **kwargs: Object) -> Object:
+        if len(kwargs):
+            return Error(message=self.NO_KWARGS)
+
+        if len(args) != 3:
+            return Error(message=self.WRONG_NUM_ARGS.format(len(args)))
+
+        arg, key, value = args
+        if not isinstance(arg, Hash):
+            return Error(message=f"{self.UNSUPPORTED_TYPE} {arg.type}")
+        if not isinstance(key, Hashable):
+            return Error(message=f"{self.UNUSABLE_KEY} {key.type}")
+
+        pair = HashPair(key=key, value=value)
+        return Hash(pairs=hashmaps.of(arg.pairs).set(key.hash_key(), pair))
+
+
+class Delete(F):
+    NO_KWARGS = "kwargs not supported"
+    WRONG_NUM_ARGS = "wrong number of arguments, got {}, want 2"
+    UNSUPPORTED_TYPE = "argument to 'delete' at position 1 not supported, got"
+    UNUSABLE_KEY = "unusable as hash key:"
+
+    def __call__(self, *args: Object, **kwargs: Object) -> Object:
+        if len(kwargs):
+            return Error(message=self.NO_KWARGS)
+
+        if len(args) != 2:
+            return Error(message=self.WRONG_NUM_ARGS.format(len(args)))
+
+        arg, key = args
+        if not isinstance(arg, Hash):
+            return Error(message=f"{self.UNSUPPORTED_TYPE} {arg.type}")
+        if not isinstance(key, Hashable):
+            return Error(message=f"{self.UNUSABLE_KEY} {key.type}")
+        return Hash(pairs=hashmaps.of(arg.pairs).delete(key.hash_key()))
+
+
+class Merge(F):
+    """
+    The first hash with the second's pairs set over it.
+    """
+
+    NO_KWARGS = "kwargs not supported"
+    WRONG_NUM_ARGS = "wrong number of arguments, got {}, want 2"
+    UNSUPPORTED_TYPE = "argument to 'merge' at position {} not supported, got"
+
+    def __call__(self, *args: Object, **kwargs: Object) -> Object:
+        if len(kwargs):
+            return Error(message=self.NO_KWARGS)
+
+        if len(args) != 2:
+            return Error(message=self.WRONG_NUM_ARGS.format(len(args)))
+
+        left, right = args
+        if not isinstance(left, Hash):
+            message = self.UNSUPPORTED_TYPE.format(1)
+            return Error(message=f"{message} {left.type}")
+        if not isinstance(right, Hash):
+            message = self.UNSUPPORTED_TYPE.format(2)
+            return Error(message=f"{message} {right.type}")
+        return Hash(pairs=hashmaps.of(left.pairs).merge(right.pairs))
+
+
+class Join(F):
+    """
+    The strings in an array joined into one, with an optional separator.
+    """
+
+    NO_KWARGS = "kwargs not supported"
+    WRONG_NUM_ARGS = "wrong number of arguments, got {}, want 1 or 2"
+    UNSUPPORTED_TYPE = "argument to 'join' at position {} not supported, got"
+    UNSUPPORTED_ITEM = "items joined must be STRING, got"
+
+    def __call__(self, *args: Object, **kwargs: Object) -> Object:
+        if len(kwargs):
+            return Error(message=self.NO_KWARGS)
+
+        if len(args) not in (1, 2):
+            return Error(message=self.WRONG_NUM_ARGS.format(len(args)))
+
+        arg, separator = args[0], args[1] if len(args) == 2 else String("")
+        if not isinstance(arg, Array):
+            message = self.UNSUPPORTED_TYPE.format(1)
+            return Error(message=f"{message} {arg.type}")
+        if not isinstance(separator, String):
+            message = self.UNSUPPORTED_TYPE.format(2)
+            return Error(message=f"{message} {separator.type}")
+
+        pieces: list[str] = []
+        for item in arg.items:
+            if not isinstance(item, String):
+                return Error(message=f"{self.UNSUPPORTED_ITEM} {item.type}")
+            pieces.append(item.value)
+        return String(separator.value.join(pieces))
+
+
+class MakeRange(F):
+    """
+    range(end), range(start, end) or range(start, end, step).
+    """
+
+    NO_KWARGS = "kwargs not supported"
+    WRONG_NUM_ARGS = "wrong number of arguments, got {}, want 1 to 3"
+    UNSUPPORTED_TYPE = "argument to 'range' at position {} not supported, got"
+    ZERO_STEP = "argument to 'range' at position 3 must not be 0"
+
+    def __call__(self, *args: Object, **kwargs: Object) -> Object:
+        if len(kwargs):
+            return Error(message=self.NO_KWARGS)
+
+        if not 1 <= len(args) <= 3:
+            return Error(message=self.WRONG_NUM_ARGS.format(len(args)))
+
+        bounds: list[int] = []
+        for position, arg in enumerate(args, start=1):
+            if not isinstance(arg, Integer):
+                message = self.UNSUPPORTED_TYPE.format(position)
+                return Error(message=f"{message} {arg.type}")
+            bounds.append(arg.value)
+
+        if len(bounds) == 1:
+            return Range(0, bounds[0], 1)
+        if len(bounds) == 3 and bounds[2] == 0:
+            return Error(message=self.ZERO_STEP)
+        return Range(bounds[0], bounds[1], bounds[2] if len(bounds) == 3 else 1)
+
+
+class Map(F):
+    NO_KWARGS = "kwargs not supported"
+    WRONG_NUM_ARGS = "wrong number of arguments, got {}, want 2"
+    UNSUPPORTED_TYPE = "argument to 'map' at position {} not supported, got"
+
+    def __call__(self, *args: Object, **kwargs: Object) -> Object:
+        if len(kwargs):
+            return Error(message=self.NO_KWARGS)
+
+        if len(args) != 2:
+            return Error(message=self.WRONG_NUM_ARGS.format(len(args)))
+
+        source, function = args
+        if values(source) is None:
+            message = self.UNSUPPORTED_TYPE.format(1)
+            return Error(message=f"{message} {source.type}")
+        if (call := caller(function)) is None:
+            message = self.UNSUPPORTED_TYPE.format(2)
+            return Error(message=f"{message} {function.type}")
+
+        def items() -> Iterator[Object]:
+            for item in values(source) or ():
+                result = item if type(item) is Error else call(item) or NULL
+                yield result
+                if type(result) is Error:
+                    return
+
+        return Stream(items)
+
+
+class Filter(F):
+    """
+    The items for which the function returns neither false nor null.
+    """
+
+    NO_KWARGS = "kwargs not supported"
+    WRONG_NUM_ARGS = "wrong number of arguments, got {}, want 2"
+    UNSUPPORTED_TYPE = "argument to 'filter' at position {} not supported, got"
+
+    def __call__(self, *args: Object, **kwargs: Object) -> Object:
+        if len(kwargs):
+            return Error(message=self.NO_KWARGS)
+
+        if len(args) != 2:
+            return Error(message=self.WRONG_NUM_ARGS.format(len(args)))
+
+        source, function = args
+        if values(source) is None:
+            message = self.UNSUPPORTED_TYPE.format(1)
+            return Error(message=f"{message} {source.type}")
+        if (call := caller(function)) is None:
+            message = self.UNSUPPORTED_TYPE.format(2)
+            return Error(message=f"{message} {function.type}")
+
+        def items() -> Iterator[Object]:
+            for item in values(source) or ():
+                keep = item if type(item) is Error else call(item)
+                if type(keep) is Error:
+                    yield keep
+                    return
+                if keep is not FALSE and keep is not NULL and keep is not None:
+                    yield item
+
+        return Stream(items)
+
+
+class Take(F):
+    NO_KWARGS = "kwargs not supported"
+    WRONG_NUM_ARGS = "wrong number of arguments, got {}, want 2"
+    UNSUPPORTED_TYPE = "argument to 'take' at position {} not supported, got"
+
+    def __call__(self, *args: Object, **kwargs: Object) -> Object:
+        if len(kwargs):
+            return Error(message=self.NO_KWARGS)
+
+        if len(args) != 2:
+            return Error(message=self.WRONG_NUM_ARGS.format(len(args)))
+
+        source, count = args
+        if values(source) is None:
+            message = self.UNSUPPORTED_TYPE.format(1)
+            return Error(message=f"{message} {source.type}")
+        if not isinstance(count, Integer):
+            message = self.UNSUPPORTED_TYPE.format(2)
+            return Error(message=f"{message} {count.type}")
+
+        def items() -> Iterator[Object]:
+            return itertools.islice(values(source) or (), max(count.value, 0))
+
+        return Stream(items)
+
+
+class Reduce(F):
+    """
+    reduce(items, initial, function), calling function(accumulated, item).
+    """
+
+    NO_KWARGS = "kwargs not supported"
+    WRONG_NUM_ARGS = "wrong number of arguments, got {}, want 3"
+    UNSUPPORTED_TYPE = "argument to 'reduce' at position {} not supported, got"
+
+    def __call__(self, *args: Object, **kwargs: Object) -> Object:
+        if len(kwargs):
+            return Error(message=self.NO_KWARGS)
+
+        if len(args) != 3:
+            return Error(message=self.WRONG_NUM_ARGS.format(len(args)))
+
+        source, accumulated, function = args
+        if (items := values(source)) is None:
+            message = self.UNSUPPORTED_TYPE.format(1)
+            return Error(message=f"{message} {source.type}")
+        if (call := caller(function)) is None:
+            message = self.UNSUPPORTED_TYPE.format(3)
+            return Error(message=f"{message} {function.type}")
+
+        for item in items:
+            if type(item) is Error:
+                return item
+            accumulated = call(accumulated, item) or NULL
+            if type(accumulated) is Error:
+                return accumulated
+        return accumulated
+
+
+class Sum(F):
+    NO_KWARGS = "kwargs not supported"
+    WRONG_NUM_ARGS = "wrong number of arguments, got {}, want 1"
+    UNSUPPORTED_TYPE = "argument to 'sum' not supported, got"
+    UNSUPPORTED_ITEM = "items summed must be INTEGER, got"
+
+    def __call__(self, *args: Object, **kwargs: Object) -> Object:
+        if len(kwargs):
+            return Error(message=self.NO_KWARGS)
+
+        if len(args) != 1:
+            return Error(message=self.WRONG_NUM_ARGS.format(len(args)))
+
+        arg = args[0]
+        if isinstance(arg, Range):
+            # An arithmetic series, so without going through it.
+            items = range(arg.start, arg.end, arg.step)
+            if not items:
+                return integer(0)
+            return integer(len(items) * (items[0] + items[-1]) // 2)
+        if (items := values(arg)) is None:
+            return Error(message=f"{self.UNSUPPORTED_TYPE} {arg.type}")
+
+        total = 0
+        for item in items:
+            if type(item) is Error:
+                return item
+            if not isinstance(item, Integer):
+                return Error(message=f"{self.UNSUPPORTED_ITEM} {item.type}")
+            total += item.value
+        return integer(total)
+
+
 class Puts(F):
     def __call__(self, *args: Object, **kwargs: Object) -> None:
         for arg in args:
             print(arg.inspect())
 
 
-@dc.dataclass(frozen=True)
+@dc.dataclass(frozen=True, slots=True)
 class BuiltInFunction(Object):
     function: F
 
@@ -302,23 +778,35 @@ class BuiltInFunction(Object):
         return str(self.function)
 
 
-@dc.dataclass(frozen=True)
+@dc.dataclass(frozen=True, slots=True)
 class CompiledFunction(Object):
     instructions: code.Instructions
 
     num_locals: int
     num_params: int
+    # Decoded the first time it's run, see decoded.
+    _decoded: list[code.DecodedInstruction] | None = dc.field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     type = ObjectType.COMPILED_FUNCTION
 
+    @property
+    def decoded(self) -> list[code.DecodedInstruction]:
+        if (decoded := self._decoded) is None:
+            decoded = code.decode(self.instructions)
+            object.__setattr__(self, "_decoded", decoded)
+        return decoded
+
     def inspect(self) -> str:
         return str(self)
 
 
-@dc.dataclass(frozen=True)
+@dc.dataclass(frozen=True, slots=True)
 class Closure(Object):
     function: CompiledFunction
-    free: list[Object]
+    # Captured once when the closure is made, frames read them in place.
+    free: tuple[Object, ...]
 
     type_: ObjectType = ObjectType.CLOSURE
 
@@ -326,6 +814,14 @@ class Closure(Object):
         return f"Closure: {self}"
 
 
+def builtin_caller(builtin: Object) -> Callable[..., Object]:
+    assert isinstance(builtin, BuiltInFunction)
+    return builtin.function
+
+
+CALLERS[BuiltInFunction] = builtin_caller
+
+
 BUILTIN_MAP: dict[str, BuiltInFunction] = {
     "len": BuiltInFunction(function=GetLength()),
     "puts": BuiltInFunction(function=Puts()),
@@ -333,6 +829,16 @@ BUILTIN_MAP: dict[str, BuiltInFunction] = {
     "last": BuiltInFunction(function=Last()),
     "rest": BuiltInFunction(function=Rest()),
     "push": BuiltInFunction(function=Push()),
+    "set": BuiltInFunction(function=Set()),
+    "delete": BuiltInFunction(function=Delete()),
+    "merge": BuiltInFunction(function=Merge()),
+    "join": BuiltInFunction(function=Join()),
+    "range": BuiltInFunction(function=MakeRange()),
+    "map": BuiltInFunction(function=Map()),
+    "filter": BuiltInFunction(function=Filter()),
+    "reduce": BuiltInFunction(function=Reduce()),
+    "sum": BuiltInFunction(function=Sum()),
+    "take": BuiltInFunction(function=Take()),
 }
 
 BUILTINS = tuple(f for _, f in BUILTIN_MAP.items())
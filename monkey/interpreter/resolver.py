@@ -0,0 +1,158 @@
+"""
+Resolve identifiers to slots before evaluating.
+
+Each function's parameters and lets get a slot in an environment.Slots, and
+every identifier bound by an enclosing function is annotated with its
+(depth, slot) so reading it is indexing rather than a name lookup at each
+level. Names bound at the top level stay globals, looked up by name, as do
+builtins.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+import dataclasses as dc
+
+from monkey.interpreter import ast
+
+
+def resolve(program: ast.Program) -> ast.Program:
+    """
+    Annotates the program in place, and returns it.
+    """
+    Resolver().statements(program.statements)
+    return program
+
+
+def slots(node: ast.FunctionLiteral) -> tuple[str, ...]:
+    """
+    Parameters then lets, in the order they're first bound.
+    """
+    assert node.body
+    names = [parameter.value for parameter in node.parameters]
+    names.extend(defined_names(node.body.statements))
+    return tuple(dict.fromkeys(names))
+
+
+def defined_names(statements: list[ast.Statement]) -> Iterator[str]:
+    """
+    Names a block binds, including lets in nested ifs but not in nested
+    functions.
+    """
+    for let in lets(statements):
+        yield let.name.value
+
+
+def lets(statements: list[ast.Statement]) -> Iterator[ast.Let]:
+    """
+    The lets behind defined_names.
+    """
+    for statement in statements:
+        match statement:
+            case ast.Let():
+                yield statement
+                yield from _lets_in(statement.value)
+            case ast.Return():
+                yield from _lets_in(statement.value)
+            case ast.ExpressionStatement():
+                yield from _lets_in(statement.expression)
+
+
+def _lets_in(node: ast.Expression | None) -> Iterator[ast.Let]:
+    match node:
+        case ast.If():
+            yield from _lets_in(node.condition)
+            for block in (node.consequence, node.alternative):
+                if block is not None:
+                    yield from lets(block.statements)
+        case ast.Prefix():
+            yield from _lets_in(node.right)
+        case ast.Infix():
+            yield from _lets_in(node.left)
+            yield from _lets_in(node.right)
+        case ast.Call():
+            yield from _lets_in(node.function)
+            for argument in node.arguments:
+                yield from _lets_in(argument)
+        case ast.Index():
+            yield from _lets_in(node.left)
+            yield from _lets_in(node.index)
+        case ast.ArrayLiteral():
+            for item in node.items:
+                yield from _lets_in(item)
+        case ast.Map():
+            for key, value in node.pairs.items():
+                yield from _lets_in(key)
+                yield from _lets_in(value)
+
+
+def _annotate(node: ast.Node, name: str, value: object) -> None:
+    # Nodes are frozen, but annotations aren't part of their value.
+    object.__setattr__(node, name, value)
+
+
+@dc.dataclass
+class Resolver:
+    # Slot of each name bound by the enclosing functions, innermost last.
+    scopes: list[dict[str, int]] = dc.field(default_factory=list)
+
+    def statements(self, statements: list[ast.Statement]) -> None:
+        for statement in statements:
+            match statement:
+                case ast.Let():
+                    self.identifier(statement.name)
+                    self.expression(statement.value)
+                case ast.Return():
+                    self.expression(statement.value)
+                case ast.ExpressionStatement():
+                    self.expression(statement.expression)
+
+    def identifier(self, node: ast.Identifier) -> None:
+        location: ast.Location | None = None
+        for depth, scope in enumerate(reversed(self.scopes)):
+            if (slot := scope.get(node.value)) is not None:
+                location = (depth, slot)
+                break
+        _annotate(node, "location", location)
+
+    def expression(self, node: ast.Expression | None) -> None:
+        match node:
+            case ast.Identifier():
+                self.identifier(node)
+            case ast.FunctionLiteral():
+                self.function(node)
+            case ast.If():
+                self.expression(node.condition)
+                for block in (node.consequence, node.alternative):
+                    if block is not None:
+                        self.statements(block.statements)
+            case ast.Prefix():
+                self.expression(node.right)
+            case ast.Infix():
+                self.expression(node.left)
+                self.expression(node.right)
+            case ast.Call():
+                self.expression(node.function)
+                for argument in node.arguments:
+                    self.expression(argument)
+            case ast.Index():
+                self.expression(node.left)
+                self.expression(node.index)
+            case ast.ArrayLiteral():
+                for item in node.items:
+                    self.expression(item)
+            case ast.Map():
+                for key, value in node.pairs.items():
+                    self.expression(key)
+                    self.expression(value)
+
+    def function(self, node: ast.FunctionLiteral) -> None:
+        assert node.body
+        names = slots(node)
+        _annotate(node, "slots", names)
+
+        self.scopes.append({name: slot for slot, name in enumerate(names)})
+        for parameter in node.parameters:
+            self.identifier(parameter)
+        self.statements(node.body.statements)
+        self.scopes.pop()
@@ -0,0 +1,66 @@
+"""
+Ropes, for strings built up with +.
+
+Joining two strings makes a node pointing at both instead of copying them, so
+building a string a piece at a time is linear rather than quadratic. The whole
+string is only put together when it's needed, see objects.String.value. Short
+pieces are still joined straight away, as copying them costs less than a node.
+"""
+
+from __future__ import annotations
+
+import dataclasses as dc
+
+
+# Pieces up to this long are copied rather than joined by a node.
+FLAT = 256
+
+
+# Compared and hashed by identity, and not shown in full, as going through a
+# rope as deep as it's long would run out of stack.
+@dc.dataclass(frozen=True, slots=True, eq=False, repr=False)
+class Rope:
+    left: Text
+    right: Text
+    size: int
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __repr__(self) -> str:
+        return f"Rope(size={self.size})"
+
+    def flatten(self) -> str:
+        # Strings built with + lean left as deep as they're long, so no recursion.
+        pieces: list[str] = []
+        stack: list[Text] = [self]
+        while stack:
+            text = stack.pop()
+            if type(text) is str:
+                pieces.append(text)
+            else:
+                assert isinstance(text, Rope)
+                stack.append(text.right)
+                stack.append(text.left)
+        return "".join(pieces)
+
+
+Text = str | Rope
+
+
+def concat(left: Text, right: Text) -> Text:
+    if not left:
+        return right
+    if not right:
+        return left
+
+    size = len(left) + len(right)
+    if type(right) is str:
+        if type(left) is str:
+            if size <= FLAT:
+                return left + right
+        elif type(left.right) is str and len(left.right) + len(right) <= FLAT:
+            # Appending a little to a rope, as a loop building a string does.
+            right = left.right + right
+            return Rope(left.left, right, size)
+    return Rope(left, right, size)
@@ -0,0 +1,449 @@
+"""
+Evaluate by first turning the AST into Python closures.
+
+Each node is visited once, when it's built into a closure specialised for it -
+the operator, literal values and which checks are needed are all fixed then.
+Running the program is a chain of direct calls, with the same results as
+evaluate.node.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import cast
+import dataclasses as dc
+
+from monkey.interpreter import ast, environment, evaluate, objects, resolver
+
+
+Evaluator = Callable[[environment.Environment], objects.Object | None]
+
+# Evaluate to themselves, so never an error.
+LITERALS = (
+    ast.IntegerLiteral,
+    ast.StringLiteral,
+    ast.BooleanLiteral,
+    ast.FunctionLiteral,
+)
+
+BinaryOperator = Callable[[objects.Object, objects.Object], objects.Object]
+
+INFIX_OPERATORS: dict[str, BinaryOperator] = {
+    "+": evaluate.plus,
+    "-": evaluate.minus,
+    "*": evaluate.multiply,
+    "/": evaluate.divide,
+    "<": evaluate.less_than,
+    ">": evaluate.more_than,
+    "==": lambda left, right: evaluate.equality(left, right, True),
+    "!=": lambda left, right: evaluate.equality(left, right, False),
+}
+
+
+@dc.dataclass(frozen=True, slots=True)
+class Function(objects.Function):
+    """
+    A function whose body has already been built.
+    """
+
+    run: Evaluator = dc.field(kw_only=True)
+    names: tuple[str, ...] = dc.field(kw_only=True)
+
+
+def run(program: ast.Program, env: environment.Environment) -> objects.Object | None:
+    return build(program)(env)
+
+
+def build(node: ast.Node) -> Evaluator:
+    match type(node):
+        case ast.Program:
+            assert isinstance(node, ast.Program)
+            return program(node)
+        case ast.BlockStatement:
+            assert isinstance(node, ast.BlockStatement)
+            return block_statement(node)
+        case ast.ExpressionStatement:
+            assert isinstance(node, ast.ExpressionStatement) and node.expression
+            return build(node.expression)
+        case ast.IntegerLiteral:
+            assert isinstance(node, ast.IntegerLiteral)
+            return constant(objects.integer(node.value))
+        case ast.BooleanLiteral:
+            assert isinstance(node, ast.BooleanLiteral)
+            return constant(objects.TRUE if node.value else objects.FALSE)
+        case ast.StringLiteral:
+            assert isinstance(node, ast.StringLiteral)
+            return constant(objects.String(value=node.value))
+        case ast.Identifier:
+            assert isinstance(node, ast.Identifier)
+            return identifier(node)
+        case ast.Prefix:
+            assert isinstance(node, ast.Prefix) and node.right
+            return prefix(node)
+        case ast.Infix:
+            assert isinstance(node, ast.Infix) and node.left and node.right
+            return infix(node)
+        case ast.If:
+            assert isinstance(node, ast.If)
+            return if_expression(node)
+        case ast.Return:
+            assert isinstance(node, ast.Return)
+            return return_statement(node)
+        case ast.Let:
+            assert isinstance(node, ast.Let)
+            return let(node)
+        case ast.ArrayLiteral:
+            assert isinstance(node, ast.ArrayLiteral)
+            return array(node)
+        case ast.FunctionLiteral:
+            assert isinstance(node, ast.FunctionLiteral)
+            return function_literal(node)
+        case ast.Call:
+            assert isinstance(node, ast.Call)
+            return call(node)
+        case ast.Index:
+            assert isinstance(node, ast.Index)
+            return index(node)
+        case ast.Map:
+            assert isinstance(node, ast.Map)
+            return hash(node)
+        case _:
+            raise NotImplementedError(str(type(node)))
+
+
+def constant(value: objects.Object) -> Evaluator:
+    return lambda _: value
+
+
+def program(node: ast.Program) -> Evaluator:
+    resolver.resolve(node)
+    statements = [build(statement) for statement in node.statements]
+
+    def evaluate_program(env: environment.Environment) -> objects.Object | None:
+        result: objects.Object | None = None
+        for statement in statements:
+            result = statement(env)
+
+            if type(result) is objects.Return:
+                return result.value
+            elif type(result) is objects.Error:
+                return result
+        return result
+
+    return evaluate_program
+
+
+def block_statement(node: ast.BlockStatement) -> Evaluator:
+    statements = [build(statement) for statement in node.statements]
+    if len(statements) == 1:
+        return statements[0]
+
+    def evaluate_block(env: environment.Environment) -> objects.Object | None:
+        result: objects.Object | None = None
+        for statement in statements:
+            result = statement(env)
+
+            if type(result) is objects.Return or type(result) is objects.Error:
+                return result
+        return result
+
+    return evaluate_block
+
+
+def identifier(node: ast.Identifier) -> Evaluator:
+    name = node.value
+    fallback: objects.Object = objects.get_builtin_by_name(name) or objects.Error(
+        message=f"{objects.ErrorTypes.MISSING_IDENTIFIER}: {name}"
+    )
+
+    def evaluate_identifier(env: environment.Environment) -> objects.Object | None:
+        value, _ = env.get(name)
+        return value or fallback
+
+    if node.location is None:
+
+        def evaluate_global(env: environment.Environment) -> objects.Object | None:
+            if type(env) is environment.Slots and env.globals:
+                # Not bound by any function, so skip straight past them.
+                env = env.globals
+            value, _ = env.get(name)
+            return value or fallback
+
+        return evaluate_global
+
+    match node.location:
+        case (0, slot):
+
+            def evaluate_local(env: environment.Environment) -> objects.Object | None:
+                value = env.values[slot]  # type: ignore[attr-defined]
+                return value or evaluate_identifier(env)
+
+            return evaluate_local
+        case (1, slot):
+
+            def evaluate_enclosing(
+                env: environment.Environment,
+            ) -> objects.Object | None:
+                value = env.outer.values[slot]  # type: ignore[union-attr]
+                return value or evaluate_identifier(env)
+
+            return evaluate_enclosing
+        case (depth, slot):
+
+            def evaluate_free(env: environment.Environment) -> objects.Object | None:
+                value = cast(environment.Slots, env).lookup(depth, slot)
+                return value or evaluate_identifier(env)
+
+            return evaluate_free
+
+
+def prefix(node: ast.Prefix) -> Evaluator:
+    assert node.right
+    right = build(node.right)
+    operator = node.operator
+
+    def evaluate_prefix(env: environment.Environment) -> objects.Object | None:
+        value = right(env)
+        assert value
+        if type(value) is objects.Error:
+            return value
+        return evaluate.prefix_expression(operator, value)
+
+    return evaluate_prefix
+
+
+def infix(node: ast.Infix) -> Evaluator:
+    assert node.left and node.right
+    left = build(node.left)
+    right = build(node.right)
+
+    operator = INFIX_OPERATORS.get(node.operator)
+    if operator is None:
+        return unknown_infix(left, node.operator, right)
+
+    if isinstance(node.left, LITERALS) and isinstance(node.right, LITERALS):
+
+        def evaluate_literals(env: environment.Environment) -> objects.Object | None:
+            left_value = left(env)
+            right_value = right(env)
+            assert left_value and right_value
+            return operator(left_value, right_value)
+
+        return evaluate_literals
+
+    def evaluate_infix(env: environment.Environment) -> objects.Object | None:
+        left_value = left(env)
+        assert left_value
+        if type(left_value) is objects.Error:
+            return left_value
+        right_value = right(env)
+        assert right_value
+        if type(right_value) is objects.Error:
+            return right_value
+        return operator(left_value, right_value)
+
+    return evaluate_infix
+
+
+def unknown_infix(left: Evaluator, operator: str, right: Evaluator) -> Evaluator:
+    def evaluate_unknown(env: environment.Environment) -> objects.Object | None:
+        left_value = left(env)
+        assert left_value
+        if type(left_value) is objects.Error:
+            return left_value
+        right_value = right(env)
+        assert right_value
+        if type(right_value) is objects.Error:
+            return right_value
+        return evaluate.infix_expression(left_value, operator, right_value)
+
+    return evaluate_unknown
+
+
+def if_expression(node: ast.If) -> Evaluator:
+    condition = build(node.condition)
+    consequence = build(node.consequence) if node.consequence else None
+    alternative = build(node.alternative) if node.alternative is not None else None
+
+    def evaluate_if(env: environment.Environment) -> objects.Object | None:
+        value = condition(env)
+        assert value
+        if type(value) is objects.Error:
+            return value
+        elif consequence is not None and evaluate.is_truthy(value):
+            return consequence(env)
+        elif alternative is not None:
+            return alternative(env)
+        return objects.NULL
+
+    return evaluate_if
+
+
+def return_statement(node: ast.Return) -> Evaluator:
+    value = build(node.value)
+
+    def evaluate_return(env: environment.Environment) -> objects.Object | None:
+        result = value(env)
+        assert result
+        if type(result) is objects.Error:
+            return result
+        return objects.Return(value=result)
+
+    return evaluate_return
+
+
+def let(node: ast.Let) -> Evaluator:
+    name = node.name.value
+    location = node.name.location
+    value = build(node.value)
+
+    def evaluate_let(env: environment.Environment) -> objects.Object | None:
+        result = value(env)
+        assert result
+        if type(result) is objects.Error:
+            return result
+        env.set(name, result)
+        return None
+
+    if location is None:
+        return evaluate_let
+
+    _, slot = location
+
+    def evaluate_local_let(env: environment.Environment) -> objects.Object | None:
+        result = value(env)
+        assert result
+        if type(result) is objects.Error:
+            return result
+        env.values[slot] = result  # type: ignore[attr-defined]
+        return None
+
+    return evaluate_local_let
+
+
+def expressions(
+    nodes: list[ast.Expression],
+) -> Callable[[environment.Environment], list[objects.Object]]:
+    """
+    Like evaluate.expressions, an error is returned on its own.
+    """
+    evaluators = [build(node) for node in nodes]
+
+    def evaluate_expressions(env: environment.Environment) -> list[objects.Object]:
+        result: list[objects.Object] = []
+        for evaluator in evaluators:
+            value = evaluator(env)
+            if type(value) is objects.Error:
+                return [value]
+            if value:
+                result.append(value)
+        return result
+
+    return evaluate_expressions
+
+
+def array(node: ast.ArrayLiteral) -> Evaluator:
+    items = expressions(node.items)
+    return lambda env: objects.Array(items=items(env))
+
+
+def function_literal(node: ast.FunctionLiteral) -> Evaluator:
+    assert node.body
+    body = node.body
+    parameters = node.parameters
+
+    run = build(body)
+    names = tuple(parameter.value for parameter in parameters)
+    slots = node.slots
+
+    def evaluate_function(env: environment.Environment) -> objects.Object | None:
+        return Function(body, env, parameters, slots, run=run, names=names)
+
+    return evaluate_function
+
+
+def call(node: ast.Call) -> Evaluator:
+    function = build(node.function)
+    arguments = expressions(node.arguments)
+
+    def evaluate_call(env: environment.Environment) -> objects.Object | None:
+        func = function(env)
+        assert func
+
+        args = arguments(env)
+        if len(args) == 1 and type(args[0]) is objects.Error:
+            return args[0]
+        return apply(func, args)
+
+    return evaluate_call
+
+
+def apply(func: objects.Object, arguments: list[objects.Object]) -> objects.Object:
+    if not isinstance(func, Function):
+        # Builtins, errors and functions from evaluate.node.
+        return evaluate.function(func, arguments)
+
+    env: environment.Environment
+    if func.slots is not None:
+        env = environment.Slots.new_call(
+            func.env, func.slots, arguments[: len(func.names)]
+        )
+    else:
+        env = environment.Environment.new_enclosed(func.env)
+        for i, name in enumerate(func.names):
+            env.store[name] = arguments[i]
+
+    evaluated = func.run(env)
+    assert evaluated
+    if type(evaluated) is objects.Return:
+        return evaluated.value
+    return evaluated
+
+
+def caller(func: objects.Object) -> Callable[..., objects.Object]:
+    return lambda *arguments: apply(func, list(arguments))
+
+
+objects.CALLERS[Function] = caller
+
+
+def index(node: ast.Index) -> Evaluator:
+    left = build(node.left)
+    idx = build(node.index)
+
+    def evaluate_index(env: environment.Environment) -> objects.Object | None:
+        left_value = left(env)
+        assert left_value is not None
+        if type(left_value) is objects.Error:
+            return left_value
+        idx_value = idx(env)
+        assert idx_value is not None
+        if type(idx_value) is objects.Error:
+            return idx_value
+        return evaluate.index_expression(left_value, idx_value)
+
+    return evaluate_index
+
+
+def hash(node: ast.Map) -> Evaluator:
+    pairs = [(build(key), build(value)) for key, value in node.pairs.items()]
+
+    def evaluate_hash(env: environment.Environment) -> objects.Object | None:
+        result: dict[objects.HashKey, objects.HashPair] = {}
+        for key, value in pairs:
+            key_value = cast(objects.Hashable, key(env))
+            assert key_value
+            if type(key_value) is objects.Error:
+                return key_value
+
+            value_value = value(env)
+            assert value_value
+            if type(value_value) is objects.Error:
+                return value_value
+
+            result[key_value.hash_key()] = objects.HashPair(
+                key=key_value, value=value_value
+            )
+        return objects.Hash(pairs=result)
+
+    return evaluate_hash
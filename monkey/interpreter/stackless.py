@@ -0,0 +1,342 @@
+"""
+Evaluate with an explicit stack instead of Python recursion.
+
+Work left to do is kept on a stack of tasks and intermediate results on a stack
+of values, so Monkey recursion is bounded by max_stack rather than Python's
+recursion limit, and evaluation can stop after any number of steps and carry on
+later. Results are the same as evaluate.node.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import cast
+import dataclasses as dc
+
+from monkey.interpreter import ast, environment, evaluate, objects, resolver
+
+
+# Work and value stack entries together. Each is a tuple or an object, so this
+# is on the order of 100MB.
+MAX_STACK = 1_000_000
+
+Task = tuple["Handler", object, environment.Environment]
+Handler = Callable[["Evaluation", object, environment.Environment], None]
+Value = objects.Object | None
+
+
+class Overflow(Exception):
+    pass
+
+
+class Unfinished(Exception):
+    pass
+
+
+@dc.dataclass
+class Evaluation:
+    work: list[Task]
+    values: list[Value]
+    max_stack: int = MAX_STACK
+
+    @classmethod
+    def new(
+        cls,
+        program: ast.Program,
+        env: environment.Environment,
+        max_stack: int = MAX_STACK,
+    ) -> Evaluation:
+        resolver.resolve(program)
+        work: list[Task] = [(block, (program.statements, 0, True), env)]
+        return cls(work=work, values=[], max_stack=max_stack)
+
+    @property
+    def done(self) -> bool:
+        return not self.work
+
+    @property
+    def result(self) -> Value:
+        if self.work:
+            raise Unfinished(f"{len(self.work)} tasks left")
+        return self.values[-1] if self.values else None
+
+    def run(self, steps: int | None = None) -> bool:
+        """
+        Carry on for up to steps tasks, or until done. Returns whether it's done.
+        """
+        work = self.work
+        if steps is None:
+            while work:
+                handler, payload, env = work.pop()
+                handler(self, payload, env)
+            return True
+
+        while work and steps > 0:
+            steps -= 1
+            handler, payload, env = work.pop()
+            handler(self, payload, env)
+        return not work
+
+    def push(
+        self, handler: Handler, payload: object, env: environment.Environment
+    ) -> None:
+        if len(self.work) + len(self.values) >= self.max_stack:
+            raise Overflow(f"More than {self.max_stack} entries")
+        self.work.append((handler, payload, env))
+
+
+def run(
+    program: ast.Program, env: environment.Environment, max_stack: int = MAX_STACK
+) -> Value:
+    evaluation = Evaluation.new(program, env, max_stack)
+    evaluation.run()
+    return evaluation.result
+
+
+# Task handlers. Each pops the values it needs and either pushes its result or
+# pushes more tasks, the one to run first last.
+def node(ev: Evaluation, payload: object, env: environment.Environment) -> None:
+    values = ev.values
+    match payload:
+        case ast.ExpressionStatement():
+            ev.push(node, payload.expression, env)
+        case ast.IntegerLiteral():
+            values.append(objects.integer(payload.value))
+        case ast.BooleanLiteral():
+            values.append(objects.boolean(payload.value))
+        case ast.StringLiteral():
+            values.append(objects.String(value=payload.value))
+        case ast.Identifier():
+            values.append(evaluate.identifier(payload, env))
+        case ast.Prefix():
+            ev.push(prefix, payload.operator, env)
+            ev.push(node, payload.right, env)
+        case ast.Infix():
+            ev.push(infix_right, payload, env)
+            ev.push(node, payload.left, env)
+        case ast.If():
+            ev.push(if_branch, payload, env)
+            ev.push(node, payload.condition, env)
+        case ast.BlockStatement():
+            ev.push(block, (payload.statements, 0, False), env)
+        case ast.Return():
+            ev.push(return_value, None, env)
+            ev.push(node, payload.value, env)
+        case ast.Let():
+            ev.push(let, payload.name, env)
+            ev.push(node, payload.value, env)
+        case ast.ArrayLiteral():
+            ev.push(expressions, (payload.items, 0, [], array), env)
+        case ast.FunctionLiteral():
+            assert payload.body
+            values.append(
+                objects.Function(payload.body, env, payload.parameters, payload.slots)
+            )
+        case ast.Call():
+            ev.push(call_arguments, payload.arguments, env)
+            ev.push(node, payload.function, env)
+        case ast.Index():
+            ev.push(index_right, payload.index, env)
+            ev.push(node, payload.left, env)
+        case ast.Map():
+            ev.push(hash_pairs, (list(payload.pairs.items()), 0, {}), env)
+        case _:
+            raise NotImplementedError(str(type(payload)))
+
+
+def is_error(value: Value) -> bool:
+    return type(value) is objects.Error
+
+
+def block(ev: Evaluation, payload: object, env: environment.Environment) -> None:
+    statements, i, is_program = cast(tuple[list[ast.Statement], int, bool], payload)
+    if i > 0:
+        result = ev.values[-1]
+        if type(result) is objects.Return:
+            if is_program:
+                ev.values[-1] = result.value
+            return
+        if is_error(result):
+            return
+        if i == len(statements):
+            return
+        ev.values.pop()
+    elif not statements:
+        ev.values.append(None)
+        return
+
+    ev.push(block, (statements, i + 1, is_program), env)
+    ev.push(node, statements[i], env)
+
+
+def prefix(ev: Evaluation, payload: object, env: environment.Environment) -> None:
+    right = ev.values[-1]
+    assert right
+    if not is_error(right):
+        ev.values[-1] = evaluate.prefix_expression(cast(str, payload), right)
+
+
+def infix_right(ev: Evaluation, payload: object, env: environment.Environment) -> None:
+    infix = cast(ast.Infix, payload)
+    if not is_error(ev.values[-1]):
+        ev.push(infix_apply, infix.operator, env)
+        ev.push(node, infix.right, env)
+
+
+def infix_apply(ev: Evaluation, payload: object, env: environment.Environment) -> None:
+    right = ev.values.pop()
+    assert right
+    if is_error(right):
+        ev.values[-1] = right
+        return
+    left = ev.values[-1]
+    assert left
+    ev.values[-1] = evaluate.infix_expression(left, cast(str, payload), right)
+
+
+def if_branch(ev: Evaluation, payload: object, env: environment.Environment) -> None:
+    expression = cast(ast.If, payload)
+    condition = ev.values[-1]
+    assert condition
+    if is_error(condition):
+        return
+
+    ev.values.pop()
+    if evaluate.is_truthy(condition) and expression.consequence:
+        ev.push(node, expression.consequence, env)
+    elif expression.alternative is not None:
+        ev.push(node, expression.alternative, env)
+    else:
+        ev.values.append(objects.NULL)
+
+
+def return_value(ev: Evaluation, payload: object, env: environment.Environment) -> None:
+    value = ev.values[-1]
+    assert value
+    if not is_error(value):
+        ev.values[-1] = objects.Return(value=value)
+
+
+def let(ev: Evaluation, payload: object, env: environment.Environment) -> None:
+    name = cast(ast.Identifier, payload)
+    value = ev.values[-1]
+    assert value
+    if is_error(value):
+        return
+
+    if (location := name.location) is not None:
+        cast(environment.Slots, env).values[location[1]] = value
+    else:
+        env.set(name.value, value)
+    ev.values[-1] = None
+
+
+Then = Callable[[Evaluation, list[objects.Object], environment.Environment], None]
+
+
+def expressions(ev: Evaluation, payload: object, env: environment.Environment) -> None:
+    """
+    Like evaluate.expressions - left to right, with an error on its own.
+    """
+    nodes, i, collected, then = cast(
+        tuple[list[ast.Expression], int, list[objects.Object], Then], payload
+    )
+    if i > 0:
+        value = ev.values.pop()
+        if is_error(value):
+            then(ev, [cast(objects.Object, value)], env)
+            return
+        if value:
+            collected.append(value)
+
+    if i == len(nodes):
+        then(ev, collected, env)
+        return
+
+    ev.push(expressions, (nodes, i + 1, collected, then), env)
+    ev.push(node, nodes[i], env)
+
+
+def array(
+    ev: Evaluation, items: list[objects.Object], env: environment.Environment
+) -> None:
+    ev.values.append(objects.Array(items=items))
+
+
+def call_arguments(
+    ev: Evaluation, payload: object, env: environment.Environment
+) -> None:
+    arguments = cast(list[ast.Expression], payload)
+    # The function stays on the value stack until the arguments are in.
+    ev.push(expressions, (arguments, 0, [], call), env)
+
+
+def call(
+    ev: Evaluation, arguments: list[objects.Object], env: environment.Environment
+) -> None:
+    func = ev.values.pop()
+    assert func
+    if len(arguments) == 1 and is_error(arguments[0]):
+        ev.values.append(arguments[0])
+        return
+
+    if isinstance(func, objects.Function):
+        ev.push(unwrap_return, None, env)
+        ev.push(node, func.body, evaluate.extended_function_env(func, arguments))
+    else:
+        ev.values.append(evaluate.function(func, arguments))
+
+
+def unwrap_return(
+    ev: Evaluation, payload: object, env: environment.Environment
+) -> None:
+    result = ev.values[-1]
+    if type(result) is objects.Return:
+        ev.values[-1] = result.value
+
+
+def index_right(ev: Evaluation, payload: object, env: environment.Environment) -> None:
+    if not is_error(ev.values[-1]):
+        ev.push(index_apply, None, env)
+        ev.push(node, payload, env)
+
+
+def index_apply(ev: Evaluation, payload: object, env: environment.Environment) -> None:
+    idx = ev.values.pop()
+    assert idx is not None
+    if is_error(idx):
+        ev.values[-1] = idx
+        return
+    left = ev.values[-1]
+    assert left is not None
+    ev.values[-1] = evaluate.index_expression(left, idx)
+
+
+def hash_pairs(ev: Evaluation, payload: object, env: environment.Environment) -> None:
+    """
+    Keys and values alternately, stopping at the first error like evaluate.hash.
+    """
+    pairs, i, result = cast(
+        tuple[
+            list[tuple[ast.Expression, ast.Expression]],
+            int,
+            dict[objects.HashKey, objects.HashPair],
+        ],
+        payload,
+    )
+    if i > 0:
+        value = ev.values[-1]
+        assert value
+        if is_error(value):
+            return
+        if i % 2 == 0:
+            ev.values.pop()
+            key = cast(objects.Hashable, ev.values.pop())
+            result[key.hash_key()] = objects.HashPair(key=key, value=value)
+
+    if i == 2 * len(pairs):
+        ev.values.append(objects.Hash(pairs=result))
+        return
+
+    ev.push(hash_pairs, (pairs, i + 1, result), env)
+    ev.push(node, pairs[i // 2][i % 2], env)
@@ -0,0 +1,156 @@
+"""
+A persistent vector, for arrays built with push and taken apart with rest.
+
+Items are kept in a trie of 32-wide tuples plus a tail of up to 32 more, as in
+Clojure's PersistentVector, so appending copies at most one path of the trie
+and indexing is a few tuple lookups. Dropping the first item is an offset into
+the same trie. Nothing is ever changed in place, so vectors share structure
+freely.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator, Sequence
+from typing import Any, TypeVar, overload
+import dataclasses as dc
+
+
+BITS = 5
+WIDTH = 1 << BITS
+MASK = WIDTH - 1
+
+T = TypeVar("T")
+
+Node = tuple[Any, ...]
+
+
+@dc.dataclass(frozen=True, slots=True, eq=False)
+class Vector(Sequence[T]):
+    # Items in the trie and tail, including those before start.
+    size: int = 0
+    # Bits to shift an index by to find its slot in root.
+    shift: int = BITS
+    root: Node = ()
+    tail: Node = ()
+    # Index of the first item, after rest.
+    start: int = 0
+
+    @classmethod
+    def from_iterable(cls, items: Iterable[T]) -> Vector[T]:
+        values = tuple(items)
+        if not values:
+            return cls()
+
+        # Full leaves go in the trie, what's left over is the tail.
+        tail_start = (len(values) - 1) & ~MASK
+        nodes: list[Node] = [values[i : i + WIDTH] for i in range(0, tail_start, WIDTH)]
+        shift = BITS
+        while len(nodes) > WIDTH:
+            nodes = [tuple(nodes[i : i + WIDTH]) for i in range(0, len(nodes), WIDTH)]
+            shift += BITS
+        return cls(len(values), shift, tuple(nodes), values[tail_start:])
+
+    def __len__(self) -> int:
+        return self.size - self.start
+
+    @overload
+    def __getitem__(self, index: int) -> T: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> Sequence[T]: ...
+
+    def __getitem__(self, index: int | slice) -> T | Sequence[T]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self.leaf(self.start + index)[(self.start + index) & MASK]
+
+    def __iter__(self) -> Iterator[T]:
+        i = self.start
+        while i < self.size:
+            leaf = self.leaf(i)
+            yield from leaf[i & MASK :]
+            i = (i | MASK) + 1
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Sequence) or isinstance(other, str):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        # As a list, so arrays show the same whichever they're backed by.
+        return repr(list(self))
+
+    def tail_offset(self) -> int:
+        return self.size - len(self.tail)
+
+    def leaf(self, index: int) -> Node:
+        """
+        The 32 item tuple holding the item at index, counting from 0 not start.
+        """
+        if index >= self.tail_offset():
+            return self.tail
+
+        node = self.root
+        for level in range(self.shift, 0, -BITS):
+            node = node[(index >> level) & MASK]
+        return node
+
+    def append(self, item: T) -> Vector[T]:
+        if len(self.tail) < WIDTH:
+            tail = (*self.tail, item)
+            return Vector(self.size + 1, self.shift, self.root, tail, self.start)
+
+        # The tail is full, it goes into the trie and item starts a new one.
+        if (self.size >> BITS) > (1 << self.shift):
+            # No room left under root, so it goes one level deeper.
+            root = (self.root, new_path(self.shift, self.tail))
+            shift = self.shift + BITS
+        else:
+            root = push_tail(self.size, self.shift, self.root, self.tail)
+            shift = self.shift
+        return Vector(self.size + 1, shift, root, (item,), self.start)
+
+    def rest(self) -> Vector[T]:
+        """
+        All but the first item, sharing everything with this vector.
+        """
+        if not len(self):
+            return self
+        return Vector(self.size, self.shift, self.root, self.tail, self.start + 1)
+
+
+def of(items: Iterable[T]) -> Vector[T]:
+    if isinstance(items, Vector):
+        return items
+    return Vector.from_iterable(items)
+
+
+def new_path(level: int, node: Node) -> Node:
+    while level:
+        node = (node,)
+        level -= BITS
+    return node
+
+
+def push_tail(size: int, level: int, parent: Node, tail: Node) -> Node:
+    """
+    Copy of parent with tail added as the last leaf under it.
+    """
+    index = ((size - 1) >> level) & MASK
+    if level == BITS:
+        child = tail
+    elif index < len(parent):
+        child = push_tail(size, level - BITS, parent[index], tail)
+    else:
+        child = new_path(level - BITS, tail)
+
+    if index < len(parent):
+        return (*parent[:index], child, *parent[index + 1 :])
+    return (*parent, child)
@@ -0,0 +1,110 @@
+import os
+import tempfile
+import unittest
+
+from monkey.compiler import cache, compilers, vm
+from monkey.interpreter import objects
+from tests import utils
+from tests.compiler import test_compilers, test_vm
+
+
+SOURCE = (
+    'let greeting = "hello" + " world";\n'
+    "let adder = fn(a) { fn(b) { a + b } };\n"
+    "let big = 123456789012345678901234567890;\n"
+    "[-1, big, len(greeting), adder(1)]"
+)
+
+
+def compile_source(source: str) -> compilers.Bytecode:
+    compiler = compilers.Compiler.new()
+    compiler.compile(utils.parse(source))
+    return compiler.bytecode()
+
+
+class TestCache(unittest.TestCase):
+    def test_round_trip(self) -> None:
+        bytecode = compile_source(SOURCE)
+        bytecode.constants.append(objects.String(value="héllo ✓"))
+
+        loaded = cache.loads(cache.dumps(bytecode, SOURCE), SOURCE)
+
+        test_compilers.test_instructions(
+            self, [bytecode.instructions], loaded.instructions
+        )
+        self.assertEqual(bytecode.num_globals, loaded.num_globals)
+        self.assertEqual(len(bytecode.constants), len(loaded.constants))
+        for expected, actual in zip(bytecode.constants, loaded.constants):
+            with self.subTest(expected.inspect()):
+                self.assertIs(type(expected), type(actual))
+                if isinstance(expected, objects.CompiledFunction):
+                    assert isinstance(actual, objects.CompiledFunction)
+                    test_compilers.test_instructions(
+                        self, [expected.instructions], actual.instructions
+                    )
+                    self.assertEqual(expected.num_locals, actual.num_locals)
+                    self.assertEqual(expected.num_params, actual.num_params)
+                else:
+                    self.assertEqual(expected, actual)
+
+    def test_loaded_bytecode_runs(self) -> None:
+        source = "let sum = fn(a, b) { a + b }; sum(-40, 2) * 3"
+        data = cache.dumps(compile_source(source), source)
+
+        machine = vm.VM.from_bytecode(cache.loads(data, source))
+        machine.run()
+
+        test_vm.test_expected_object(self, -114, machine.last_popped_stack_elem)
+
+    def test_stale(self) -> None:
+        data = cache.dumps(compile_source("1 + 2"), "1 + 2")
+
+        with self.subTest("source"), self.assertRaises(cache.Stale):
+            cache.loads(data, "1 + 3")
+
+        with self.subTest("optimization level"), self.assertRaises(cache.Stale):
+            cache.loads(data, "1 + 2", optimization_level=1)
+
+        old = bytearray(data)
+        old[4:6] = (cache.FORMAT_VERSION + 1).to_bytes(2)
+        with self.subTest("format version"), self.assertRaises(cache.Stale):
+            cache.loads(bytes(old), "1 + 2")
+
+    def test_corrupt(self) -> None:
+        data = cache.dumps(compile_source(SOURCE), SOURCE)
+
+        test_cases: tuple[tuple[str, bytes], ...] = (
+            ("empty", b""),
+            ("magic", b"NOPE" + data[4:]),
+            ("truncated", data[:-3]),
+            ("trailing", data + b"\x00"),
+        )
+
+        for name, corrupt in test_cases:
+            with self.subTest(name), self.assertRaises(cache.Corrupt):
+                cache.loads(corrupt, SOURCE)
+
+    def test_load_and_store(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "script.mky")
+            bytecode = compile_source(SOURCE)
+
+            self.assertIsNone(cache.load(filename, SOURCE))
+
+            cache.store(filename, SOURCE, bytecode)
+            self.assertTrue(os.path.exists(os.path.join(directory, "script.mkyc")))
+
+            loaded = cache.load(filename, SOURCE)
+            assert loaded is not None
+            self.assertEqual(loaded.instructions, bytecode.instructions)
+
+            self.assertIsNone(cache.load(filename, SOURCE + ";"))
+
+    def test_cache_dir(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            first = cache.cache_path("a/script.mky", directory)
+            second = cache.cache_path("b/script.mky", directory)
+
+            self.assertEqual(os.path.dirname(first), directory)
+            self.assertTrue(first.endswith(cache.EXTENSION))
+            self.assertNotEqual(first, second)
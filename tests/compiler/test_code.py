@@ -76,3 +76,47 @@ class TestOpCodes(unittest.TestCase):
                 operands_read, n = code.read_operands(definition, instruction[1:])
                 self.assertEqual(n, bytes_read)
                 self.assertEqual(operands_read, operands)
+
+    def test_decode(self) -> None:
+        instructions = code.Instructions.concat_bytes(
+            [
+                code.make(code.OpCodes.TRUE),
+                code.make(code.OpCodes.JUMP_NOT_TRUTHY, 10),
+                code.make(code.OpCodes.CONSTANT, 65535),
+                code.make(code.OpCodes.JUMP, 11),
+                code.make(code.OpCodes.NULL),
+                code.make(code.OpCodes.CLOSURE, 2, 255),
+            ]
+        )
+
+        expected = [
+            (code.OpCodes.TRUE.as_int(), 0, 0),
+            (code.OpCodes.JUMP_NOT_TRUTHY.as_int(), 4, 0),
+            (code.OpCodes.CONSTANT.as_int(), 65535, 0),
+            (code.OpCodes.JUMP.as_int(), 5, 0),
+            (code.OpCodes.NULL.as_int(), 0, 0),
+            (code.OpCodes.CLOSURE.as_int(), 2, 255),
+        ]
+        self.assertEqual(code.decode(instructions), expected)
+
+    def test_encode(self) -> None:
+        instructions = code.Instructions.concat_bytes(
+            [
+                code.make(code.OpCodes.TRUE),
+                code.make(code.OpCodes.JUMP_NOT_TRUTHY, 10),
+                code.make(code.OpCodes.CONSTANT, 65535),
+                code.make(code.OpCodes.JUMP, 15),
+                code.make(code.OpCodes.NULL),
+                code.make(code.OpCodes.CLOSURE, 2, 255),
+            ]
+        )
+
+        self.assertEqual(code.encode(code.decode(instructions)), instructions)
+
+    def test_decode_bad_jump(self) -> None:
+        instructions = code.Instructions.concat_bytes(
+            [code.make(code.OpCodes.JUMP, 2), code.make(code.OpCodes.NULL)]
+        )
+
+        with self.assertRaises(code.NotFound):
+            code.decode(instructions)
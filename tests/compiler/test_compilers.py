@@ -10,11 +10,12 @@ from tests import utils
 def run_compiler_tests(
     tc: unittest.TestCase,
     test_cases: tuple[tuple[str, list[object], list[code.Instructions]], ...],
+    optimization_level: int = 0,
 ) -> None:
     for input_, expected_constants, expected_instructions in test_cases:
         with tc.subTest(input_):
             program = utils.parse(input_)
-            compiler = compilers.Compiler.new()
+            compiler = compilers.Compiler.new(optimization_level=optimization_level)
 
             try:
                 compiler.compile(program)
@@ -555,14 +556,14 @@ class TestCompiler(unittest.TestCase):
             (
                 (
                     "[1, 2, 3][1 + 1]",
-                    [1, 2, 3, 1, 1],
+                    [1, 2, 3],
                     [
                         code.make(code.OpCodes.CONSTANT, 0),
                         code.make(code.OpCodes.CONSTANT, 1),
                         code.make(code.OpCodes.CONSTANT, 2),
                         code.make(code.OpCodes.ARRAY, 3),
-                        code.make(code.OpCodes.CONSTANT, 3),
-                        code.make(code.OpCodes.CONSTANT, 4),
+                        code.make(code.OpCodes.CONSTANT, 0),
+                        code.make(code.OpCodes.CONSTANT, 0),
                         code.make(code.OpCodes.ADD),
                         code.make(code.OpCodes.INDEX),
                         code.make(code.OpCodes.POP),
@@ -570,13 +571,13 @@ class TestCompiler(unittest.TestCase):
                 ),
                 (
                     "{1: 2}[2 - 1]",
-                    [1, 2, 2, 1],
+                    [1, 2],
                     [
                         code.make(code.OpCodes.CONSTANT, 0),
                         code.make(code.OpCodes.CONSTANT, 1),
                         code.make(code.OpCodes.HASH, 2),
-                        code.make(code.OpCodes.CONSTANT, 2),
-                        code.make(code.OpCodes.CONSTANT, 3),
+                        code.make(code.OpCodes.CONSTANT, 1),
+                        code.make(code.OpCodes.CONSTANT, 0),
                         code.make(code.OpCodes.SUBTRACT),
                         code.make(code.OpCodes.INDEX),
                         code.make(code.OpCodes.POP),
@@ -585,6 +586,124 @@ class TestCompiler(unittest.TestCase):
             ),
         )
 
+    def test_constants_are_interned(self) -> None:
+        run_compiler_tests(
+            self,
+            (
+                (
+                    '1; "1"; 1; "1"',
+                    [1, "1"],
+                    [
+                        code.make(code.OpCodes.CONSTANT, 0),
+                        code.make(code.OpCodes.POP),
+                        code.make(code.OpCodes.CONSTANT, 1),
+                        code.make(code.OpCodes.POP),
+                        code.make(code.OpCodes.CONSTANT, 0),
+                        code.make(code.OpCodes.POP),
+                        code.make(code.OpCodes.CONSTANT, 1),
+                        code.make(code.OpCodes.POP),
+                    ],
+                ),
+                (
+                    "fn() { 1 }; fn() { 1 }; fn(a) { 1 }",
+                    [
+                        1,
+                        [
+                            code.make(code.OpCodes.CONSTANT, 0),
+                            code.make(code.OpCodes.RETURN_VALUE),
+                        ],
+                        [
+                            code.make(code.OpCodes.CONSTANT, 0),
+                            code.make(code.OpCodes.RETURN_VALUE),
+                        ],
+                    ],
+                    [
+                        code.make(code.OpCodes.CLOSURE, 1, 0),
+                        code.make(code.OpCodes.POP),
+                        code.make(code.OpCodes.CLOSURE, 1, 0),
+                        code.make(code.OpCodes.POP),
+                        code.make(code.OpCodes.CLOSURE, 2, 0),
+                        code.make(code.OpCodes.POP),
+                    ],
+                ),
+            ),
+        )
+
+    def test_constant_folding(self) -> None:
+        run_compiler_tests(
+            self,
+            (
+                (
+                    "60 * 60 * 24",
+                    [86400],
+                    [
+                        code.make(code.OpCodes.CONSTANT, 0),
+                        code.make(code.OpCodes.POP),
+                    ],
+                ),
+                (
+                    '"prefix" + "suffix"',
+                    ["prefixsuffix"],
+                    [
+                        code.make(code.OpCodes.CONSTANT, 0),
+                        code.make(code.OpCodes.POP),
+                    ],
+                ),
+                (
+                    "-7 / 2",
+                    [-4],
+                    [
+                        code.make(code.OpCodes.CONSTANT, 0),
+                        code.make(code.OpCodes.POP),
+                    ],
+                ),
+                (
+                    "[1 < 2, 1 == 2]",
+                    [],
+                    [
+                        code.make(code.OpCodes.TRUE),
+                        code.make(code.OpCodes.FALSE),
+                        code.make(code.OpCodes.ARRAY, 2),
+                        code.make(code.OpCodes.POP),
+                    ],
+                ),
+                (
+                    "let x = 1; x * (2 + 3)",
+                    [1, 5],
+                    [
+                        code.make(code.OpCodes.CONSTANT, 0),
+                        code.make(code.OpCodes.SET_GLOBAL, 0),
+                        code.make(code.OpCodes.GET_GLOBAL, 0),
+                        code.make(code.OpCodes.CONSTANT, 1),
+                        code.make(code.OpCodes.MULTIPLY),
+                        code.make(code.OpCodes.POP),
+                    ],
+                ),
+                (
+                    "1 / 0",
+                    [1, 0],
+                    [
+                        code.make(code.OpCodes.CONSTANT, 0),
+                        code.make(code.OpCodes.CONSTANT, 1),
+                        code.make(code.OpCodes.DIVIDE),
+                        code.make(code.OpCodes.POP),
+                    ],
+                ),
+                (
+                    "(if (true) { 1 } else { 2 }) + 3",
+                    [1, 2, 3],
+                    [
+                        # Folded by the peephole optimiser, not by the compiler.
+                        code.make(code.OpCodes.CONSTANT, 0),
+                        code.make(code.OpCodes.CONSTANT, 2),
+                        code.make(code.OpCodes.ADD),
+                        code.make(code.OpCodes.POP),
+                    ],
+                ),
+            ),
+            optimization_level=1,
+        )
+
     def test_compiler_scopes(self) -> None:
         compiler = compilers.Compiler.new()
         self.assertEqual(compiler.scope_index, 0)
@@ -628,6 +747,25 @@ class TestCompiler(unittest.TestCase):
         assert previous_instruction is not None
         self.assertEqual(previous_instruction.op_code, code.OpCodes.MULTIPLY)
 
+    def test_emit_appends_in_place(self) -> None:
+        compiler = compilers.Compiler.new()
+        instructions = compiler.current_scope.instructions
+
+        compiler.emit(code.OpCodes.CONSTANT, 0)
+        compiler.emit(code.OpCodes.POP)
+        compiler._remove_pop()
+        compiler.emit(code.OpCodes.RETURN_VALUE)
+
+        self.assertIs(compiler.current_scope.instructions, instructions)
+        test_instructions(
+            self,
+            [
+                code.make(code.OpCodes.CONSTANT, 0),
+                code.make(code.OpCodes.RETURN_VALUE),
+            ],
+            instructions,
+        )
+
     def test_functions(self) -> None:
         run_compiler_tests(
             self,
@@ -866,6 +1004,117 @@ class TestCompiler(unittest.TestCase):
             ),
         )
 
+    def test_recursive_functions(self) -> None:
+        run_compiler_tests(
+            self,
+            (
+                (
+                    "let countDown = fn(x) { countDown(x - 1); }; countDown(1);",
+                    [
+                        1,
+                        [
+                            code.make(code.OpCodes.GET_GLOBAL, 0),
+                            code.make(code.OpCodes.GET_LOCAL, 0),
+                            code.make(code.OpCodes.CONSTANT, 0),
+                            code.make(code.OpCodes.SUBTRACT),
+                            code.make(code.OpCodes.TAIL_CALL, 1),
+                            code.make(code.OpCodes.RETURN_VALUE),
+                        ],
+                    ],
+                    [
+                        code.make(code.OpCodes.CLOSURE, 1, 0),
+                        code.make(code.OpCodes.SET_GLOBAL, 0),
+                        code.make(code.OpCodes.GET_GLOBAL, 0),
+                        code.make(code.OpCodes.CONSTANT, 0),
+                        code.make(code.OpCodes.CALL, 1),
+                        code.make(code.OpCodes.POP),
+                    ],
+                ),
+                (
+                    (
+                        "let wrapper = fn() {"
+                        " let countDown = fn(x) { countDown(x - 1); }; countDown(1);"
+                        " };"
+                        " wrapper();"
+                    ),
+                    [
+                        1,
+                        [
+                            code.make(code.OpCodes.CURRENT_CLOSURE),
+                            code.make(code.OpCodes.GET_LOCAL, 0),
+                            code.make(code.OpCodes.CONSTANT, 0),
+                            code.make(code.OpCodes.SUBTRACT),
+                            code.make(code.OpCodes.TAIL_CALL, 1),
+                            code.make(code.OpCodes.RETURN_VALUE),
+                        ],
+                        [
+                            code.make(code.OpCodes.CLOSURE, 1, 0),
+                            code.make(code.OpCodes.SET_LOCAL, 0),
+                            code.make(code.OpCodes.GET_LOCAL, 0),
+                            code.make(code.OpCodes.CONSTANT, 0),
+                            code.make(code.OpCodes.TAIL_CALL, 1),
+                            code.make(code.OpCodes.RETURN_VALUE),
+                        ],
+                    ],
+                    [
+                        code.make(code.OpCodes.CLOSURE, 2, 0),
+                        code.make(code.OpCodes.SET_GLOBAL, 0),
+                        code.make(code.OpCodes.GET_GLOBAL, 0),
+                        code.make(code.OpCodes.CALL, 0),
+                        code.make(code.OpCodes.POP),
+                    ],
+                ),
+            ),
+        )
+
+    def test_tail_calls(self) -> None:
+        run_compiler_tests(
+            self,
+            (
+                (
+                    "let f = fn(n) { if (n) { f(1) } else { len(f(n)) } };",
+                    [
+                        1,
+                        [
+                            code.make(code.OpCodes.GET_LOCAL, 0),
+                            code.make(code.OpCodes.JUMP_NOT_TRUTHY, 16),
+                            code.make(code.OpCodes.GET_GLOBAL, 0),
+                            code.make(code.OpCodes.CONSTANT, 0),
+                            code.make(code.OpCodes.TAIL_CALL, 1),
+                            code.make(code.OpCodes.JUMP, 27),
+                            code.make(code.OpCodes.GET_BUILTIN, 0),
+                            code.make(code.OpCodes.GET_GLOBAL, 0),
+                            code.make(code.OpCodes.GET_LOCAL, 0),
+                            code.make(code.OpCodes.CALL, 1),
+                            code.make(code.OpCodes.CALL, 1),
+                            code.make(code.OpCodes.RETURN_VALUE),
+                        ],
+                    ],
+                    [
+                        code.make(code.OpCodes.CLOSURE, 1, 0),
+                        code.make(code.OpCodes.SET_GLOBAL, 0),
+                    ],
+                ),
+                (
+                    "let f = fn() { return f(); }; f();",
+                    [
+                        [
+                            code.make(code.OpCodes.GET_GLOBAL, 0),
+                            code.make(code.OpCodes.TAIL_CALL, 0),
+                            code.make(code.OpCodes.RETURN_VALUE),
+                        ],
+                    ],
+                    [
+                        code.make(code.OpCodes.CLOSURE, 0, 0),
+                        code.make(code.OpCodes.SET_GLOBAL, 0),
+                        code.make(code.OpCodes.GET_GLOBAL, 0),
+                        code.make(code.OpCodes.CALL, 0),
+                        code.make(code.OpCodes.POP),
+                    ],
+                ),
+            ),
+        )
+
     def test_closures(self) -> None:
         run_compiler_tests(
             self,
@@ -0,0 +1,219 @@
+import unittest
+
+from monkey.compiler import code, compilers, optimizer, vm
+from monkey.interpreter import objects
+from tests import utils
+from tests.compiler import test_compilers, test_vm
+
+
+def run(tc: unittest.TestCase, input_: str, optimization_level: int) -> objects.Object:
+    compiler = compilers.Compiler.new(optimization_level=optimization_level)
+    try:
+        compiler.compile(utils.parse(input_))
+    except compilers.CouldntCompile as exc:
+        tc.fail(str(exc))
+
+    machine = vm.VM.from_bytecode(compiler.bytecode())
+    machine.run()
+    return machine.last_popped_stack_elem
+
+
+class TestOptimizer(unittest.TestCase):
+    def test_dead_code_after_return(self) -> None:
+        instructions = code.Instructions.concat_bytes(
+            [
+                code.make(code.OpCodes.CONSTANT, 0),
+                code.make(code.OpCodes.RETURN_VALUE),
+                code.make(code.OpCodes.CONSTANT, 1),
+                code.make(code.OpCodes.RETURN_VALUE),
+            ]
+        )
+
+        test_compilers.test_instructions(
+            self,
+            [
+                code.make(code.OpCodes.CONSTANT, 0),
+                code.make(code.OpCodes.RETURN_VALUE),
+            ],
+            optimizer.optimize(instructions, keep_result=False),
+        )
+
+    def test_threads_jumps(self) -> None:
+        instructions = code.Instructions.concat_bytes(
+            [
+                code.make(code.OpCodes.GET_GLOBAL, 0),  # 0000
+                code.make(code.OpCodes.JUMP_NOT_TRUTHY, 10),  # 0003
+                code.make(code.OpCodes.GET_GLOBAL, 1),  # 0006
+                code.make(code.OpCodes.POP),  # 0009
+                code.make(code.OpCodes.JUMP, 14),  # 0010
+                code.make(code.OpCodes.NULL),  # 0013
+                code.make(code.OpCodes.GET_GLOBAL, 2),  # 0014
+                code.make(code.OpCodes.POP),  # 0017
+            ]
+        )
+
+        test_compilers.test_instructions(
+            self,
+            [
+                code.make(code.OpCodes.GET_GLOBAL, 0),
+                code.make(code.OpCodes.JUMP_NOT_TRUTHY, 10),
+                code.make(code.OpCodes.GET_GLOBAL, 1),
+                code.make(code.OpCodes.POP),
+                code.make(code.OpCodes.GET_GLOBAL, 2),
+                code.make(code.OpCodes.POP),
+            ],
+            optimizer.optimize(instructions, keep_result=True),
+        )
+
+    def test_folds_constant_conditions(self) -> None:
+        test_cases: tuple[tuple[str, list[code.Instructions]], ...] = (
+            (
+                "if (true) { 10 } else { 20 }; 30",
+                [
+                    code.make(code.OpCodes.CONSTANT, 2),
+                    code.make(code.OpCodes.POP),
+                ],
+            ),
+            (
+                "if (false) { 10 } else { 20 }; 30",
+                [
+                    code.make(code.OpCodes.CONSTANT, 2),
+                    code.make(code.OpCodes.POP),
+                ],
+            ),
+            (
+                "if (false) { 10 } else { 20 }",
+                [
+                    code.make(code.OpCodes.CONSTANT, 1),
+                    code.make(code.OpCodes.POP),
+                ],
+            ),
+        )
+
+        for input_, expected in test_cases:
+            with self.subTest(input_):
+                compiler = compilers.Compiler.new(optimization_level=1)
+                compiler.compile(utils.parse(input_))
+
+                bytecode = compiler.bytecode()
+                test_compilers.test_instructions(
+                    self, expected, bytecode.instructions
+                )
+
+    def test_keeps_jump_targets(self) -> None:
+        instructions = code.Instructions.concat_bytes(
+            [
+                code.make(code.OpCodes.GET_GLOBAL, 0),  # 0000
+                code.make(code.OpCodes.JUMP_NOT_TRUTHY, 9),  # 0003
+                code.make(code.OpCodes.CONSTANT, 0),  # 0006
+                code.make(code.OpCodes.POP),  # 0009
+                code.make(code.OpCodes.NULL),  # 0010
+                code.make(code.OpCodes.POP),  # 0011
+            ]
+        )
+
+        optimized = optimizer.optimize(instructions, keep_result=True)
+        test_compilers.test_instructions(self, [instructions], optimized)
+
+    def test_superinstructions(self) -> None:
+        compiler = compilers.Compiler.new(optimization_level=2)
+        compiler.compile(
+            utils.parse(
+                "let f = fn(a, b) { if (a > b) { a + b } else { a - 1 } }; f(1, 2)"
+            )
+        )
+        bytecode = compiler.bytecode()
+
+        test_compilers.test_instructions(
+            self,
+            [
+                code.make(code.OpCodes.CLOSURE, 1, 0),
+                code.make(code.OpCodes.SET_GLOBAL, 0),
+                code.make(code.OpCodes.CONSTANT, 0),
+                code.make(code.OpCodes.CONSTANT, 2),
+                code.make(code.OpCodes.CALL_GLOBAL, 0, 2),
+                code.make(code.OpCodes.POP),
+            ],
+            bytecode.instructions,
+        )
+
+        function = bytecode.constants[1]
+        assert isinstance(function, objects.CompiledFunction)
+        test_compilers.test_instructions(
+            self,
+            [
+                code.make(code.OpCodes.GET_LOCAL, 0),  # 0000
+                code.make(code.OpCodes.GET_LOCAL, 1),  # 0002
+                code.make(code.OpCodes.JUMP_NOT_GREATER_THAN, 13),  # 0004
+                code.make(code.OpCodes.ADD_LOCALS, 0, 1),  # 0007
+                code.make(code.OpCodes.JUMP, 17),  # 0010
+                code.make(code.OpCodes.SUBTRACT_LOCAL_CONSTANT, 0, 0),  # 0013
+                code.make(code.OpCodes.RETURN_VALUE),  # 0017
+            ],
+            function.instructions,
+        )
+
+    def test_superinstructions_keep_jump_targets(self) -> None:
+        instructions = code.Instructions.concat_bytes(
+            [
+                code.make(code.OpCodes.GET_LOCAL, 0),  # 0000
+                code.make(code.OpCodes.JUMP_NOT_TRUTHY, 7),  # 0002
+                code.make(code.OpCodes.GET_LOCAL, 0),  # 0005
+                code.make(code.OpCodes.GET_LOCAL, 1),  # 0007
+                code.make(code.OpCodes.ADD),  # 0009
+                code.make(code.OpCodes.RETURN_VALUE),  # 0010
+            ]
+        )
+
+        optimized = optimizer.optimize(
+            instructions, keep_result=False, superinstructions=True
+        )
+        test_compilers.test_instructions(self, [instructions], optimized)
+
+    def test_optimized_matches_unoptimized(self) -> None:
+        test_cases: tuple[str, ...] = (
+            "1; 2; 3",
+            "1 + 2 * 3",
+            "if (true) { 10 }",
+            "if (false) { 10 }",
+            "if (1 < 2) { 10 } else { 20 }",
+            "if (true) { if (false) { 1 } else { 2 } } else { 3 }",
+            "let x = if (false) { 1 }; 5; x",
+            "let one = 1; one; 2",
+            "let f = fn() { return 99; 100; }; f()",
+            "let f = fn(a) { if (a > 1) { return a; } 5; 6 }; f(3) + f(0)",
+            "let f = fn() { 1; 2; 3 }; f()",
+            "let f = fn() { if (true) { 1 } else { 2 } }; f()",
+            "let f = fn() { }; f()",
+            '[1, "two", 3][1]',
+            "{1: 2, 3: 4}[3]",
+            "len(rest([1, 2, 3]))",
+            "60 * 60 * 24",
+            '"prefix" + "-" + "suffix"',
+            "-7 / 2",
+            "-(3 - 10) * 2",
+            "(1 < 2) == true",
+            "if (2 * 2 > 3) { 1 } else { 2 }",
+            "let f = fn(a, b) { a + b }; [f(1, 2), f(\"a\", \"b\")]",
+            'let f = fn(a) { a + 1 }; let g = fn(s) { s + "!" }; [f(1), g("hi")]',
+            "let f = fn(a) { a - 1 }; f(f(f(10)))",
+            "let f = fn(a, b) { if (a > b) { 1 } else { 2 } }; [f(1, 2), f(2, 1)]",
+            "let f = fn(a, b) { if (a < b) { 1 } else { 2 } }; [f(1, 2), f(2, 1)]",
+            "let fib = fn(n) { if (n < 2) { n } else { fib(n - 1) + fib(n - 2) } }; fib(10)",
+            "let twice = fn(f, x) { f(f(x)) }; let inc = fn(x) { x + 1 }; twice(inc, 1)",
+            "let f = fn() { len([1, 2]) }; f()",
+        )
+
+        for input_ in test_cases:
+            expected = run(self, input_, optimization_level=0)
+            for optimization_level in (1, 2):
+                with self.subTest(input_, optimization_level=optimization_level):
+                    actual = run(self, input_, optimization_level)
+
+                    self.assertEqual(type(expected), type(actual))
+                    if isinstance(expected, (objects.Array, objects.Hash)):
+                        self.assertEqual(expected.inspect(), actual.inspect())
+                    elif isinstance(expected, objects.Null):
+                        test_vm.test_null_object(self, actual)
+                    else:
+                        test_vm.test_expected_object(self, expected.value, actual)
@@ -153,3 +153,22 @@ class TestSymbolTable(TestCase):
                 pass
             else:
                 self.fail(f"Didn't expect to resolve '{name}' in {second_local}")
+
+    def test_define_and_resolve_function_name(self) -> None:
+        global_scope = st.SymbolTable.new()
+        local = st.SymbolTable.new_enclosed(global_scope)
+        local.define_function_name("a")
+
+        self.assertEqual(
+            local.resolve("a"), st.Symbol(name="a", scope=st.Scope.FUNCTION, index=0)
+        )
+
+    def test_shadowing_function_name(self) -> None:
+        global_scope = st.SymbolTable.new()
+        local = st.SymbolTable.new_enclosed(global_scope)
+        local.define_function_name("a")
+        local.define("a")
+
+        self.assertEqual(
+            local.resolve("a"), st.Symbol(name="a", scope=st.Scope.LOCAL, index=0)
+        )
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import unittest
+from unittest import mock
+
+from monkey.compiler import runtime, transpile
+from monkey.interpreter import evaluate, objects
+from tests import utils
+from tests.interpreter import test_evaluate
+
+
+def get_object(code: str) -> objects.Object:
+    result = transpile.run(utils.parse(code))
+    assert result
+    return result
+
+
+# Python has no tail calls to turn them into.
+globals().update(utils.rerun_evaluate_tests(get_object, skip=("TestTailCalls",)))
+
+
+class TestTranspile(unittest.TestCase):
+    def test_integers_stay_in_python(self) -> None:
+        code = (
+            "let fib = fn(n) { if (n < 2) { return n; } fib(n - 1) + fib(n - 2) };"
+            "fib(15)"
+        )
+
+        with mock.patch.object(evaluate, "infix_expression") as infix:
+            result = get_object(code)
+
+        infix.assert_not_called()
+        test_evaluate.test_self_evaluating_object(self, objects.Integer, result, 610)
+
+    def test_matches_evaluate(self) -> None:
+        test_cases: tuple[str, ...] = (
+            "-7 / 2",
+            "7 / -2",
+            '"a" + "b" == "ab"',
+            "!0",
+            "if (0) { 1 } else { 2 }",
+            'let h = {1: "one", true: "yes", "k": [1, 2]}; [h[1], h[true], h["k"][1]]',
+            "let add = fn(a) { fn(b) { a + b }; }; let two = add(2); two(3)",
+            "let f = first([len, 1]); f([1, 2, 3])",
+            "rest(push([1, 2], 3))",
+            "let x = 1; let f = fn() { x }; let x = 2; f()",
+            "let f = fn(x) { x }; let g = fn() { f(1, 2) }; g()",
+            "let f = fn(x) { x }; f()",
+            "let x = 5; let f = fn(x) { x }; f()",
+            "let f = fn(a, b) { a }; f(1)",
+            "let f = fn(len) { len([1, 2]) }; f()",
+            "let a = 1; a(2)",
+            "x; let x = 1",
+        )
+
+        for code in test_cases:
+            with self.subTest(code):
+                expected = test_evaluate.get_object(code)
+                actual = get_object(code)
+                self.assertEqual(expected.inspect(), actual.inspect())
+
+    def test_lets_in_blocks(self) -> None:
+        function = "let f = fn(x) { let y = x + 1; if (y > 2) { return y; } y * 10 };"
+        # evaluate.node can't run these yet.
+        test_cases: tuple[tuple[str, int], ...] = (
+            ("1 + if (true) { let a = 2; a * 3 } else { 0 }", 7),
+            (f"{function} f(1)", 20),
+            (f"{function} f(5)", 6),
+        )
+
+        for code, expected in test_cases:
+            with self.subTest(code):
+                result = get_object(code)
+                test_evaluate.test_self_evaluating_object(
+                    self, objects.Integer, result, expected
+                )
+
+    def test_reads_before_lets(self) -> None:
+        # The enclosing binding, as for evaluate.node, which can't run these yet.
+        test_cases: tuple[tuple[str, int], ...] = (
+            ("let x = 1; let f = fn() { let y = x; let x = 2; y }; f()", 1),
+            ("let x = 1; let f = fn() { let x = x + 1; x }; f() + x", 3),
+            ("let x = 1; let f = fn(c) { if (c) { let x = 2; } x }; f(true)", 2),
+            ("let x = 1; let f = fn(c) { if (c) { let x = 2; } x }; f(false)", 1),
+            ("let f = fn() { let g = fn() { x }; let x = 3; g() }; f()", 3),
+        )
+
+        for code, expected in test_cases:
+            with self.subTest(code):
+                result = get_object(code)
+                test_evaluate.test_self_evaluating_object(
+                    self, objects.Integer, result, expected
+                )
+
+        errors: tuple[tuple[str, str], ...] = (
+            ("let f = fn() { let y = z; let z = 2; y }; f()", "z"),
+            ("let f = fn() { g() }; f(); let g = fn() { 1 }", "g"),
+        )
+        for code, name in errors:
+            with self.subTest(code):
+                result = get_object(code)
+                assert isinstance(result, objects.Error)
+                self.assertEqual(f"missing identifier: {name}", result.message)
+
+    def test_streams(self) -> None:
+        test_cases: tuple[tuple[str, str], ...] = (
+            ("map([1], fn(a, b) { a })", "[Integer(value=1)]"),
+            ("map([1, 2], fn(a) { a(1) })", "ERROR: not a function: "),
+            ("take(filter(range(0, 10), fn(a, b) { b }), 2)", "ERROR: missing "),
+            ("map(range(0, 3), fn(a) { if (a == 1) { b } else { a } })", "ERROR: "),
+        )
+
+        for code, expected in test_cases:
+            with self.subTest(code):
+                result = get_object(code)
+                self.assertIsInstance(result, objects.Stream)
+                # Callbacks only run as the stream is inspected.
+                self.assertTrue(result.inspect().startswith(expected))
+                expected_stream = test_evaluate.get_object(code)
+                self.assertEqual(expected_stream.inspect(), result.inspect())
+
+    def test_functions_convert(self) -> None:
+        result = get_object("fn(x, y) { x + y }")
+
+        assert isinstance(result, runtime.Function)
+        self.assertEqual(["x", "y"], [p.value for p in result.parameters])
+        self.assertEqual(5, result.python(2, 3))
+
+    def test_no_value(self) -> None:
+        self.assertIsNone(transpile.run(utils.parse("let a = 1;")))
@@ -0,0 +1,106 @@
+import unittest
+from unittest import mock
+
+from monkey.compiler import compilers, unboxed, vm
+from monkey.interpreter import objects
+from tests import utils
+from tests.compiler import test_vm
+
+
+def bytecode(input_: str) -> compilers.Bytecode:
+    compiler = compilers.Compiler.new()
+    compiler.compile(utils.parse(input_))
+    return compiler.bytecode()
+
+
+class TestUnboxedVM(test_vm.TestVM):
+    """
+    Runs the VM tests on unboxed.UnboxedVM.
+    """
+
+    def setUp(self) -> None:
+        patcher = mock.patch.object(vm, "VM", unboxed.UnboxedVM)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_reset(self) -> None:
+        # As vm.VM's, except None on the stack is null so an empty program's
+        # result is null rather than vm.Empty, and unset globals are UNSET.
+        machine = unboxed.UnboxedVM.from_bytecode(bytecode("let a = 1; [a, a]"))
+        machine.run()
+        test_vm.test_expected_object(self, [1, 1], machine.last_popped_stack_elem)
+        stack = machine.stack
+
+        machine.reset(bytecode("let b = 2;"))
+        self.assertEqual(machine.globals, [unboxed.UNSET])
+        machine.run()
+        test_vm.test_expected_object(self, 2, machine.last_popped_stack_elem)
+
+        machine.reset(bytecode(""))
+        machine.run()
+        test_vm.test_null_object(self, machine.last_popped_stack_elem)
+        self.assertIs(machine.stack, stack)
+
+
+class TestUnboxed(unittest.TestCase):
+    def test_stack_holds_plain_values(self) -> None:
+        test_cases: tuple[tuple[str, object], ...] = (
+            ("1 + 2", 3),
+            ("1 < 2", True),
+            ("!5", False),
+            ('"a" + "b"', "ab"),
+            ("if (false) { 1 }", None),
+            ("[1, true]", [1, True]),
+            ('{"a": 1}', {"a": ("a", 1)}),
+            ("rest([1, 2, 3])", [2, 3]),
+        )
+
+        for input_, expected in test_cases:
+            with self.subTest(input_):
+                machine = unboxed.UnboxedVM.from_bytecode(bytecode(input_))
+                machine.run()
+                self.assertEqual(expected, machine.stack[machine.stack_pointer])
+
+    def test_boxed_at_the_boundary(self) -> None:
+        machine = unboxed.UnboxedVM.from_bytecode(
+            bytecode('let f = fn(x) { x * 2 }; {"a": [f(1), f(2)], true: "b"}')
+        )
+        machine.run()
+
+        result = machine.last_popped_stack_elem
+        assert isinstance(result, objects.Hash)
+        pairs = {pair.key: pair.value for pair in result.pairs.values()}
+        self.assertEqual(
+            {
+                objects.String(value="a"): objects.Array(
+                    items=[objects.integer(2), objects.integer(4)]
+                ),
+                objects.TRUE: objects.String(value="b"),
+            },
+            pairs,
+        )
+
+    def test_builtins(self) -> None:
+        test_cases: tuple[tuple[str, object], ...] = (
+            ('len("four")', 4),
+            ("first([])", None),
+            ("let a = push([1], fn() { 7 }); let f = a[1]; f()", 7),
+            (
+                "len(1)",
+                objects.Error(message="argument to 'len' not supported, got INTEGER"),
+            ),
+            (
+                "push(1, 1)",
+                objects.Error(
+                    message="argument to 'rest' at position 1 not supported, got INTEGER"
+                ),
+            ),
+        )
+
+        for input_, expected in test_cases:
+            with self.subTest(input_):
+                machine = unboxed.UnboxedVM.from_bytecode(bytecode(input_))
+                machine.run()
+                test_vm.test_expected_object(
+                    self, expected, machine.last_popped_stack_elem
+                )
@@ -1,6 +1,8 @@
-from collections.abc import Mapping, Sequence
+from collections.abc import Callable, Mapping, Sequence
+import threading
 import unittest
-from monkey.compiler import compilers, vm
+from unittest import mock
+from monkey.compiler import compilers, symbol_table as st, vm
 
 from monkey.interpreter import objects
 from tests import utils
@@ -32,7 +34,7 @@ def test_string_object(tc: unittest.TestCase, expected: str, actual: objects.Obj
 
 
 def test_null_object(tc: unittest.TestCase, actual: objects.Object) -> None:
-    tc.assertEqual(actual, vm.NULL)
+    tc.assertIs(actual, objects.NULL)
 
 
 def test_hash_map_object(
@@ -255,6 +257,10 @@ class TestVM(unittest.TestCase):
                 ("[[1, 2, 3]][0][0]", 1),
                 ("{1: 1, 2: 2}[1]", 1),
                 ("{1: 1, 2: 2}[2]", 2),
+                ('{1: 1, true: 2, "a": 3, 97: 4}[1]', 1),
+                ('{1: 1, true: 2, "a": 3, 97: 4}[true]', 2),
+                ('{1: 1, true: 2, "a": 3, 97: 4}["a"]', 3),
+                ('{1: 1, true: 2, "a": 3, 97: 4}[97]', 4),
                 # Do I want this??
                 # ("[1, 2, 3][99]", None),
                 # ("[1][-1]", None),
@@ -321,6 +327,28 @@ class TestVM(unittest.TestCase):
             ),
         )
 
+    def test_reading_unset_bindings(self) -> None:
+        # Compiled from lets in branches not taken. A new frame's lets start
+        # unset rather than with what an earlier call left on the stack.
+        test_cases: Sequence[str] = (
+            "if (false) { let x = 1; }; x",
+            "let f = fn() { if (false) { let x = 1; }; x }; f()",
+            "let g = fn() { let a = 5; a }; "
+            "let f = fn() { if (false) { let x = 1; }; x }; g(); f()",
+            "let f = fn() { if (false) { let x = 1; }; x + 1 }; f()",
+            "let f = fn(n) {"
+            "  if (n > 0) { let x = 1; }; if (n == 0) { x } else { f(0) }"
+            "}; f(1)",
+        )
+
+        for input_ in test_cases:
+            with self.subTest(input_):
+                compiler = compilers.Compiler.new()
+                compiler.compile(utils.parse(input_))
+                machine = vm.VM.from_bytecode(compiler.bytecode())
+                with self.assertRaises(vm.Missing):
+                    machine.run()
+
     def test_calling_functions_with_wrong_number_of_arguments(self) -> None:
         test_cases: Sequence[str] = (
             "fn() { 1; }(1);",
@@ -405,6 +433,100 @@ class TestVM(unittest.TestCase):
             ),
         )
 
+    def test_closures(self) -> None:
+        run_vm_tests(
+            self,
+            (
+                (
+                    "let newClosure = fn(a) { fn() { a; }; };\n"
+                    "let closure = newClosure(99);\n"
+                    "closure();",
+                    99,
+                ),
+                (
+                    "let newAdder = fn(a, b) { fn(c) { a + b + c }; };\n"
+                    "let adder = newAdder(1, 2);\n"
+                    "adder(8);",
+                    11,
+                ),
+                (
+                    "let newAdder = fn(a, b) { let c = a + b; fn(d) { c + d }; };\n"
+                    "let adder = newAdder(1, 2);\n"
+                    "adder(8);",
+                    11,
+                ),
+                (
+                    "let newAdderOuter = fn(a, b) {\n"
+                    "  let c = a + b;\n"
+                    "  fn(d) { let e = d + c; fn(f) { e + f; }; };\n"
+                    "};\n"
+                    "let newAdderInner = newAdderOuter(1, 2);\n"
+                    "let adder = newAdderInner(3);\n"
+                    "adder(8);",
+                    14,
+                ),
+                (
+                    "let a = 1;\n"
+                    "let newAdderOuter = fn(b) { fn(c) { fn(d) { a + b + c + d }; }; };\n"
+                    "let newAdderInner = newAdderOuter(2);\n"
+                    "let adder = newAdderInner(3);\n"
+                    "adder(8);",
+                    14,
+                ),
+                (
+                    "let newClosure = fn(a, b) {\n"
+                    "  let one = fn() { a; };\n"
+                    "  let two = fn() { b; };\n"
+                    "  fn() { one() + two(); };\n"
+                    "};\n"
+                    "let closure = newClosure(9, 90);\n"
+                    "closure();",
+                    99,
+                ),
+                (
+                    "let apply = fn(f) { f(10) };\n"
+                    "let scale = fn(n) { apply(fn(x) { x * n }) };\n"
+                    "scale(2) + scale(3);",
+                    50,
+                ),
+            ),
+        )
+
+    def test_recursive_functions(self) -> None:
+        run_vm_tests(
+            self,
+            (
+                (
+                    "let countDown = fn(x) { if (x == 0) { return 0; } countDown(x - 1); };\n"
+                    "countDown(1);",
+                    0,
+                ),
+                (
+                    "let countDown = fn(x) { if (x == 0) { return 0; } countDown(x - 1); };\n"
+                    "let wrapper = fn() { countDown(1); };\n"
+                    "wrapper();",
+                    0,
+                ),
+                (
+                    "let wrapper = fn() {\n"
+                    "  let countDown = fn(x) { if (x == 0) { return 0; } countDown(x - 1); };\n"
+                    "  countDown(1);\n"
+                    "};\n"
+                    "wrapper();",
+                    0,
+                ),
+                (
+                    "let fib = fn(x) {\n"
+                    "  if (x == 0) { return 0; }\n"
+                    "  if (x == 1) { return 1; }\n"
+                    "  fib(x - 1) + fib(x - 2);\n"
+                    "};\n"
+                    "fib(15);",
+                    610,
+                ),
+            ),
+        )
+
     def test_builtins(self) -> None:
         with self.subTest("len"):
             run_vm_tests(
@@ -477,3 +599,330 @@ class TestVM(unittest.TestCase):
                     ),
                 ),
             )
+
+        one = objects.Integer(value=1).hash_key()
+        two = objects.Integer(value=2).hash_key()
+        with self.subTest("set"):
+            run_vm_tests(
+                self,
+                (
+                    ("set({1: 1}, 2, 4)", {one: 1, two: 4}),
+                    ("set({1: 1}, 1, 4)", {one: 4}),
+                    (
+                        "set({}, [], 1)",
+                        objects.Error("unusable as hash key: ARRAY"),
+                    ),
+                ),
+            )
+
+        with self.subTest("delete"):
+            run_vm_tests(
+                self,
+                (
+                    ("delete({1: 1, 2: 4}, 1)", {two: 4}),
+                    ("delete({1: 1}, 2)", {one: 1}),
+                ),
+            )
+
+        with self.subTest("merge"):
+            run_vm_tests(
+                self,
+                (
+                    ("merge({1: 1, 2: 2}, {2: 4})", {one: 1, two: 4}),
+                    (
+                        "merge({}, 1)",
+                        objects.Error(
+                            "argument to 'merge' at position 2 not supported, got INTEGER"
+                        ),
+                    ),
+                ),
+            )
+
+        with self.subTest("join"):
+            run_vm_tests(
+                self,
+                (
+                    ('join(["a", "b"], " ")', "a b"),
+                    (
+                        'join(["a"], 1)',
+                        objects.Error(
+                            "argument to 'join' at position 2 not supported, got INTEGER"
+                        ),
+                    ),
+                ),
+            )
+
+        with self.subTest("streams"):
+            run_vm_tests(
+                self,
+                (
+                    ("sum(range(1, 101))", 5050),
+                    ("sum(map(range(5), fn(x) { x * x }))", 30),
+                    ("sum(filter(range(10), fn(x) { x > 6 }))", 24),
+                    ("reduce(range(1, 5), 1, fn(acc, x) { acc * x })", 24),
+                    ("sum(take(range(1000000000), 4))", 6),
+                    (
+                        "range(0, 1, 0)",
+                        objects.Error(
+                            "argument to 'range' at position 3 must not be 0"
+                        ),
+                    ),
+                ),
+            )
+
+    def test_builtins_calling_closures(self) -> None:
+        run_vm_tests(
+            self,
+            (
+                # Globals, free variables and recursion from inside the callback.
+                (
+                    "let n = 10;"
+                    "let adder = fn(k) { fn(x) { x + k + n } };"
+                    "let down = fn(x) { if (x == 0) { 0 } else { 1 + down(x - 1) } };"
+                    "sum(map(range(5), fn(i) { let add = adder(i); add(down(i)) }))",
+                    70,
+                ),
+                # Callbacks calling builtins which call back.
+                (
+                    "sum(map(range(4), fn(i) {"
+                    "  sum(map(range(i), fn(j) { i * j }))"
+                    "}))",
+                    11,
+                ),
+                # The stack under the builtin's call is left alone.
+                (
+                    "let f = fn(a, b) { a + b * sum(map([1, 2], fn(x) { x * b })) };"
+                    "[f(1, 2), 3]",
+                    [13, 3],
+                ),
+            ),
+        )
+
+    def test_storage_grows(self) -> None:
+        compiler = compilers.Compiler.new()
+        compiler.compile(
+            utils.parse(
+                "let a = 1; let b = 2;"
+                "let down = fn(n) { if (n == 0) { 0 } else { 1 + down(n - 1) } };"
+                "down(200)"
+            )
+        )
+        bytecode = compiler.bytecode()
+        self.assertEqual(bytecode.num_globals, 3)
+
+        machine = vm.VM.from_bytecode(bytecode)
+        self.assertEqual(len(machine.globals), 3)
+        self.assertEqual(len(machine.stack), vm.INITIAL_STACK_SIZE)
+        self.assertEqual(len(machine.frames), vm.INITIAL_FRAMES)
+
+        machine.run()
+
+        test_expected_object(self, 200, machine.last_popped_stack_elem)
+        self.assertGreater(len(machine.frames), 200)
+        self.assertGreater(len(machine.stack), 200)
+
+    def test_storage_limits(self) -> None:
+        compiler = compilers.Compiler.new()
+        compiler.compile(
+            utils.parse(
+                "let down = fn(n) { if (n == 0) { 0 } else { 1 + down(n - 1) } };"
+                "down(100)"
+            )
+        )
+        bytecode = compiler.bytecode()
+
+        with self.subTest("frames"), self.assertRaises(vm.Overflow):
+            vm.VM.from_bytecode(bytecode, max_frames=50).run()
+
+        with self.subTest("stack"), self.assertRaises(vm.Overflow):
+            vm.VM.from_bytecode(bytecode, max_stack=100).run()
+
+    def test_tail_calls(self) -> None:
+        test_cases: tuple[tuple[str, object], ...] = (
+            (
+                "let sum = fn(n, acc) {"
+                "  if (n == 0) { acc } else { sum(n - 1, acc + n) }"
+                "};"
+                "sum(5000, 0)",
+                12502500,
+            ),
+            (
+                "let done = fn(x) { x * 2 };"
+                "let loop = fn(n) { if (n == 0) { return done(21); } loop(n - 1) };"
+                "loop(3000)",
+                42,
+            ),
+            (
+                "let wrapper = fn(x) {"
+                "  let loop = fn(n) { if (n == 0) { x } else { loop(n - 1) } };"
+                "  loop(3000)"
+                "};"
+                "wrapper(7)",
+                7,
+            ),
+            ("let f = fn(a) { len(a) }; let g = fn() { f([1, 2]) }; [g(), 1]", [2, 1]),
+        )
+
+        for input_, expected in test_cases:
+            for level in (0, 2):
+                with self.subTest(input_, level=level):
+                    compiler = compilers.Compiler.new(optimization_level=level)
+                    compiler.compile(utils.parse(input_))
+
+                    machine = vm.VM.from_bytecode(compiler.bytecode(), max_frames=8)
+                    machine.run()
+
+                    result = machine.last_popped_stack_elem
+                    test_expected_object(self, expected, result)
+                    self.assertEqual(machine.frames_index, 1)
+
+    def test_shared_globals_grow_in_place(self) -> None:
+        symbol_table = st.SymbolTable.new()
+        state: list[objects.Object | None] = []
+
+        for input_, expected in (("let a = 1;", 1), ("let b = a + 1; b", 2)):
+            compiler = compilers.Compiler.new(symbol_table)
+            compiler.compile(utils.parse(input_))
+
+            machine = vm.VM.from_bytecode(compiler.bytecode(), state)
+            machine.run()
+
+            test_expected_object(self, expected, machine.last_popped_stack_elem)
+        self.assertEqual(len(state), 2)
+
+    def test_reset(self) -> None:
+        def bytecode(input_: str) -> compilers.Bytecode:
+            compiler = compilers.Compiler.new()
+            compiler.compile(utils.parse(input_))
+            return compiler.bytecode()
+
+        machine = vm.VM.from_bytecode(
+            bytecode(
+                "let a = 1;"
+                "let f = fn(n) { if (n == 0) { a } else { f(n - 1) } };"
+                "f(100)"
+            )
+        )
+        machine.run()
+        test_expected_object(self, 1, machine.last_popped_stack_elem)
+        stack, frames = machine.stack, machine.frames
+
+        with self.subTest("isolated"):
+            machine.reset(bytecode("let b = 2;"))
+            self.assertEqual(machine.globals, [None])
+            self.assertTrue(all(item is None for item in machine.stack))
+
+            machine.run()
+            test_expected_object(self, 2, machine.last_popped_stack_elem)
+
+        with self.subTest("nothing popped"):
+            machine.reset(bytecode(""))
+            machine.run()
+            with self.assertRaises(vm.Empty):
+                machine.last_popped_stack_elem
+
+        with self.subTest("after an error"):
+            machine.reset(bytecode("let f = fn(n) { 1 + f(n + 1) }; f(0)"))
+            with self.assertRaises(vm.Overflow):
+                machine.run()
+
+            machine.reset(bytecode("3"))
+            machine.run()
+            test_expected_object(self, 3, machine.last_popped_stack_elem)
+            self.assertEqual(machine.frames_index, 1)
+
+        self.assertIs(machine.stack, stack)
+        self.assertIs(machine.frames, frames)
+
+    def test_pool(self) -> None:
+        compiler = compilers.Compiler.new()
+        compiler.compile(utils.parse("let a = 40; a + 2"))
+        bytecode = compiler.bytecode()
+
+        pool = vm.VMPool(size=1)
+        with pool.vm(bytecode) as first:
+            with pool.vm(bytecode) as second:
+                self.assertIsNot(first, second)
+
+        self.assertEqual(pool.idle, [second])
+        test_expected_object(self, 42, pool.run(bytecode))
+        test_expected_object(self, 42, pool.run(bytecode))
+        self.assertEqual(pool.idle, [second])
+
+    def test_stream_outlives_run(self) -> None:
+        def bytecode(input_: str) -> compilers.Bytecode:
+            compiler = compilers.Compiler.new()
+            compiler.compile(utils.parse(input_))
+            return compiler.bytecode()
+
+        pool = vm.VMPool(size=1)
+        stream = pool.run(bytecode("let k = 10; map([1, 2], fn(x) { x + k })"))
+        # The same VM, reset for a program with its own first global.
+        test_expected_object(self, 1000, pool.run(bytecode("let q = 1000; q")))
+
+        items = objects.values(stream)
+        assert items is not None
+        self.assertEqual([11, 12], [item.value for item in items])  # type: ignore
+
+    def test_pools_on_threads(self) -> None:
+        def bytecode(input_: str) -> compilers.Bytecode:
+            compiler = compilers.Compiler.new()
+            compiler.compile(utils.parse(input_))
+            return compiler.bytecode()
+
+        # Both threads are partway through a run before either binds a callback.
+        barrier = threading.Barrier(2, timeout=10)
+        caller = objects.CALLERS[objects.Closure]
+
+        def wait_then_bind(closure: objects.Object) -> Callable[..., objects.Object]:
+            barrier.wait()
+            return caller(closure)
+
+        def work(k: int, sums: list[int]) -> None:
+            # Each thread's callbacks read its own globals.
+            program = bytecode(f"let k = {k}; sum(map(range(200), fn(x) {{ x + k }}))")
+            pool = vm.VMPool()
+            for _ in range(20):
+                result = pool.run(program)
+                assert isinstance(result, objects.Integer)
+                sums.append(result.value)
+
+        results: dict[int, list[int]] = {1: [], 1000: []}
+        threads = [
+            threading.Thread(target=work, args=(k, sums))
+            for k, sums in results.items()
+        ]
+        with mock.patch.dict(objects.CALLERS, {objects.Closure: wait_then_bind}):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        for k, sums in results.items():
+            self.assertEqual([19900 + 200 * k] * 20, sums)
+
+    def test_shared_objects(self) -> None:
+        def run(source: str) -> objects.Object:
+            compiler = compilers.Compiler.new()
+            compiler.compile(utils.parse(source))
+            machine = vm.VM.from_bytecode(compiler.bytecode())
+            machine.run()
+            return machine.last_popped_stack_elem
+
+        test_cases: tuple[tuple[str, objects.Object], ...] = (
+            ("let a = 1; a < 2", objects.TRUE),
+            ("let a = 1; a == 2", objects.FALSE),
+            ("let a = true; a != false", objects.TRUE),
+            ("let a = 40; a + 2", objects.integer(42)),
+            ("let a = 40; -a", objects.integer(-40)),
+            ("len([1, 2])", objects.integer(2)),
+            ("if (false) { 1 }", objects.NULL),
+        )
+
+        for source, expected in test_cases:
+            with self.subTest(source):
+                self.assertIs(expected, run(source))
+
+        large = run("let a = 65535; a + 1")
+        test_expected_object(self, 65536, large)
+        self.assertIsNot(large, run("let a = 65535; a + 1"))
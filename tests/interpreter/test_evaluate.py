@@ -470,6 +470,73 @@ class TestBuiltinFunctions(unittest.TestCase):
                 actual = get_object(code)
                 test_error_object(self, actual, expected)
 
+    def test_evaluates_streams(self) -> None:
+        test_cases: tuple[tuple[str, int], ...] = (
+            ("sum(range(1, 101))", 5050),
+            ("sum(range(10, 0, -3))", 22),
+            ("sum(range(5, 5))", 0),
+            ("sum(range(-3, 4, 2))", 0),
+            ("sum(range(0, 100000000000))", 4999999999950000000000),
+            ("sum([1, 2, 3])", 6),
+            ("sum(map(range(5), fn(x) { x * x }))", 30),
+            ("sum(filter(range(10), fn(x) { x > 6 }))", 24),
+            ("reduce(range(1, 5), 1, fn(acc, x) { acc * x })", 24),
+            ("sum(take(range(1000000000), 4))", 6),
+            ("let n = 10; sum(map([1, 2], fn(x) { x + n }))", 23),
+            ("sum(map(range(4), fn(i) { sum(map(range(i), fn(j) { i * j })) }))", 11),
+            ("sum(map([[1], [2, 3]], len))", 3),
+        )
+
+        for code, expected in test_cases:
+            with self.subTest(code):
+                actual = get_object(code)
+                test_self_evaluating_object(self, objects.Integer, actual, expected)
+
+    def test_evaluates_stream_items(self) -> None:
+        test_cases: tuple[tuple[str, list[int]], ...] = (
+            ("range(3)", [0, 1, 2]),
+            ("map([1, 2], fn(x) { x * 2 })", [2, 4]),
+            ("filter(range(6), fn(x) { x > 3 })", [4, 5]),
+            ("take(map(range(100), fn(x) { x + 1 }), 2)", [1, 2]),
+            ("take(range(3), -1)", []),
+        )
+
+        for code, expected in test_cases:
+            with self.subTest(code):
+                items = objects.values(get_object(code))
+                assert items is not None
+                self.assertEqual(expected, [item.value for item in items])
+
+    def test_evaluates_stream_errors(self) -> None:
+        test_cases: tuple[tuple[str, str], ...] = (
+            ("range()", "wrong number of arguments, got 0, want 1 to 3"),
+            (
+                'range("a")',
+                "argument to 'range' at position 1 not supported, got STRING",
+            ),
+            ("range(0, 10, 0)", "argument to 'range' at position 3 must not be 0"),
+            (
+                "map(1, len)",
+                "argument to 'map' at position 1 not supported, got INTEGER",
+            ),
+            (
+                "filter([1], 1)",
+                "argument to 'filter' at position 2 not supported, got INTEGER",
+            ),
+            ("reduce([1], 0)", "wrong number of arguments, got 2, want 3"),
+            (
+                "take([1], true)",
+                "argument to 'take' at position 2 not supported, got BOOLEAN",
+            ),
+            ("sum([1, true])", "items summed must be INTEGER, got BOOLEAN"),
+            ("sum(map([1], fn(x) { x + true }))", "type mismatch: INTEGER + BOOLEAN"),
+        )
+
+        for code, expected in test_cases:
+            with self.subTest(code):
+                actual = get_object(code)
+                test_error_object(self, actual, expected)
+
 
 class TestHashing(unittest.TestCase):
     def test_evaluates_same_with_value(self) -> None:
@@ -483,6 +550,23 @@ class TestHashing(unittest.TestCase):
             two = class_(value)  # type: ignore
             self.assertEqual(one.hash_key(), two.hash_key())
 
+    def test_evaluates_different_types_apart(self) -> None:
+        keys = (
+            objects.Integer(1).hash_key(),
+            objects.TRUE.hash_key(),
+            objects.Integer(97).hash_key(),
+            objects.String("a").hash_key(),
+            objects.Integer(0).hash_key(),
+            objects.FALSE.hash_key(),
+            objects.String("").hash_key(),
+        )
+        self.assertEqual(len(keys), len(set(keys)))
+
+    def test_string_hash_key_made_once(self) -> None:
+        string = objects.String("k" * 10_000)
+        self.assertIs(string.hash_key(), string.hash_key())
+        self.assertEqual(string, objects.String("k" * 10_000))
+
     def test_evaluates_hash(self) -> None:
         code = """
         let two = "two";
@@ -529,3 +613,71 @@ class TestHashing(unittest.TestCase):
                 test_self_evaluating_object(self, objects.Integer, actual, expected)
             else:
                 self.assertEqual(actual, objects.NULL)
+
+
+class TestTailCalls(unittest.TestCase):
+    def test_tail_calls_run_in_constant_stack(self) -> None:
+        build = (
+            "let build = fn(n, acc) {"
+            "  if (n == 0) { acc } else { build(n - 1, push(acc, n)) }"
+            "};"
+        )
+        test_cases: tuple[tuple[str, int], ...] = (
+            (f"{build} len(build(3000, []))", 3000),
+            (
+                f"{build} let sum = fn(arr, acc) {{"
+                "  if (len(arr) == 0) { return acc; }"
+                "  sum(rest(arr), acc + first(arr))"
+                f"}}; sum(build(2000, []), 0)",
+                2001000,
+            ),
+            (
+                "let even = fn(n) {"
+                "  if (n == 0) { true } else { return odd(n - 1); }"
+                "};"
+                "let odd = fn(n) { if (n == 0) { false } else { even(n - 1) } };"
+                "if (even(5001)) { 1 } else { 0 }",
+                0,
+            ),
+        )
+
+        for code, expected in test_cases:
+            with self.subTest(code):
+                actual = get_object(code)
+                test_self_evaluating_object(self, objects.Integer, actual, expected)
+
+    def test_tail_call_results(self) -> None:
+        test_cases: tuple[tuple[str, str], ...] = (
+            ("let f = fn(x) { x }; return f(5);", "5"),
+            ("let f = fn(x) { x }; let g = fn(x) { f(x) + 1 }; g(1)", "2"),
+            (
+                "let f = fn() { len(1) }; let g = fn() { f() }; g()",
+                "ERROR: argument to 'len' not supported, got INTEGER",
+            ),
+            (
+                "let x = 1; let g = fn() { x(2) }; g()",
+                "ERROR: not a function: Integer(value=1) - Integer(value=2)",
+            ),
+        )
+
+        for code, expected in test_cases:
+            with self.subTest(code):
+                actual = get_object(code)
+                self.assertEqual(expected, actual.inspect())
+
+
+class TestSharedObjects(unittest.TestCase):
+    def test_small_integers_are_shared(self) -> None:
+        for code in ("7", "3 + 4", "10 - 3", "-(-7)", "len([1, 2, 3, 4, 5, 6, 7])"):
+            with self.subTest(code):
+                self.assertIs(objects.integer(7), get_object(code))
+
+        self.assertIs(objects.integer(-256), get_object("-256"))
+        self.assertIs(objects.integer(65535), get_object("65535"))
+        self.assertIsNot(get_object("65536"), get_object("65536"))
+        self.assertIsNot(get_object("-257"), get_object("-257"))
+
+    def test_booleans_are_shared(self) -> None:
+        for code, expected in (("1 < 2", objects.TRUE), ("!true", objects.FALSE)):
+            with self.subTest(code):
+                self.assertIs(expected, get_object(code))
@@ -0,0 +1,187 @@
+import os
+import subprocess
+import sys
+import unittest
+
+from monkey.interpreter import hashmaps, objects
+from tests.interpreter import test_evaluate
+
+
+class Colliding:
+    """
+    A key with a chosen hash, so tests can make keys collide.
+    """
+
+    def __init__(self, name: str, hash_: int) -> None:
+        self.name = name
+        self.hash = hash_
+
+    def __hash__(self) -> int:
+        return self.hash
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Colliding) and self.name == other.name
+
+
+class TestHashMap(unittest.TestCase):
+    def test_set(self) -> None:
+        hashmap: hashmaps.HashMap[int, int] = hashmaps.HashMap()
+        for i in range(5000):
+            hashmap = hashmap.set(i, i * 2)
+
+        self.assertEqual(5000, len(hashmap))
+        self.assertEqual({i: i * 2 for i in range(5000)}, dict(hashmap))
+        self.assertEqual(10, hashmap[5])
+        self.assertNotIn(5000, hashmap)
+        with self.assertRaises(KeyError):
+            hashmap[5000]
+
+        hashmap = hashmap.set(5, 0)
+        self.assertEqual(5000, len(hashmap))
+        self.assertEqual(0, hashmap[5])
+
+    def test_delete(self) -> None:
+        hashmap = hashmaps.HashMap.from_iterable((i, i) for i in range(1000))
+        self.assertIs(hashmap, hashmap.delete(1000))
+
+        for i in range(0, 1000, 2):
+            hashmap = hashmap.delete(i)
+        self.assertEqual({i: i for i in range(1, 1000, 2)}, dict(hashmap))
+
+        for i in range(1, 1000, 2):
+            hashmap = hashmap.delete(i)
+        self.assertEqual(0, len(hashmap))
+        self.assertEqual({}, dict(hashmap))
+
+    def test_collisions(self) -> None:
+        keys = [Colliding(str(i), i % 3) for i in range(12)]
+        hashmap = hashmaps.HashMap.from_iterable((key, key.name) for key in keys)
+        self.assertEqual(12, len(hashmap))
+        self.assertTrue(all(hashmap[key] == key.name for key in keys))
+        self.assertNotIn(Colliding("12", 0), hashmap)
+
+        for key in keys[:11]:
+            hashmap = hashmap.delete(key)
+        self.assertEqual({keys[11]: "11"}, dict(hashmap))
+        self.assertEqual("11", hashmap.set(keys[0], "0").delete(keys[0])[keys[11]])
+
+    def test_persistent(self) -> None:
+        hashmap = hashmaps.HashMap.from_iterable((i, i) for i in range(100))
+        first, second = hashmap.set(1, -1), hashmap.delete(1)
+
+        self.assertEqual(1, hashmap[1])
+        self.assertEqual(-1, first[1])
+        self.assertNotIn(1, second)
+        self.assertEqual(100, len(hashmap))
+
+        # Only the path to the key is copied.
+        shared = set(map(id, hashmap.root.entries)) & set(map(id, first.root.entries))
+        self.assertEqual(len(hashmap.root.entries) - 1, len(shared))
+
+    def test_merge(self) -> None:
+        left = hashmaps.HashMap.from_iterable([(1, "a"), (2, "b")])
+        merged = left.merge({2: "c", 3: "d"})
+        self.assertEqual({1: "a", 2: "c", 3: "d"}, dict(merged))
+        self.assertEqual({1: "a", 2: "b"}, dict(left))
+
+    def test_insertion_order(self) -> None:
+        keys = [f"key {i}" for i in range(100)]
+        hashmap = hashmaps.HashMap.from_iterable((key, 0) for key in keys)
+        self.assertEqual(keys, list(hashmap))
+
+        # A key set again keeps its place, one deleted and set again goes last.
+        hashmap = hashmap.set(keys[0], 1).delete(keys[1]).set(keys[1], 1)
+        self.assertEqual([*keys[:1], *keys[2:], keys[1]], list(hashmap))
+        merged = hashmap.merge({keys[1]: 2, "new": 2})
+        self.assertEqual([*keys[:1], *keys[2:], keys[1], "new"], list(merged))
+
+    def test_mapping(self) -> None:
+        hashmap = hashmaps.HashMap.from_iterable([("a", 1), ("b", 2)])
+        self.assertEqual({"a": 1, "b": 2}, hashmap)
+        self.assertEqual(hashmap, hashmaps.of({"a": 1, "b": 2}))
+        self.assertEqual([1, 2], sorted(hashmap.values()))
+        self.assertIs(hashmap, hashmaps.of(hashmap))
+
+
+class TestHashes(unittest.TestCase):
+    def test_set_shares(self) -> None:
+        hash = test_evaluate.get_object(
+            "let build = fn(n, acc) {"
+            "  if (n == 0) { acc } else { build(n - 1, set(acc, n, n * n)) }"
+            "};"
+            "build(2000, {})"
+        )
+        assert isinstance(hash, objects.Hash)
+        self.assertIsInstance(hash.pairs, hashmaps.HashMap)
+        self.assertEqual(2000, len(hash.pairs))
+
+        key = objects.Integer(value=2001)
+        changed = objects.BUILTIN_MAP["set"].function(hash, key, key)
+        assert isinstance(changed, objects.Hash)
+        self.assertEqual(2001, len(changed.pairs))
+        self.assertEqual(2000, len(hash.pairs))
+
+    def test_unchanged_by_set_delete_and_merge(self) -> None:
+        code = (
+            'let a = {"x": 1, "y": 2};'
+            'let b = set(a, "x", 3);'
+            'let c = delete(a, "y");'
+            'let d = merge(c, {"z": 4});'
+            '[a["x"], a["y"], b["x"], c["x"], d["x"], d["z"]]'
+        )
+        actual = test_evaluate.get_object(code)
+        assert isinstance(actual, objects.Array)
+        self.assertEqual([1, 2, 3, 1, 1, 4], [item.value for item in actual.items])
+
+    def test_order_is_the_same_every_run(self) -> None:
+        # String hashes differ between runs, the order of a hash mustn't.
+        script = (
+            "from monkey.interpreter import environment, evaluate, interface\n"
+            "program, _ = interface.parse('let h = merge({\"apple\": 1, \"pear\": 2},"
+            " {\"fig\": 3, \"kiwi\": 4}); [h, delete(set(h, \"fig\", 5), \"pear\")]')\n"
+            "for h in evaluate.node(program, environment.Environment()).items:\n"
+            "    print([pair.key.inspect() for pair in h.pairs.values()])\n"
+        )
+        outputs = set()
+        for seed in ("1", "2"):
+            env = {**os.environ, "PYTHONHASHSEED": seed}
+            result = subprocess.run(
+                [sys.executable, "-c", script],
+                env=env,
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            outputs.add(result.stdout)
+
+        self.assertEqual(1, len(outputs))
+        self.assertEqual(
+            "['apple', 'pear', 'fig', 'kiwi']\n['apple', 'fig', 'kiwi']\n",
+            outputs.pop(),
+        )
+
+    def test_errors(self) -> None:
+        test_cases: tuple[tuple[str, str], ...] = (
+            ("set({})", "wrong number of arguments, got 1, want 3"),
+            (
+                "set([], 1, 1)",
+                "argument to 'set' at position 1 not supported, got ARRAY",
+            ),
+            ("set({}, [], 1)", "unusable as hash key: ARRAY"),
+            ("delete({})", "wrong number of arguments, got 1, want 2"),
+            (
+                "delete(1, 1)",
+                "argument to 'delete' at position 1 not supported, got INTEGER",
+            ),
+            ("delete({}, fn() { 1 })", "unusable as hash key: FUNCTION"),
+            ("merge({}, {}, {})", "wrong number of arguments, got 3, want 2"),
+            (
+                "merge(1, {})",
+                "argument to 'merge' at position 1 not supported, got INTEGER",
+            ),
+        )
+
+        for code, expected in test_cases:
+            with self.subTest(code):
+                actual = test_evaluate.get_object(code)
+                test_evaluate.test_error_object(self, actual, expected)
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import unittest
+
+from monkey.interpreter import ast, environment, evaluate, objects, resolver
+from monkey.interpreter import specialize
+from tests import utils
+from tests.interpreter import test_evaluate
+
+
+def identifiers(node: ast.Node | None) -> list[ast.Identifier]:
+    """
+    Every identifier in node, depth first.
+    """
+    match node:
+        case ast.Identifier():
+            return [node]
+        case ast.Program() | ast.BlockStatement():
+            return [i for s in node.statements for i in identifiers(s)]
+        case ast.Let():
+            return [*identifiers(node.name), *identifiers(node.value)]
+        case ast.Return():
+            return identifiers(node.value)
+        case ast.ExpressionStatement():
+            return identifiers(node.expression)
+        case ast.FunctionLiteral():
+            return [*node.parameters, *identifiers(node.body)]
+        case ast.Infix():
+            return [*identifiers(node.left), *identifiers(node.right)]
+        case ast.Call():
+            found = identifiers(node.function)
+            return found + [i for a in node.arguments for i in identifiers(a)]
+        case ast.If():
+            return [
+                *identifiers(node.condition),
+                *identifiers(node.consequence),
+                *identifiers(node.alternative),
+            ]
+        case _:
+            return []
+
+
+class TestResolver(unittest.TestCase):
+    def test_locations(self) -> None:
+        program = resolver.resolve(
+            utils.parse(
+                "let g = 1;"
+                "fn(a, b) { let c = a; fn(d) { fn() { g + b + c + d + len } } }"
+            )
+        )
+
+        expected: list[tuple[str, ast.Location | None]] = [
+            ("g", None),
+            ("a", (0, 0)),
+            ("b", (0, 1)),
+            ("c", (0, 2)),
+            ("a", (0, 0)),
+            ("d", (0, 0)),
+            ("g", None),
+            ("b", (2, 1)),
+            ("c", (2, 2)),
+            ("d", (1, 0)),
+            ("len", None),
+        ]
+        actual = [(i.value, i.location) for i in identifiers(program)]
+        self.assertEqual(expected, actual)
+
+    def test_slots(self) -> None:
+        program = resolver.resolve(
+            utils.parse(
+                "fn(a) { let b = 1; if (a) { let c = 2; c } else { let b = 3; b } }"
+            )
+        )
+
+        statement = program.statements[0]
+        assert isinstance(statement, ast.ExpressionStatement)
+        assert isinstance(statement.expression, ast.FunctionLiteral)
+        self.assertEqual(("a", "b", "c"), statement.expression.slots)
+
+    def test_annotations_keep_equality(self) -> None:
+        code = "fn(a) { a }"
+        resolved = resolver.resolve(utils.parse(code))
+
+        self.assertEqual(utils.parse(code), resolved)
+
+    def test_resolved_scopes(self) -> None:
+        # evaluate.node can't run lets in functions, the closures evaluator can.
+        test_cases: tuple[tuple[str, int], ...] = (
+            (
+                "let f = fn(x) { let g = fn(n) { if (n < 1) { x } else { g(n - 1) } };"
+                "g(3) }; f(4)",
+                4,
+            ),
+            ("let x = 1; let f = fn() { let y = x + 1; let x = 10; x + y }; f()", 12),
+            (
+                "let a = 1; let f = fn(a) { fn(b) { fn(c) { a + b + c }; }; };"
+                "let g = f(10); let h = g(20); h(30)",
+                60,
+            ),
+            ("let f = fn() { g() }; let g = fn() { 5 }; f()", 5),
+        )
+
+        for code, expected in test_cases:
+            with self.subTest(code):
+                actual = specialize.run(utils.parse(code), environment.Environment())
+                assert actual
+                test_evaluate.test_self_evaluating_object(
+                    self, objects.Integer, actual, expected
+                )
+
+    def test_evaluate_closures(self) -> None:
+        code = (
+            "let a = 1; let f = fn(a) { fn(b) { fn(c) { a + b + c }; }; };"
+            "let g = f(10); let h = g(20); h(30)"
+        )
+
+        actual = evaluate.node(utils.parse(code), environment.Environment())
+
+        assert actual
+        test_evaluate.test_self_evaluating_object(self, objects.Integer, actual, 60)
+
+
+class TestSlots(unittest.TestCase):
+    def test_lookup(self) -> None:
+        one, two = objects.Integer(value=1), objects.Integer(value=2)
+        outer = environment.Slots.new_call(environment.Environment(), ("a",), [one])
+        inner = environment.Slots.new_call(outer, ("b", "c"), [two])
+
+        self.assertIs(one, inner.lookup(1, 0))
+        self.assertIs(two, inner.lookup(0, 0))
+        self.assertIsNone(inner.lookup(0, 1))
+
+        self.assertEqual((one, True), inner.get("a"))
+        self.assertEqual((None, False), inner.get("c"))
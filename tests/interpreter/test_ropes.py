@@ -0,0 +1,101 @@
+import unittest
+
+from monkey.interpreter import objects, ropes
+from tests.interpreter import test_evaluate
+
+
+class TestRope(unittest.TestCase):
+    def test_concat(self) -> None:
+        text: ropes.Text = ""
+        for i in range(1000):
+            text = ropes.concat(text, f"{i},")
+
+        self.assertIsInstance(text, ropes.Rope)
+        expected = "".join(f"{i}," for i in range(1000))
+        self.assertEqual(len(expected), len(text))
+        assert isinstance(text, ropes.Rope)
+        self.assertEqual(expected, text.flatten())
+
+    def test_short_pieces_are_copied(self) -> None:
+        self.assertEqual("ab", ropes.concat("a", "b"))
+        self.assertEqual("a", ropes.concat("a", ""))
+        self.assertEqual("b", ropes.concat("", "b"))
+
+        long = "x" * ropes.FLAT
+        rope = ropes.concat(long, "y")
+        assert isinstance(rope, ropes.Rope)
+        appended = ropes.concat(rope, "z")
+        assert isinstance(appended, ropes.Rope)
+        self.assertIs(long, appended.left)
+        self.assertEqual("yz", appended.right)
+
+    def test_deep(self) -> None:
+        text: ropes.Text = "x" * ropes.FLAT
+        for _ in range(100_000):
+            text = ropes.concat(text, "y" * ropes.FLAT)
+        assert isinstance(text, ropes.Rope)
+        self.assertEqual(100_001 * ropes.FLAT, len(text.flatten()))
+        self.assertEqual(f"Rope(size={len(text)})", repr(text))
+        self.assertEqual(hash(text), hash(text))
+        self.assertEqual(text, text)
+
+
+class TestStrings(unittest.TestCase):
+    def test_flattened_when_needed(self) -> None:
+        string = objects.String(ropes.concat("x" * ropes.FLAT, "y"))
+        self.assertIsInstance(string.text, ropes.Rope)
+        self.assertEqual(ropes.FLAT + 1, len(string.text))
+
+        self.assertEqual("x" * ropes.FLAT + "y", string.value)
+        self.assertIsInstance(string.text, str)
+
+    def test_same_as_flat(self) -> None:
+        rope = objects.String(ropes.concat("x" * ropes.FLAT, "y"))
+        flat = objects.String("x" * ropes.FLAT + "y")
+        self.assertEqual(flat, rope)
+        self.assertEqual(flat.hash_key(), rope.hash_key())
+        self.assertEqual(repr(flat), repr(rope))
+
+    def test_built_with_plus(self) -> None:
+        code = (
+            "let report = fn(n, acc) {"
+            '  if (n == 0) { acc } else { report(n - 1, acc + "line ") }'
+            "};"
+            'let r = report(3000, "");'
+            '[len(r), {r: "found"}[report(3000, "")]]'
+        )
+        actual = test_evaluate.get_object(code)
+        assert isinstance(actual, objects.Array)
+        self.assertEqual([15000, "found"], [item.value for item in actual.items])
+
+    def test_join(self) -> None:
+        test_cases: tuple[tuple[str, str], ...] = (
+            ('join(["a", "b", "c"])', "abc"),
+            ('join(["a", "b", "c"], ", ")', "a, b, c"),
+            ("join([])", ""),
+        )
+
+        for code, expected in test_cases:
+            with self.subTest(code):
+                actual = test_evaluate.get_object(code)
+                assert isinstance(actual, objects.String)
+                self.assertEqual(expected, actual.value)
+
+    def test_join_errors(self) -> None:
+        test_cases: tuple[tuple[str, str], ...] = (
+            ("join()", "wrong number of arguments, got 0, want 1 or 2"),
+            (
+                'join("a")',
+                "argument to 'join' at position 1 not supported, got STRING",
+            ),
+            (
+                'join(["a"], 1)',
+                "argument to 'join' at position 2 not supported, got INTEGER",
+            ),
+            ('join(["a", 1])', "items joined must be STRING, got INTEGER"),
+        )
+
+        for code, expected in test_cases:
+            with self.subTest(code):
+                actual = test_evaluate.get_object(code)
+                test_evaluate.test_error_object(self, actual, expected)
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import unittest
+from unittest import mock
+
+from monkey.interpreter import environment, evaluate, objects, specialize
+from tests import utils
+from tests.interpreter import test_evaluate
+
+
+def get_object(code: str) -> objects.Object:
+    result = specialize.run(utils.parse(code), environment.Environment())
+    assert result
+    return result
+
+
+# Calls in tail position still grow the Python stack.
+globals().update(utils.rerun_evaluate_tests(get_object, skip=("TestTailCalls",)))
+
+
+class TestSpecialize(unittest.TestCase):
+    def test_builds_once(self) -> None:
+        code = "let f = fn(n) { if (n < 1) { 0 } else { n + f(n - 1) } }; f(50)"
+        program = utils.parse(code)
+
+        with mock.patch.object(
+            specialize, "build", wraps=specialize.build
+        ) as build, mock.patch.object(evaluate, "node") as node:
+            evaluator = specialize.build(program)
+            built = build.call_count
+
+            result = evaluator(environment.Environment())
+
+        self.assertEqual(build.call_count, built)
+        node.assert_not_called()
+        test_evaluate.test_self_evaluating_object(self, objects.Integer, result, 1275)
+
+    def test_calls_interpreted_functions(self) -> None:
+        env = environment.Environment()
+        evaluate.node(utils.parse("let double = fn(x) { x * 2 };"), env)
+
+        result = specialize.run(utils.parse("double(21)"), env)
+
+        assert result
+        test_evaluate.test_self_evaluating_object(self, objects.Integer, result, 42)
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import sys
+import unittest
+
+from monkey.interpreter import environment, objects, stackless
+from tests import utils
+from tests.interpreter import test_evaluate
+
+
+def get_object(code: str) -> objects.Object:
+    result = stackless.run(utils.parse(code), environment.Environment())
+    assert result
+    return result
+
+
+globals().update(utils.rerun_evaluate_tests(get_object))
+
+
+SUM = "let sum = fn(n) { if (n == 0) { 0 } else { n + sum(n - 1) } };"
+
+
+class TestStackless(unittest.TestCase):
+    def test_recursion_deeper_than_python(self) -> None:
+        depth = sys.getrecursionlimit() * 5
+        actual = get_object(f"{SUM} sum({depth})")
+        test_evaluate.test_self_evaluating_object(
+            self, objects.Integer, actual, depth * (depth + 1) // 2
+        )
+
+    def test_overflow(self) -> None:
+        program = utils.parse(f"{SUM} sum(1000)")
+        with self.assertRaises(stackless.Overflow):
+            stackless.run(program, environment.Environment(), max_stack=500)
+
+        actual = stackless.run(program, environment.Environment(), max_stack=20_000)
+        assert actual
+        test_evaluate.test_self_evaluating_object(
+            self, objects.Integer, actual, 500500
+        )
+
+    def test_pause_and_resume(self) -> None:
+        program = utils.parse(f"{SUM} let total = sum(100); total * 2")
+        env = environment.Environment()
+        evaluation = stackless.Evaluation.new(program, env)
+
+        pauses = 0
+        while not evaluation.run(steps=50):
+            pauses += 1
+            self.assertFalse(evaluation.done)
+            with self.assertRaises(stackless.Unfinished):
+                evaluation.result
+        self.assertGreater(pauses, 10)
+
+        self.assertTrue(evaluation.done)
+        result = evaluation.result
+        assert result
+        test_evaluate.test_self_evaluating_object(self, objects.Integer, result, 10100)
+        total, _ = env.get("total")
+        assert total
+        test_evaluate.test_self_evaluating_object(self, objects.Integer, total, 5050)
+
+    def test_resumes_where_it_stopped(self) -> None:
+        code = f"{SUM} [sum(10), sum(20), sum(30)]"
+        expected = get_object(code)
+
+        for steps in (1, 7, 100):
+            with self.subTest(steps):
+                evaluation = stackless.Evaluation.new(
+                    utils.parse(code), environment.Environment()
+                )
+                while not evaluation.run(steps=steps):
+                    pass
+                self.assertEqual(expected, evaluation.result)
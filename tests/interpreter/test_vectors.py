@@ -0,0 +1,110 @@
+import unittest
+
+from monkey.interpreter import objects, vectors
+from tests.interpreter import test_evaluate
+
+
+# Either side of each level of the trie filling up.
+SIZES = (0, 1, 31, 32, 33, 64, 65, 1056, 1057, 32 * 32 * 32 + 32, 32 * 32 * 32 + 33)
+
+
+class TestVector(unittest.TestCase):
+    def test_append(self) -> None:
+        for size in SIZES:
+            with self.subTest(size):
+                vector: vectors.Vector[int] = vectors.Vector()
+                for i in range(size):
+                    vector = vector.append(i)
+
+                self.assertEqual(size, len(vector))
+                self.assertEqual(list(range(size)), list(vector))
+                self.assertTrue(all(vector[i] == i for i in range(0, size, 7)))
+
+    def test_from_iterable(self) -> None:
+        for size in SIZES:
+            with self.subTest(size):
+                vector = vectors.Vector.from_iterable(range(size))
+                self.assertEqual(list(range(size)), list(vector))
+
+                for i in range(40):
+                    vector = vector.append(size + i)
+                self.assertEqual(list(range(size + 40)), list(vector))
+
+    def test_rest(self) -> None:
+        vector = vectors.Vector.from_iterable(range(100))
+        for i in range(100):
+            self.assertEqual(i, vector[0])
+            self.assertEqual(99, vector[-1])
+            self.assertEqual(list(range(i, 100)), list(vector))
+            vector = vector.rest()
+
+        self.assertEqual(0, len(vector))
+        self.assertEqual(0, len(vector.rest()))
+        self.assertEqual([100], list(vector.append(100)))
+
+    def test_persistent(self) -> None:
+        vector = vectors.Vector.from_iterable(range(32))
+        first, second = vector.append(1), vector.append(2)
+
+        self.assertEqual(list(range(32)), list(vector))
+        self.assertEqual([*range(32), 1], list(first))
+        self.assertEqual([*range(32), 2], list(second))
+        self.assertEqual(list(range(1, 32)), list(vector.rest()))
+        self.assertEqual(list(range(32)), list(vector))
+
+    def test_sequence(self) -> None:
+        vector = vectors.Vector.from_iterable([1, 2, 3]).rest()
+        self.assertEqual([2, 3], vector)
+        self.assertEqual(vector, [2, 3])
+        self.assertNotEqual(vector, [2, 3, 4])
+        self.assertEqual([3], vector[1:])
+        self.assertIn(3, vector)
+        with self.assertRaises(IndexError):
+            vector[2]
+
+        self.assertIs(vector, vectors.of(vector))
+        self.assertEqual(vector, vectors.of([2, 3]))
+        self.assertEqual("[2, 3]", repr(vector))
+
+
+class TestArrays(unittest.TestCase):
+    def test_inspect_whatever_backs_them(self) -> None:
+        result = test_evaluate.get_object("[push([1], 2), [1, 2], rest([0, 1, 2])]")
+        assert isinstance(result, objects.Array)
+        pushed, literal, rest = (item.inspect() for item in result.items)
+        self.assertEqual(literal, pushed)
+        self.assertEqual(literal, rest)
+
+    def test_push_and_rest_share(self) -> None:
+        array = test_evaluate.get_object(
+            "let build = fn(n, acc) {"
+            "  if (n == 0) { acc } else { build(n - 1, push(acc, n)) }"
+            "};"
+            "build(3000, [])"
+        )
+        assert isinstance(array, objects.Array)
+        self.assertIsInstance(array.items, vectors.Vector)
+        self.assertEqual(3000, len(array.items))
+
+        rest = objects.BUILTIN_MAP["rest"].function(array)
+        assert isinstance(rest, objects.Array)
+        self.assertIs(array.items.root, rest.items.root)  # type: ignore[attr-defined]
+
+    def test_unchanged_by_push_and_rest(self) -> None:
+        code = (
+            "let a = [1, 2, 3];"
+            "let b = push(a, 4);"
+            "let c = push(a, 5);"
+            "let d = rest(b);"
+            "[a, b, c, d]"
+        )
+        actual = test_evaluate.get_object(code)
+        self.assertEqual(
+            "[[1, 2, 3], [1, 2, 3, 4], [1, 2, 3, 5], [2, 3, 4]]", inspect(actual)
+        )
+
+
+def inspect(obj: objects.Object) -> str:
+    if isinstance(obj, objects.Array):
+        return f"[{', '.join(inspect(item) for item in obj.items)}]"
+    return obj.inspect()
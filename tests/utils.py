@@ -1,4 +1,9 @@
-from monkey.interpreter import ast, lexers, parsers
+from collections.abc import Callable
+import unittest
+from unittest import mock
+
+from monkey.interpreter import ast, lexers, objects, parsers
+from tests.interpreter import test_evaluate
 
 
 def read_script(filename: str) -> str:
@@ -17,3 +22,30 @@ def parse(code: str) -> ast.Program:
     if parser.errors:
         raise Exception(["\n".join(e for e in parser.errors)])
     return program
+
+
+def rerun_evaluate_tests(
+    get_object: Callable[[str], objects.Object], skip: tuple[str, ...] = ()
+) -> dict[str, type[unittest.TestCase]]:
+    """
+    test_evaluate's test cases, but getting objects with get_object. For a test
+    module to add to its globals, so they run as its own.
+    """
+
+    class Rerun(unittest.TestCase):
+        def setUp(self) -> None:
+            patcher = mock.patch.object(test_evaluate, "get_object", get_object)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    cases: dict[str, type[unittest.TestCase]] = {}
+    for name, case in vars(test_evaluate).items():
+        if (
+            isinstance(case, type)
+            and issubclass(case, unittest.TestCase)
+            and case.__module__ == test_evaluate.__name__
+            and name not in skip
+        ):
+            namespace = {"__module__": get_object.__module__, "__qualname__": name}
+            cases[name] = type(name, (Rerun, case), namespace)
+    return cases